@@ -2,7 +2,7 @@
 # Sheikah AI Car Control - Backend Server
 import eventlet
 eventlet.monkey_patch()  # Use eventlet as async mode for SocketIO
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 import json
@@ -19,6 +19,12 @@ from modules.camera import CameraController
 from modules.mapping import MappingController
 from modules.voice import VoiceController
 from modules.battery import BatteryMonitor
+from modules.hardware import get_device_manager
+from modules.latency import LatencyTracker
+from modules.recorder import Recording, RECORDINGS_DIR, SESSION_NAME_PATTERN, list_recordings
+from modules.tracking import ObjectTracker
+from modules.detection import BlobDetector, DETECTION_MODES, MODE_MOTION
+from modules.streaming import VideoBroadcaster, VideoStreamRegistry, VIDEO_TRANSPORTS, TRANSPORT_BASE64, MJPEG_MIMETYPE
 
 # Configure logging
 logging.basicConfig(
@@ -38,12 +44,19 @@ CORS(app)  # Enable CORS for all routes
 # Initialize SocketIO with async mode
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
+# Seconds the camera keeps capturing after the last snapshot request
+SNAPSHOT_LEASE_SECONDS = 10
+
 # Initialize controllers
 movement_controller = MovementController()
 camera_controller = CameraController()
 mapping_controller = MappingController()
 voice_controller = VoiceController()
 battery_monitor = BatteryMonitor()
+latency_tracker = LatencyTracker()
+video_broadcaster = VideoBroadcaster(socketio, camera_controller, latency_tracker)
+video_streams = VideoStreamRegistry(camera_controller, video_broadcaster)
+object_tracker = ObjectTracker(camera_controller, on_update=lambda update: socketio.emit('tracking_update', update))
 
 # Global state
 car_state = {
@@ -80,13 +93,20 @@ def get_status():
         "data": car_state
     })
 
-@app.route('/api/movement', methods=['POST'])
+@app.route('/api/movement', methods=['GET', 'POST'])
 def control_movement():
-    """Control the car's movement"""
+    """Control the car's movement or get the movement status"""
     try:
+        if request.method == 'GET':
+            return jsonify({
+                "success": True,
+                "data": movement_controller.get_status()
+            })
+        
         data = request.json
         direction = data.get('direction', 'stop')
         speed = data.get('speed', 0)
+        duration = data.get('duration')
         
         # Validate inputs
         if direction not in ['forward', 'backward', 'left', 'right', 'stop']:
@@ -95,27 +115,95 @@ def control_movement():
         if not 0 <= speed <= 100:
             return jsonify({"success": False, "error": "Invalid speed"}), 400
         
-        # Execute movement command
-        success = movement_controller.move(direction, speed)
+        if duration is not None and (not isinstance(duration, (int, float)) or not 0 < duration <= 60):
+            return jsonify({"success": False, "error": "Invalid duration"}), 400
+        
+        # Queue the movement command; the actuator thread applies it
+        command_id = movement_controller.move(direction, speed, duration)
         
         return jsonify({
-            "success": success,
+            "success": command_id is not None,
             "data": {
+                "command_id": command_id,
                 "direction": direction,
-                "speed": speed
+                "speed": speed,
+                "duration": duration
             }
         })
     except Exception as e:
         logger.error(f"Error controlling movement: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/movement/velocity', methods=['POST'])
+def control_velocity():
+    """Drive the car with a continuous body velocity"""
+    try:
+        data = request.json or {}
+        velocity = [data.get(key, 0) for key in ('vx', 'vy', 'omega')]
+        duration = data.get('duration')
+        
+        # Validate inputs
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) and -1 <= value <= 1
+                   for value in velocity):
+            return jsonify({"success": False, "error": "Invalid velocity"}), 400
+        
+        if duration is not None and (not isinstance(duration, (int, float)) or not 0 < duration <= 60):
+            return jsonify({"success": False, "error": "Invalid duration"}), 400
+        
+        # Queue the velocity command; the actuator thread writes all four wheels at once
+        command_id = movement_controller.drive(*velocity, duration=duration)
+        
+        return jsonify({
+            "success": True,
+            "data": {
+                "command_id": command_id,
+                "vx": velocity[0],
+                "vy": velocity[1],
+                "omega": velocity[2],
+                "duration": duration
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error controlling velocity: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/movement/profile', methods=['POST'])
+def movement_profile():
+    """Change the acceleration and jerk limits of the wheel ramp"""
+    try:
+        data = request.json or {}
+        
+        # Validate inputs
+        if not movement_controller.set_profile(data.get('max_accel'), data.get('max_jerk')):
+            return jsonify({"success": False, "error": "Invalid profile limits"}), 400
+        
+        return jsonify({
+            "success": True,
+            "data": movement_controller.profile.get_state()
+        })
+    except Exception as e:
+        logger.error(f"Error setting movement profile: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/hardware', methods=['GET'])
+def hardware_stats():
+    """Get motor/servo bus statistics from the shared device manager"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": get_device_manager().get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting hardware statistics: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/camera', methods=['POST'])
 def control_camera():
     """Control the camera gimbal"""
     try:
         data = request.json
         control = data.get('control', '')
-        angle = data.get('angle', 0)
+        angle = data.get('angle', data.get('value', 0))
         
         # Validate inputs
         if control not in ['pan', 'tilt']:
@@ -150,18 +238,313 @@ def track_object():
         # Execute object tracking
         success = camera_controller.track_object(x, y)
         
-        # Return current pan and tilt angles
+        # Return the target pan and tilt angles; the gimbal is still moving toward them
         return jsonify({
             "success": success,
             "data": {
-                "pan_angle": camera_controller.pan_angle,
-                "tilt_angle": camera_controller.tilt_angle
+                "pan_angle": camera_controller.servo_control.pan,
+                "tilt_angle": camera_controller.servo_control.tilt,
+                "position": camera_controller.get_gimbal_position()
             }
         })
     except Exception as e:
         logger.error(f"Error tracking object: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/camera/gimbal', methods=['GET', 'POST'])
+def gimbal_state():
+    """Get the gimbal motion engine state or change its update rate"""
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            
+            # Validate inputs
+            if not camera_controller.gimbal.set_update_rate(data.get('update_rate')):
+                return jsonify({"success": False, "error": "Invalid update rate"}), 400
+        
+        return jsonify({
+            "success": True,
+            "data": camera_controller.get_gimbal_state()
+        })
+    except Exception as e:
+        logger.error(f"Error getting gimbal state: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/camera/tracking', methods=['GET', 'POST'])
+def camera_tracking():
+    """Get the tracking status, or start/stop on-robot object tracking"""
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            action = data.get('action', '')
+            
+            # Validate inputs
+            if action not in ['start', 'stop']:
+                return jsonify({"success": False, "error": "Invalid action"}), 400
+            
+            if action == 'start':
+                mode = data.get('mode', 'color')
+                color = data.get('color', [255, 0, 0])
+                hue_tolerance = data.get('hue_tolerance', 10)
+                if mode not in DETECTION_MODES:
+                    return jsonify({"success": False, "error": "Invalid mode"}), 400
+                if (not isinstance(color, list) or len(color) != 3 or
+                        not all(isinstance(c, int) and 0 <= c <= 255 for c in color)):
+                    return jsonify({"success": False, "error": "Invalid color"}), 400
+                if not isinstance(hue_tolerance, int) or not 0 <= hue_tolerance <= 90:
+                    return jsonify({"success": False, "error": "Invalid hue tolerance"}), 400
+                
+                if mode == MODE_MOTION:
+                    detector = BlobDetector(mode=mode)
+                else:
+                    detector = BlobDetector.from_rgb(tuple(color), hue_tolerance, mode=mode)
+                
+                if not object_tracker.start(detector):
+                    return jsonify({"success": False, "error": "Tracking is already active"}), 409
+                # Keep the camera capturing while tracking
+                video_streams.hold('tracking', 'tracking')
+            else:
+                success = object_tracker.stop()
+                video_streams.unsubscribe('tracking')
+                if not success:
+                    return jsonify({"success": False, "error": "Tracking is not active"}), 409
+        
+        return jsonify({
+            "success": True,
+            "data": object_tracker.get_status()
+        })
+    
+    except Exception as e:
+        logger.error(f"Tracking error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/camera/snapshot', methods=['GET'])
+def camera_snapshot():
+    """Get the newest camera frame as JPEG, with the frame sequence as ETag"""
+    try:
+        # Keep the camera on while clients keep polling
+        was_streaming = camera_controller.is_streaming
+        video_streams.lease('snapshot', 'snapshot', SNAPSHOT_LEASE_SECONDS)
+        
+        if was_streaming:
+            frame = camera_controller.frame_ring.latest()
+        else:
+            # The ring may still hold a frame from an earlier session, wait for a fresh one
+            frame = camera_controller.wait_for_frame(camera_controller.frame_sequence, timeout=2.0)
+        
+        if frame is None:
+            return jsonify({"success": False, "error": "No camera frame available"}), 503
+        
+        # Unchanged frame: answer before encoding anything
+        etag = str(frame.sequence)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            encoded = camera_controller.get_encoded_frame(frame)
+            if encoded is None:
+                return jsonify({"success": False, "error": "Failed to encode frame"}), 500
+            response = Response(encoded.jpeg, mimetype='image/jpeg')
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Frame-Sequence'] = etag
+        response.headers['X-Frame-Timestamp'] = f"{frame.timestamp:.6f}"
+        return response
+    
+    except Exception as e:
+        logger.error(f"Snapshot error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/camera/frame_bus', methods=['GET', 'POST'])
+def frame_bus():
+    """Get or change the shared-memory frame bus used by worker processes"""
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            enabled = data.get('enabled')
+            
+            # Validate inputs
+            if not isinstance(enabled, bool):
+                return jsonify({"success": False, "error": "Invalid enabled flag"}), 400
+            
+            if enabled:
+                if camera_controller.frame_bus is None and not camera_controller.enable_frame_bus():
+                    return jsonify({"success": False, "error": "Failed to create frame bus"}), 500
+                # Keep the camera capturing while the bus is enabled
+                video_streams.hold('frame-bus', 'frame_bus')
+            else:
+                video_streams.unsubscribe('frame-bus')
+                camera_controller.disable_frame_bus()
+        
+        return jsonify({
+            "success": True,
+            "data": camera_controller.get_frame_bus_info()
+        })
+    
+    except Exception as e:
+        logger.error(f"Frame bus error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/camera/pipeline', methods=['GET', 'POST'])
+def camera_pipeline():
+    """Get frame pipeline statistics, or enable/disable a processing stage"""
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            stage = data.get('stage', '')
+            enabled = data.get('enabled')
+            
+            # Validate inputs
+            if not isinstance(enabled, bool):
+                return jsonify({"success": False, "error": "Invalid enabled flag"}), 400
+            
+            if not camera_controller.pipeline.set_enabled(stage, enabled):
+                return jsonify({"success": False, "error": f"Unknown stage: {stage}"}), 404
+        
+        return jsonify({
+            "success": True,
+            "data": camera_controller.pipeline.get_stats()
+        })
+    
+    except Exception as e:
+        logger.error(f"Frame pipeline error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/camera/recording', methods=['GET', 'POST'])
+def camera_recording():
+    """Get the recording status, or start/stop recording drive sessions"""
+    try:
+        if request.method == 'POST':
+            data = request.json or {}
+            action = data.get('action', '')
+            
+            # Validate inputs
+            if action not in ['start', 'stop']:
+                return jsonify({"success": False, "error": "Invalid action"}), 400
+            
+            if action == 'start':
+                segment_seconds = data.get('segment_seconds', 60)
+                if not isinstance(segment_seconds, (int, float)) or segment_seconds <= 0:
+                    return jsonify({"success": False, "error": "Invalid segment length"}), 400
+                
+                name = data.get('name')
+                if name is not None and (not isinstance(name, str) or not SESSION_NAME_PATTERN.fullmatch(name)):
+                    return jsonify({"success": False, "error": "Invalid recording name"}), 400
+                
+                try:
+                    started = camera_controller.start_recording(segment_seconds=segment_seconds, name=name)
+                except FileExistsError:
+                    return jsonify({"success": False, "error": "Recording name already exists"}), 409
+                if not started:
+                    return jsonify({"success": False, "error": "Recording is already active"}), 409
+                # Keep the camera capturing while recording
+                video_streams.hold('recording', 'recording')
+            else:
+                success = camera_controller.stop_recording()
+                video_streams.unsubscribe('recording')
+                if not success:
+                    return jsonify({"success": False, "error": "Recording is not active"}), 409
+        
+        return jsonify({
+            "success": True,
+            "data": camera_controller.get_recording_stats()
+        })
+    
+    except Exception as e:
+        logger.error(f"Recording error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/recordings', methods=['GET'])
+def get_recordings():
+    """List recorded drive sessions"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": [Recording(RECORDINGS_DIR / name).get_info() for name in list_recordings()]
+        })
+    
+    except Exception as e:
+        logger.error(f"Error listing recordings: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/recordings/<name>/frame', methods=['GET'])
+def get_recording_frame(name):
+    """Get the recorded frame shown at a timestamp"""
+    try:
+        timestamp = request.args.get('t', type=float)
+        
+        # Validate inputs
+        if name not in list_recordings():
+            return jsonify({"success": False, "error": "Recording not found"}), 404
+        
+        recording = Recording(RECORDINGS_DIR / name)
+        if timestamp is None:
+            timestamp = recording.start_time
+        
+        frame = recording.frame_at(timestamp) if timestamp is not None else None
+        if frame is None:
+            return jsonify({"success": False, "error": "No frame at this time"}), 404
+        
+        sequence, frame_timestamp, jpeg = frame
+        return Response(jpeg, mimetype='image/jpeg', headers={
+            'X-Frame-Sequence': str(sequence),
+            'X-Frame-Timestamp': f"{frame_timestamp:.6f}"
+        })
+    
+    except Exception as e:
+        logger.error(f"Error reading recording: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/video.mjpeg', methods=['GET'])
+def video_mjpeg():
+    """Stream the camera as multipart MJPEG over plain HTTP"""
+    try:
+        fps = request.args.get('fps', camera_controller.framerate, type=float)
+        
+        # Validate inputs
+        if fps is None or not 0 < fps <= camera_controller.framerate:
+            return jsonify({"success": False, "error": "Invalid fps"}), 400
+        
+        logger.info(f"MJPEG stream requested by {request.remote_addr} at {fps} FPS")
+        
+        return Response(
+            video_streams.mjpeg_stream(fps),
+            mimetype=MJPEG_MIMETYPE,
+            headers={"Cache-Control": "no-cache, no-store", "Pragma": "no-cache"}
+        )
+    except Exception as e:
+        logger.error(f"Error starting MJPEG stream: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/video/streams', methods=['GET'])
+def get_video_streams():
+    """Get the active video streams and encoder loops"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": video_streams.get_stats()
+        })
+    
+    except Exception as e:
+        logger.error(f"Video streams error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/video/latency', methods=['GET', 'DELETE'])
+def video_latency():
+    """Get (or reset with DELETE) the per-stage video latency histograms"""
+    try:
+        if request.method == 'DELETE':
+            latency_tracker.reset()
+        
+        return jsonify({
+            "success": True,
+            "data": latency_tracker.get_stats()
+        })
+    
+    except Exception as e:
+        logger.error(f"Video latency error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/map', methods=['GET'])
 def get_map():
     """Get the current map data"""
@@ -362,41 +745,67 @@ def handle_connect():
 def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid}")
+    
+    # Cancel the client's video stream right away
+    video_streams.unsubscribe(request.sid)
 
 @socketio.on('request_video_stream')
 def handle_video_request(data):
     """Handle video stream request"""
-    logger.info(f"Video stream requested by {request.sid}")
+    data = data or {}
+    transport = data.get('transport', TRANSPORT_BASE64)
     
-    # Start camera streaming if not already streaming
-    if not camera_controller.is_streaming:
-        camera_controller.start_streaming()
+    # Validate inputs
+    if transport not in VIDEO_TRANSPORTS:
+        emit('video_error', {'error': f"Invalid transport: {transport}"})
+        return
     
-    # Start a thread to send video frames
-    threading.Thread(target=stream_video, args=(request.sid,), daemon=True).start()
-
-def stream_video(client_id):
-    """Stream video frames to a client"""
-    logger.info(f"Starting video stream for {client_id}")
+    logger.info(f"Video stream ({transport}) requested by {request.sid}")
     
-    try:
-        while camera_controller.is_streaming:
-            # Get the current frame
-            frame_base64 = camera_controller.get_frame_base64()
-            
-            if frame_base64:
-                # Send frame to the client
-                socketio.emit('video_frame', {
-                    'frame': frame_base64
-                }, room=client_id)
-            
-            # Sleep to maintain framerate
-            eventlet.sleep(0.033)  # ~30 FPS
+    # Subscribe the client; repeated requests reuse the existing stream
+    video_streams.subscribe(request.sid, transport, adaptive=bool(data.get('adaptive', False)))
+
+@socketio.on('video_ack')
+def handle_video_ack(data):
+    """Handle a rendered frame acknowledgement used for quality adaptation and latency tracking"""
+    data = data or {}
+    sequence = data.get('sequence')
+    if isinstance(sequence, int):
+        video_streams.acknowledge(request.sid, sequence, data.get('render_ms'))
+
+@socketio.on('video_overlay')
+def handle_video_overlay(data):
+    """Enable or disable per-frame latency timings for this client"""
+    enabled = bool((data or {}).get('enabled', False))
+    video_streams.set_overlay(request.sid, enabled)
+
+@socketio.on('gimbal')
+def handle_gimbal(data):
+    """Handle a gimbal command; bursts from slider drags are coalesced by the motion engine"""
+    data = data or {}
+    for control in ('pan', 'tilt'):
+        if control in data:
+            camera_controller.set_gimbal_angle(control, data[control])
+
+@socketio.on('drive')
+def handle_drive(data):
+    """Handle a continuous velocity command from the joystick"""
+    data = data or {}
+    velocity = [data.get(key, 0) for key in ('vx', 'vy', 'omega')]
     
-    except Exception as e:
-        logger.error(f"Video streaming error: {e}")
+    # Validate inputs
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) and -1 <= value <= 1
+               for value in velocity):
+        emit('drive_error', {'error': "Invalid velocity"})
+        return
     
-    logger.info(f"Video stream ended for {client_id}")
+    movement_controller.drive(*velocity)
+
+@socketio.on('stop_video_stream')
+def handle_video_stop(data=None):
+    """Handle video stream cancellation"""
+    logger.info(f"Video stream stop requested by {request.sid}")
+    video_streams.unsubscribe(request.sid)
 
 def update_car_position():
     """Update car position periodically"""
@@ -449,6 +858,9 @@ def start_background_tasks():
 def cleanup():
     """Clean up resources on shutdown"""
     logger.info("Cleaning up resources...")
+    if object_tracker.is_tracking:
+        object_tracker.stop()
+    video_broadcaster.stop()
     movement_controller.cleanup()
     camera_controller.cleanup()
     mapping_controller.cleanup()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Control Latency Benchmark
+#
+# Measures the round-trip time of POST /api/movement over a real HTTP socket
+# while N video streams are active, with JPEG encoding offloaded to OS
+# threads and (with --compare) inline on the eventlet hub.
+#
+# Usage:
+#   python benchmarks/bench_control_latency.py --streams 0 1 4 8 --compare
+
+import eventlet
+eventlet.monkey_patch()
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import eventlet.wsgi
+from modules import workers
+
+def percentile(values, fraction):
+    """Get a percentile of a list of values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def measure(server, port, streams, requests, interval):
+    """
+    Measure movement round-trip times with a number of active video streams
+
+    Returns:
+        list: Round-trip times in milliseconds
+    """
+    clients = [server.socketio.test_client(server.app) for _ in range(streams)]
+    for i, client in enumerate(clients):
+        # Mix transports and quality levels so several variants are encoded per frame
+        client.emit('request_video_stream', {'transport': 'binary' if i % 2 else 'base64'})
+
+    # Let the streams warm up
+    eventlet.sleep(1.0)
+
+    url = f"http://127.0.0.1:{port}/api/movement"
+    body = json.dumps({"direction": "stop", "speed": 0}).encode('utf-8')
+
+    rtts = []
+    for _ in range(requests):
+        req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        with urllib.request.urlopen(req) as response:
+            response.read()
+        rtts.append((time.perf_counter() - start) * 1000)
+
+        # Drop received frames so the test clients do not grow without bound
+        for client in clients:
+            client.get_received()
+
+        eventlet.sleep(interval)
+
+    for client in clients:
+        client.disconnect()
+    eventlet.sleep(0.5)
+
+    return rtts
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark movement latency with active video streams")
+    parser.add_argument('--streams', nargs='+', type=int, default=[0, 1, 4, 8])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--interval', type=float, default=0.02)
+    parser.add_argument('--compare', action='store_true', help="Also run with encoding inline on the hub")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    import app as server
+
+    # Serve the app over a real socket so requests go through the eventlet hub
+    listener = eventlet.listen(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+    eventlet.spawn(eventlet.wsgi.server, listener, server.app, log_output=False)
+
+    modes = [True, False] if args.compare else [True]
+
+    print(f"{'encoding':>9} {'streams':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for offload in modes:
+        workers.OFFLOAD_ENABLED = offload
+        for streams in args.streams:
+            rtts = measure(server, port, streams, args.requests, args.interval)
+            print(f"{'offload' if offload else 'inline':>9} {streams:>7} "
+                  f"{percentile(rtts, 0.5):>8.2f} {percentile(rtts, 0.95):>8.2f} {max(rtts):>8.2f}")
+
+if __name__ == '__main__':
+    main()
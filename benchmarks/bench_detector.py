@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Target Detector Benchmark
+#
+# Measures BlobDetector throughput on synthetic frames with a moving red
+# target, per resolution and detection mode, with and without the ROI
+# search and with OpenCV or the NumPy fallback.
+#
+# Usage:
+#   python benchmarks/bench_detector.py --resolution 320x240 640x480 1280x720
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from modules import detection
+from modules.detection import BlobDetector, DETECTION_MODES, MODE_MOTION
+
+def parse_resolution(value):
+    """Parse a WIDTHxHEIGHT string"""
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+def make_frames(resolution, count):
+    """
+    Build synthetic frames: noisy background with a red square moving across it
+
+    Returns:
+        list: RGB frames
+    """
+    width, height = resolution
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 120, (height, width, 3), dtype=np.uint8)
+    size = max(8, width // 16)
+
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        x = int((width - size) * (0.5 + 0.4 * np.sin(i / 10)))
+        y = int((height - size) * (0.5 + 0.4 * np.cos(i / 13)))
+        frame[y:y + size, x:x + size] = (220, 20, 20)
+        frames.append(frame)
+    return frames
+
+def run(frames, mode, use_roi):
+    """
+    Run the detector over the frames
+
+    Returns:
+        tuple: (ms per frame, detection rate)
+    """
+    if mode == MODE_MOTION:
+        detector = BlobDetector(mode=mode, use_roi=use_roi)
+    else:
+        detector = BlobDetector.from_rgb((220, 20, 20), mode=mode, use_roi=use_roi)
+
+    found = 0
+    start = time.perf_counter()
+    for frame in frames:
+        if detector.detect(frame) is not None:
+            found += 1
+    elapsed = time.perf_counter() - start
+
+    return 1000 * elapsed / len(frames), found / len(frames)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the colour/motion blob detector")
+    parser.add_argument('--resolution', nargs='+', default=['320x240', '640x480', '1280x720'])
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--numpy', action='store_true', help="Also run the NumPy fallback when OpenCV is installed")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    backends = ['opencv', 'numpy'] if detection.CV2_AVAILABLE and args.numpy else \
+               ['opencv' if detection.CV2_AVAILABLE else 'numpy']
+
+    print(f"{'resolution':>11} {'backend':>7} {'mode':>13} {'roi':>4} {'ms/frame':>9} {'fps':>7} {'found':>6}")
+    for resolution in args.resolution:
+        frames = make_frames(parse_resolution(resolution), args.frames)
+        for backend in backends:
+            detection.CV2_AVAILABLE = backend == 'opencv'
+            for mode in DETECTION_MODES:
+                for use_roi in (False, True):
+                    ms, rate = run(frames, mode, use_roi)
+                    print(f"{resolution:>11} {backend:>7} {mode:>13} {'yes' if use_roi else 'no':>4} "
+                          f"{ms:>9.2f} {1000 / ms:>7.0f} {rate:>6.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Frame Bus Benchmark
+#
+# Publishes simulated camera frames to the shared-memory frame bus and runs
+# a CPU-bound analysis (grayscale + gradient magnitude) on them in N worker
+# processes. Shows how frame analysis scales across cores once it is out of
+# the server process.
+#
+# Usage:
+#   python benchmarks/bench_frame_bus.py --workers 1 2 4 --resolution 1280x720
+
+import os
+import sys
+import time
+import argparse
+import logging
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from modules.camera import CameraController
+from modules.camera_backends import SimulatedCameraBackend
+from modules.frame_bus import FrameBusReader
+
+def parse_resolution(value):
+    """Parse a WIDTHxHEIGHT string"""
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+def analyze(data):
+    """Example per-frame analysis: mean gradient magnitude of the grayscale image"""
+    gray = data.mean(axis=2, dtype=np.float32)
+    dx = np.abs(np.diff(gray, axis=1))
+    dy = np.abs(np.diff(gray, axis=0))
+    return float(dx.mean() + dy.mean())
+
+def worker(name, duration, copy, results):
+    """Attach to the bus and analyze frames until the duration is over"""
+    logging.disable(logging.INFO)
+    reader = FrameBusReader(name)
+
+    analyzed = 0
+    torn = 0
+    sequence = 0
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        frame = reader.wait_for_frame(sequence, timeout=0.5, copy=copy)
+        if frame is None:
+            continue
+        sequence = frame.sequence
+
+        # Without --copy, analyze the shared slot in place, then check it was not overwritten meanwhile
+        analyze(frame.data)
+        if copy or reader.is_valid(frame.sequence):
+            analyzed += 1
+        else:
+            torn += 1
+
+    frame = None
+    reader.close()
+    results.put((analyzed, torn))
+
+def run(resolution, framerate, workers, duration, copy):
+    """
+    Run the bus with a number of worker processes
+
+    Returns:
+        dict: Benchmark results
+    """
+    backend = SimulatedCameraBackend(resolution, framerate)
+    camera_controller = CameraController(resolution, framerate, backend=backend)
+    name = f"sheikah_bench_{os.getpid()}"
+    camera_controller.enable_frame_bus(name)
+    camera_controller.start_streaming()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(name, duration, copy, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    # Count frames published while the workers run (spawn start-up is excluded roughly)
+    time.sleep(0.5)
+    start_sequence = camera_controller.frame_sequence
+    start_wall = time.time()
+
+    counts = [results.get() for _ in processes]
+    wall = time.time() - start_wall
+    published = camera_controller.frame_sequence - start_sequence
+
+    for process in processes:
+        process.join()
+    camera_controller.cleanup()
+
+    analyzed = sum(count[0] for count in counts)
+    return {
+        "published_fps": published / wall,
+        "analyzed_fps_per_worker": analyzed / duration / workers,
+        "analyzed_fps_total": analyzed / duration,
+        "torn": sum(count[1] for count in counts)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-process frame analysis over the shared-memory frame bus")
+    parser.add_argument('--resolution', nargs='+', default=['640x480', '1280x720'])
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4])
+    parser.add_argument('--framerate', type=int, default=30)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--copy', action='store_true', help="Copy each frame out of the bus before analyzing it")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    # Cost of the analysis on one core, for reference
+    for resolution in args.resolution:
+        width, height = parse_resolution(resolution)
+        sample = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        for _ in range(10):
+            analyze(sample)
+        print(f"{resolution}: analysis takes {(time.perf_counter() - start) * 100:.1f} ms per frame on one core")
+
+    print(f"{'resolution':>11} {'workers':>7} {'publish':>8} {'fps/worker':>11} {'fps total':>10} {'torn':>5}")
+    for resolution in args.resolution:
+        for workers in args.workers:
+            result = run(parse_resolution(resolution), args.framerate, workers, args.duration, args.copy)
+            print(f"{resolution:>11} {workers:>7} {result['published_fps']:>8.1f} "
+                  f"{result['analyzed_fps_per_worker']:>11.1f} {result['analyzed_fps_total']:>10.1f} {result['torn']:>5}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - I2C Cost per Command Benchmark
+#
+# Runs the application against a simulated PCA9685 bus and reports, for each
+# API command, the I2C transactions, bytes and simulated bus time it cost
+# once the motors or servos finished moving.
+#
+# Usage:
+#   python benchmarks/bench_i2c_per_command.py --bus-speed 100000 400000
+
+import eventlet
+eventlet.monkey_patch()
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.hardware import DeviceManager, set_device_manager
+
+# (label, endpoint, JSON body) run in order, so repeats show the register cache
+COMMANDS = [
+    ("forward 50%", '/api/movement', {"direction": "forward", "speed": 50}),
+    ("forward 50% again", '/api/movement', {"direction": "forward", "speed": 50}),
+    ("forward 70%", '/api/movement', {"direction": "forward", "speed": 70}),
+    ("left 70%", '/api/movement', {"direction": "left", "speed": 70}),
+    ("stop", '/api/movement', {"direction": "stop", "speed": 0}),
+    ("stop again", '/api/movement', {"direction": "stop", "speed": 0}),
+    ("pan 90 -> 150", '/api/camera', {"control": "pan", "angle": 150}),
+    ("tilt -5 -> 20", '/api/camera', {"control": "tilt", "angle": 20})
+]
+
+def wait_until_idle(client, timeout=5.0):
+    """Wait until the movement actuator and the gimbal have applied every command and finished ramping"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        movement = client.get('/api/movement').get_json()["data"]
+        gimbal = client.get('/api/camera/gimbal').get_json()["data"]
+        if movement["queued"] == 0 and not movement["profile"]["ramping"] and not gimbal["pending"] and \
+                all(axis["settled"] for axis in gimbal["axes"].values()):
+            # Let the last servo write go out
+            eventlet.sleep(0.1)
+            return
+        eventlet.sleep(0.01)
+
+def measure(client, bus, label, action):
+    """
+    Run one command and report the bus traffic it caused
+
+    Returns:
+        tuple: (label, transactions, bytes, simulated bus time in ms)
+    """
+    wait_until_idle(client)
+    bus.reset_stats()
+    action()
+    wait_until_idle(client)
+    return label, bus.transactions, bus.bytes_transferred, bus.bus_time * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark I2C traffic per API command on a simulated bus")
+    parser.add_argument('--bus-speed', nargs='+', type=int, default=[100000, 400000])
+    parser.add_argument('--slider-events', type=int, default=200, help="Gimbal socket events in the slider drag test")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    # The application creates its controllers on import, so the device
+    # manager is installed first; each bus speed reuses it with a new clock
+    manager = DeviceManager.simulated(realtime=True)
+    set_device_manager(manager)
+
+    import app as server
+    client = server.app.test_client()
+    socket_client = server.socketio.test_client(server.app)
+    bus = manager.bus
+
+    def drag_slider():
+        # A slider drag at 1 kHz; the gimbal engine coalesces it to its update rate
+        for i in range(args.slider_events):
+            socket_client.emit('gimbal', {'pan': 150 - 60 * i / args.slider_events})
+            eventlet.sleep(0.001)
+
+    print(f"{'bus speed':>10} {'command':>22} {'transactions':>12} {'bytes':>6} {'bus ms':>8}")
+    for bus_speed in args.bus_speed:
+        bus.bus_speed = bus_speed
+        results = [
+            measure(client, bus, label, lambda endpoint=endpoint, body=body: client.post(endpoint, json=body))
+            for label, endpoint, body in COMMANDS
+        ]
+        results.append(measure(client, bus, f"{args.slider_events} slider events", drag_slider))
+
+        for label, transactions, size, bus_ms in results:
+            print(f"{bus_speed:>10} {label:>22} {transactions:>12} {size:>6} {bus_ms:>8.2f}")
+
+        # Return to the start position for the next bus speed
+        client.post('/api/camera', json={"control": "pan", "angle": 90})
+        client.post('/api/camera', json={"control": "tilt", "angle": -5})
+        wait_until_idle(client)
+
+    stats = manager.get_stats()
+    print(f"\nregisters written {stats['i2c']['registers_written']}, skipped by the register cache "
+          f"{stats['i2c']['registers_skipped']}, operations merged into shared batches {stats['operations_merged']}")
+
+    socket_client.disconnect()
+    server.camera_controller.cleanup()
+    server.movement_controller.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Video Pipeline Benchmark
+#
+# Runs the full capture -> ring -> encode -> Socket.IO emit pipeline on the
+# simulated camera backend, so it works on any Linux box.
+#
+# Usage:
+#   python benchmarks/bench_video_pipeline.py --resolution 640x480 1920x1080 --viewers 1 4
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from flask_socketio import SocketIO
+
+from modules.camera import CameraController
+from modules.camera_backends import SimulatedCameraBackend
+from modules.streaming import VideoBroadcaster, VideoStreamRegistry
+
+def parse_resolution(value):
+    """Parse a WIDTHxHEIGHT string"""
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+def run_pipeline(resolution, viewers, transport, duration, framerate):
+    """
+    Run the pipeline for a fixed time and collect throughput numbers
+
+    Returns:
+        dict: Benchmark results
+    """
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading')
+
+    backend = SimulatedCameraBackend(resolution, framerate)
+    camera_controller = CameraController(resolution, framerate, backend=backend)
+    broadcaster = VideoBroadcaster(socketio, camera_controller)
+    registry = VideoStreamRegistry(camera_controller, broadcaster)
+
+    @socketio.on('request_video_stream')
+    def handle_video_request(data):
+        from flask import request
+        registry.subscribe(request.sid, data.get('transport'))
+
+    clients = [socketio.test_client(app) for _ in range(viewers)]
+    for client in clients:
+        client.emit('request_video_stream', {'transport': transport})
+
+    start_sequence = camera_controller.frame_sequence
+    start_cpu = time.process_time()
+    start_wall = time.time()
+
+    time.sleep(duration)
+
+    wall = time.time() - start_wall
+    cpu = time.process_time() - start_cpu
+    captured = camera_controller.frame_sequence - start_sequence
+    stats = broadcaster.get_stats()
+
+    received = 0
+    for client in clients:
+        received += sum(1 for message in client.get_received() if message['name'].startswith('video_frame'))
+        client.disconnect()
+
+    camera_controller.cleanup()
+
+    return {
+        "captured_fps": captured / wall,
+        "encoded_fps": stats["frames_encoded"] / wall,
+        "received_fps_per_viewer": received / wall / viewers,
+        "cpu_percent": 100 * cpu / wall,
+        "cpu_ms_per_frame": 1000 * cpu / max(captured, 1),
+        "bytes_per_frame": sum(stats["bytes_sent"].values()) / max(stats["frames_sent"], 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the video capture-to-emit pipeline")
+    parser.add_argument('--resolution', nargs='+', default=['640x480', '1280x720', '1920x1080'])
+    parser.add_argument('--viewers', nargs='+', type=int, default=[1, 4])
+    parser.add_argument('--transport', default='binary', choices=['base64', 'binary'])
+    parser.add_argument('--framerate', type=int, default=30)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    print(f"{'resolution':>11} {'viewers':>7} {'capture':>8} {'encode':>7} {'recv/v':>7} {'cpu%':>6} {'cpu ms/f':>9} {'KB/frame':>9}")
+    for resolution in args.resolution:
+        for viewers in args.viewers:
+            result = run_pipeline(parse_resolution(resolution), viewers, args.transport, args.duration, args.framerate)
+            print(f"{resolution:>11} {viewers:>7} "
+                  f"{result['captured_fps']:>8.1f} {result['encoded_fps']:>7.1f} "
+                  f"{result['received_fps_per_viewer']:>7.1f} {result['cpu_percent']:>6.1f} "
+                  f"{result['cpu_ms_per_frame']:>9.2f} {result['bytes_per_frame'] / 1024:>9.1f}")
+
+if __name__ == '__main__':
+    main()
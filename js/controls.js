@@ -91,8 +91,8 @@ function initMovementControls() {
             speed: currentMovement.speed // Maintain current speed setting
         };
         
-        // Stop movement
-        sendMovementCommand('stop', 0);
+        // Stop movement on the same channel as the drive commands, so it cannot overtake them
+        sendDriveCommand(0, 0, 0);
         updateButtonState('stop');
         
         // Reset transition after animation completes
@@ -126,24 +126,38 @@ function initMovementControls() {
         const angle = currentMovement.angle;
         const distance = currentMovement.distance;
         
-        // Convert angle to cardinal direction
-        // Forward: -45° to 45° (π/4)
-        // Right: 45° to 135°
-        // Backward: 135° to -135°
-        // Left: -135° to -45°
+        // Continuous velocity: up drives forward, sideways turns (screen y
+        // grows downward, and a positive omega turns counter-clockwise)
+        const scale = distance * currentMovement.speed / 100;
+        const vx = -Math.sin(angle) * scale;
+        const omega = -Math.cos(angle) * scale;
         
-        let direction;
-        const angleDeg = angle * (180 / Math.PI);
-        
-        if (angleDeg > -45 && angleDeg <= 45) direction = 'right';
-        else if (angleDeg > 45 && angleDeg <= 135) direction = 'backward';
-        else if (angleDeg > 135 || angleDeg <= -135) direction = 'left';
-        else direction = 'forward';
-        
-        // Scale speed by distance from center
-        const scaledSpeed = Math.round(currentMovement.speed * distance);
+        sendDriveCommand(vx, 0, omega);
+    }
+}
+
+// Send a continuous velocity command, over the socket when connected
+async function sendDriveCommand(vx, vy, omega) {
+    const velocity = {
+        vx: Math.round(vx * 100) / 100,
+        vy: Math.round(vy * 100) / 100,
+        omega: Math.round(omega * 100) / 100
+    };
+    
+    // Joystick drags fire many events; the socket avoids an HTTP request per event
+    if (typeof videoSocket !== 'undefined' && videoSocket && videoSocket.connected) {
+        videoSocket.emit('drive', velocity);
+        return;
+    }
+    
+    try {
+        const response = await callApi(API_CONFIG.endpoints.velocity, 'POST', velocity);
         
-        sendMovementCommand(direction, scaledSpeed);
+        if (!response.success) {
+            console.error('Failed to send drive command:', response.error);
+        }
+    } catch (error) {
+        console.error('Error sending drive command:', error);
     }
 }
 
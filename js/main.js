@@ -96,8 +96,10 @@ function addRuneAnimations() {
 // API endpoint configuration
 const API_CONFIG = {
     baseUrl: 'http://localhost:5000/api',
+    socketUrl: 'http://localhost:5000',
     endpoints: {
         movement: '/movement',
+        velocity: '/movement/velocity',
         camera: '/camera',
         map: '/map',
         voice: '/voice'
@@ -8,6 +8,13 @@ document.addEventListener('DOMContentLoaded', () => {
     initCameraControls();
 });
 
+// Size of the header in front of each binary video frame:
+// sequence (uint32), capture timestamp (float64), width (uint16), height (uint16)
+const VIDEO_FRAME_HEADER_SIZE = 16;
+
+// Socket.IO connection shared by the video stream
+let videoSocket = null;
+
 // Initialize WebRTC connection for camera streaming
 function initWebRTC() {
     console.log('Initializing WebRTC connection...');
@@ -15,18 +22,150 @@ function initWebRTC() {
     const videoElement = document.getElementById('camera-stream');
     const cameraPlaceholder = document.querySelector('.camera-placeholder');
     
-    // In a real implementation, this would establish a WebRTC connection
-    // For demonstration purposes, we'll simulate a connection after a delay
-    setTimeout(() => {
-        // Hide the placeholder when the stream is ready
+    // Without a Socket.IO client there is no live feed, so fall back to the demo view
+    if (typeof io === 'undefined') {
+        setTimeout(() => {
+            cameraPlaceholder.style.display = 'none';
+            simulateCameraFeed(videoElement);
+            console.log('Camera stream simulated');
+        }, 2000);
+        return;
+    }
+    
+    connectVideoStream(videoElement, cameraPlaceholder);
+}
+
+// Connect to the server and render the live camera stream
+function connectVideoStream(videoElement, cameraPlaceholder) {
+    // Render frames onto a canvas that feeds the video element
+    const canvas = document.createElement('canvas');
+    canvas.width = 640;
+    canvas.height = 480;
+    const ctx = canvas.getContext('2d');
+    videoElement.srcObject = canvas.captureStream(30);
+    
+    // Binary frames need createImageBitmap, otherwise use base64 frames
+    const transport = typeof createImageBitmap === 'function' ? 'binary' : 'base64';
+    
+    // Only one frame is decoded at a time; newer frames replace older pending ones
+    let isDecoding = false;
+    let pendingFrame = null;
+    
+    // Latency overlay state: per-stage timings of the last acknowledged frame
+    let overlayEnabled = false;
+    let frameTiming = null;
+    
+    // Acknowledge rendered frames so the server can adapt quality and measure latency
+    function acknowledgeFrame(sequence, receivedAt) {
+        videoSocket.emit('video_ack', {
+            sequence: sequence,
+            render_ms: performance.now() - receivedAt
+        });
+    }
+    
+    function drawTimingOverlay() {
+        if (!overlayEnabled || !frameTiming) {
+            return;
+        }
+        
+        const lines = [
+            `SEQ ${frameTiming.sequence}`,
+            `CAPTURE->ENCODE ${frameTiming.capture_to_encode_ms.toFixed(1)} ms`,
+            `ENCODE ${frameTiming.encode_ms.toFixed(1)} ms`,
+            `ENCODE->EMIT ${frameTiming.encode_to_emit_ms.toFixed(1)} ms`,
+            `EMIT->ACK ${frameTiming.emit_to_ack_ms.toFixed(1)} ms`,
+            `GLASS->GLASS ${frameTiming.glass_to_glass_ms.toFixed(1)} ms`
+        ];
+        
+        ctx.fillStyle = 'rgba(0, 0, 0, 0.6)';
+        ctx.fillRect(5, 5, 220, lines.length * 16 + 8);
+        ctx.fillStyle = '#00c3ff';
+        ctx.font = '12px monospace';
+        lines.forEach((line, i) => ctx.fillText(line, 10, 20 + i * 16));
+    }
+    
+    function drawBitmap(bitmap, width, height) {
+        if (canvas.width !== width || canvas.height !== height) {
+            canvas.width = width;
+            canvas.height = height;
+        }
+        ctx.drawImage(bitmap, 0, 0);
+        drawTimingOverlay();
         cameraPlaceholder.style.display = 'none';
+    }
+    
+    async function decodeFrame(buffer, receivedAt) {
+        isDecoding = true;
         
-        // For demo purposes, we'll show a static image instead of a real stream
-        // In a real implementation, this would be replaced with actual WebRTC code
-        simulateCameraFeed(videoElement);
+        try {
+            const view = new DataView(buffer);
+            const sequence = view.getUint32(0);
+            const width = view.getUint16(12);
+            const height = view.getUint16(14);
+            const jpeg = new Blob([new Uint8Array(buffer, VIDEO_FRAME_HEADER_SIZE)], { type: 'image/jpeg' });
+            
+            const bitmap = await createImageBitmap(jpeg);
+            drawBitmap(bitmap, width, height);
+            bitmap.close();
+            acknowledgeFrame(sequence, receivedAt);
+        } catch (error) {
+            console.error('Error decoding video frame:', error);
+        }
+        
+        isDecoding = false;
         
-        console.log('Camera stream connected');
-    }, 2000);
+        // Continue with the newest frame that arrived while decoding
+        if (pendingFrame) {
+            const next = pendingFrame;
+            pendingFrame = null;
+            decodeFrame(next.buffer, next.receivedAt);
+        }
+    }
+    
+    videoSocket = io(API_CONFIG.socketUrl);
+    
+    videoSocket.on('connect', () => {
+        console.log(`Camera stream connected (${transport})`);
+        videoSocket.emit('request_video_stream', { transport: transport, adaptive: true });
+    });
+    
+    videoSocket.on('video_frame_binary', (buffer) => {
+        const receivedAt = performance.now();
+        if (isDecoding) {
+            pendingFrame = { buffer: buffer, receivedAt: receivedAt };
+        } else {
+            decodeFrame(buffer, receivedAt);
+        }
+    });
+    
+    videoSocket.on('video_frame', (data) => {
+        const receivedAt = performance.now();
+        const img = new Image();
+        img.onload = () => {
+            drawBitmap(img, img.width, img.height);
+            acknowledgeFrame(data.sequence, receivedAt);
+        };
+        img.src = `data:image/jpeg;base64,${data.frame}`;
+    });
+    
+    videoSocket.on('video_frame_timing', (data) => {
+        frameTiming = data;
+    });
+    
+    videoSocket.on('video_error', (data) => {
+        console.error('Video stream error:', data.error);
+    });
+    
+    // Toggle the per-frame latency overlay
+    const overlayButton = document.getElementById('latency-overlay-btn');
+    if (overlayButton) {
+        overlayButton.addEventListener('click', () => {
+            overlayEnabled = !overlayEnabled;
+            frameTiming = null;
+            overlayButton.classList.toggle('active', overlayEnabled);
+            videoSocket.emit('video_overlay', { enabled: overlayEnabled });
+        });
+    }
 }
 
 // Simulate camera feed with canvas animation for demonstration
@@ -226,19 +365,21 @@ function initCameraControls() {
     });
 }
 
-// Send camera control command to the API
+// Send camera control command, over the socket when connected
 async function sendCameraCommand(control, value) {
-    console.log(`Sending camera ${control} command: ${value}°`);
+    // Slider drags fire many events; the server keeps only the newest per servo tick
+    if (videoSocket && videoSocket.connected) {
+        videoSocket.emit('gimbal', { [control]: value });
+        return;
+    }
     
     try {
         const response = await callApi(API_CONFIG.endpoints.camera, 'POST', {
             control: control,
-            value: value
+            angle: value
         });
         
-        if (response.success) {
-            console.log('Camera command sent successfully');
-        } else {
+        if (!response.success) {
             console.error('Failed to send camera command:', response.error);
         }
     } catch (error) {
@@ -10,8 +10,18 @@
 
 import time
 import math
-import smbus
-from gpiozero import LED
+from contextlib import contextmanager
+
+# The bus and GPIO libraries only exist on the robot; without them a bus
+# object and LED class must be passed in (see modules/bus_backends.py)
+try:
+  import smbus
+except ImportError:
+  smbus = None
+try:
+  from gpiozero import LED
+except ImportError:
+  LED = None
 
 Dir = [
     'forward',
@@ -25,6 +35,7 @@ class PCA9685:
   __SUBADR2            = 0x03
   __SUBADR3            = 0x04
   __MODE1              = 0x00
+  __MODE1_AI           = 0x20     # Register auto-increment, needed for block writes
   __PRESCALE           = 0xFE
   __LED0_ON_L          = 0x06
   __LED0_ON_H          = 0x07
@@ -34,22 +45,98 @@ class PCA9685:
   __ALLLED_ON_H        = 0xFB
   __ALLLED_OFF_L       = 0xFC
   __ALLLED_OFF_H       = 0xFD
+
+  # Largest SMBus block transfer
+  BLOCK_MAX = 32
     
 
-  def __init__(self, address, debug=False):
-    self.bus = smbus.SMBus(1)
+  def __init__(self, address, debug=False, bus=None):
+    if bus is None:
+      if smbus is None:
+        raise ImportError("smbus is not available, pass a bus object")
+      bus = smbus.SMBus(1)
+    self.bus = bus
     self.address = address
     self.debug = debug
+    self.shadow = {}  # Shadow copies of the channel registers written to the chip
+    self.transactions = 0
+    self.registers_written = 0
+    self.registers_skipped = 0
+    self._batch = None
+    self.freq = None
     if (self.debug):
       print("Reseting PCA9685")
-    self.write(self.__MODE1, 0x00)
+    self.write(self.__MODE1, self.__MODE1_AI)
 
   def write(self, reg, value):
     "Writes an 8-bit value to the specified register/address"
     self.bus.write_byte_data(self.address, reg, value)
+    self.transactions += 1
+    self.registers_written += 1
     if (self.debug):
       print("I2C: Write 0x%02X to register 0x%02X" % (value, reg))
 
+  def writeBlock(self, reg, values):
+    "Writes consecutive registers starting at reg, in as few block transfers as possible"
+    for start in range(0, len(values), self.BLOCK_MAX):
+      chunk = list(values[start:start + self.BLOCK_MAX])
+      self.bus.write_i2c_block_data(self.address, reg + start, chunk)
+      self.transactions += 1
+      self.registers_written += len(chunk)
+      if (self.debug):
+        print("I2C: Write %d bytes from register 0x%02X" % (len(chunk), reg + start))
+
+  def writeCached(self, values):
+    "Writes channel registers ({register: value}) whose shadow copies differ, merging neighbours into block writes"
+    changed = sorted(reg for reg, value in values.items() if self.shadow.get(reg) != value)
+    self.registers_skipped += len(values) - len(changed)
+
+    # Group changed registers into runs; a gap can be bridged only with known values
+    runs = []
+    for reg in changed:
+      if runs and reg - runs[-1][0] < self.BLOCK_MAX and \
+          all(r in values or r in self.shadow for r in range(runs[-1][-1] + 1, reg)):
+        runs[-1].extend(range(runs[-1][-1] + 1, reg + 1))
+      else:
+        runs.append([reg])
+
+    for run in runs:
+      data = [values[r] if r in values else self.shadow[r] for r in run]
+      # Forget the registers first so a failed write is retried next time
+      for r in run:
+        self.shadow.pop(r, None)
+      if len(run) == 1:
+        self.write(run[0], data[0])
+      else:
+        self.writeBlock(run[0], data)
+      self.shadow.update(zip(run, data))
+
+  @contextmanager
+  def batch(self):
+    "Collects setPWM calls and writes them together when the block exits"
+    if self._batch is not None:
+      yield
+      return
+    self._batch = {}
+    try:
+      yield
+    finally:
+      pending, self._batch = self._batch, None
+      self.setPWMs(pending)
+
+  def invalidateShadow(self):
+    "Forgets the shadow copies, e.g. after a chip reset, so the next writes go to the bus"
+    self.shadow.clear()
+
+  def getStats(self):
+    "Returns the issued and skipped I2C write counters"
+    return {
+      "transactions": self.transactions,
+      "registers_written": self.registers_written,
+      "registers_skipped": self.registers_skipped,
+      "shadowed_registers": len(self.shadow)
+    }
+
   def read(self, reg):
     "Read an unsigned byte from the I2C device"
     result = self.bus.read_byte_data(self.address, reg)
@@ -77,16 +164,38 @@ class PCA9685:
     self.write(self.__MODE1, oldmode)
     time.sleep(0.005)
     self.write(self.__MODE1, oldmode | 0x80)
+    self.freq = freq
+    self.invalidateShadow()
+
+  def resync(self):
+    "Re-initialises the chip, e.g. after a brownout reset it, and rewrites the last known channel registers"
+    values = dict(self.shadow)
+    self.invalidateShadow()
+    self.write(self.__MODE1, self.__MODE1_AI)
+    if self.freq is not None:
+      self.setPWMFreq(self.freq)
+    self.writeCached(values)
 
   def setPWM(self, channel, on, off):
     "Sets a single PWM channel"
-    self.write(self.__LED0_ON_L + 4*channel, on & 0xFF)
-    self.write(self.__LED0_ON_H + 4*channel, on >> 8)
-    self.write(self.__LED0_OFF_L + 4*channel, off & 0xFF)
-    self.write(self.__LED0_OFF_H + 4*channel, off >> 8)
+    if self._batch is not None:
+      self._batch[channel] = (on, off)
+      return
+    self.setPWMs({channel: (on, off)})
     if (self.debug):
       print("channel: %d  LED_ON: %d LED_OFF: %d" % (channel,on,off))
 
+  def setPWMs(self, channels):
+    "Sets several PWM channels ({channel: (on, off)}) with auto-increment block writes"
+    values = {}
+    for channel, (on, off) in channels.items():
+      reg = self.__LED0_ON_L + 4*channel
+      values[reg] = on & 0xFF
+      values[reg + 1] = on >> 8
+      values[reg + 2] = off & 0xFF
+      values[reg + 3] = off >> 8
+    self.writeCached(values)
+
   def setDutycycle(self, channel, pulse):
     self.setPWM(channel, 0, int(pulse * (4096 / 100)))
 
@@ -101,7 +210,8 @@ class PCA9685:
 
 # 控制机器人库
 class LOBOROBOT():
-    def __init__(self):
+    # bus: object with the smbus interface, led: class with the gpiozero LED interface
+    def __init__(self, bus=None, led=None):
         self.PWMA = 0
         self.AIN1 = 2
         self.AIN2 = 1
@@ -118,10 +228,13 @@ class LOBOROBOT():
         self.DIN1 = 25        # GPIO口
         self.DIN2 = 24        # GPIO口
         
-        self.pwm = PCA9685(0x40, debug=False)
+        self.pwm = PCA9685(0x40, debug=False, bus=bus)
         self.pwm.setPWMFreq(50)
-        self.motorD1 = LED(self.DIN1)  # 方向口1，设置为输出模式为LED类型
-        self.motorD2 = LED(self.DIN2)  # 方向口2，设置为输出模式为LED类型
+        led = led or LED
+        if led is None:
+            raise ImportError("gpiozero is not available, pass an LED class")
+        self.motorD1 = led(self.DIN1)  # 方向口1，设置为输出模式为LED类型
+        self.motorD2 = led(self.DIN2)  # 方向口2，设置为输出模式为LED类型
 
     def MotorRun(self, motor, index, speed):
         if speed > 100:
@@ -174,90 +287,101 @@ class LOBOROBOT():
             self.pwm.setDutycycle(self.PWMD, 0)
     # 前进
     def t_up(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorRun(3,'forward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'forward',speed)
+            self.MotorRun(1,'forward',speed)
+            self.MotorRun(2,'forward',speed)
+            self.MotorRun(3,'forward',speed)
         time.sleep(t_time)
     #后退
     def t_down(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorRun(3,'backward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'backward',speed)
+            self.MotorRun(1,'backward',speed)
+            self.MotorRun(2,'backward',speed)
+            self.MotorRun(3,'backward',speed)
         time.sleep(t_time)
 
     # 左移
     def moveLeft(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorRun(3,'backward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'backward',speed)
+            self.MotorRun(1,'forward',speed)
+            self.MotorRun(2,'forward',speed)
+            self.MotorRun(3,'backward',speed)
         time.sleep(t_time)
 
     #右移
     def moveRight(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorRun(3,'forward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'forward',speed)
+            self.MotorRun(1,'backward',speed)
+            self.MotorRun(2,'backward',speed)
+            self.MotorRun(3,'forward',speed)
         time.sleep(t_time)
 
     # 左转
     def turnLeft(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorRun(3,'forward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'backward',speed)
+            self.MotorRun(1,'forward',speed)
+            self.MotorRun(2,'backward',speed)
+            self.MotorRun(3,'forward',speed)
         time.sleep(t_time)
     
     # 右转
     def turnRight(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorRun(3,'backward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'forward',speed)
+            self.MotorRun(1,'backward',speed)
+            self.MotorRun(2,'forward',speed)
+            self.MotorRun(3,'backward',speed)
         time.sleep(t_time)
     
     # 前左斜
     def forward_Left(self,speed,t_time):
-        self.MotorStop(0)
-        self.MotorRun(1,'forward',speed)
-        self.MotorRun(2,'forward',speed)
-        self.MotorStop(0)
+        with self.pwm.batch():
+            self.MotorStop(0)
+            self.MotorRun(1,'forward',speed)
+            self.MotorRun(2,'forward',speed)
+            self.MotorStop(0)
         time.sleep(t_time)
 
     # 前右斜
     def forward_Right(self,speed,t_time):
-        self.MotorRun(0,'forward',speed)
-        self.MotorStop(1)
-        self.MotorStop(2)
-        self.MotorRun(3,'forward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'forward',speed)
+            self.MotorStop(1)
+            self.MotorStop(2)
+            self.MotorRun(3,'forward',speed)
         time.sleep(t_time)
 
     # 后左斜
     def backward_Left(self,speed,t_time):
-        self.MotorRun(0,'backward',speed)
-        self.MotorStop(1)
-        self.MotorStop(2)
-        self.MotorRun(3,'backward',speed)
+        with self.pwm.batch():
+            self.MotorRun(0,'backward',speed)
+            self.MotorStop(1)
+            self.MotorStop(2)
+            self.MotorRun(3,'backward',speed)
         time.sleep(t_time)
     
     # 后右斜
     def backward_Right(self,speed,t_time):
-        self.MotorStop(0)
-        self.MotorRun(1,'backward',speed)
-        self.MotorRun(2,'backward',speed)
-        self.MotorStop(3)
+        with self.pwm.batch():
+            self.MotorStop(0)
+            self.MotorRun(1,'backward',speed)
+            self.MotorRun(2,'backward',speed)
+            self.MotorStop(3)
         time.sleep(t_time)
 
 
     # 停止
     def t_stop(self,t_time):
-        self.MotorStop(0)
-        self.MotorStop(1)
-        self.MotorStop(2)
-        self.MotorStop(3)
+        with self.pwm.batch():
+            self.MotorStop(0)
+            self.MotorStop(1)
+            self.MotorStop(2)
+            self.MotorStop(3)
         time.sleep(t_time)
 
         # 辅助功能，使设置舵机脉冲宽度更简单。
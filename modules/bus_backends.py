@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Simulated Bus Backends Module
+
+import logging
+import time
+import threading
+from collections import deque, namedtuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# I2C clock in Hz (standard mode; the Raspberry Pi default)
+DEFAULT_BUS_SPEED = 100000
+
+# Fixed cost of one transaction outside the wire time: the kernel ioctl and
+# the adapter's setup, measured at roughly 50 us on a Raspberry Pi
+DEFAULT_TRANSACTION_OVERHEAD = 0.00005
+
+# Largest SMBus block transfer
+SMBUS_BLOCK_MAX = 32
+
+# Transactions kept for inspection
+DEFAULT_RECORD_LIMIT = 10000
+
+# One recorded bus transaction: simulated duration in seconds, register
+# values as a tuple (one value for a byte write, several for a block)
+BusTransaction = namedtuple('BusTransaction', ['timestamp', 'kind', 'address', 'register', 'data', 'duration'])
+
+class SimulatedSMBus:
+    """
+    Drop-in replacement for smbus.SMBus that records every transaction
+
+    Register writes are stored per device, with PCA9685-style address
+    auto-increment for block writes, so reads return what was written.
+    Each transaction is charged its wire time at the configured clock (9
+    clock cycles per byte plus start and stop) and a fixed overhead. With
+    realtime enabled the caller is also delayed by that time, so load tests
+    see the bus as a bottleneck.
+    """
+
+    def __init__(self, bus_speed=DEFAULT_BUS_SPEED, transaction_overhead=DEFAULT_TRANSACTION_OVERHEAD,
+                 realtime=False, record_limit=DEFAULT_RECORD_LIMIT):
+        """
+        Initialize the simulated bus
+
+        Args:
+            bus_speed (int): I2C clock in Hz
+            transaction_overhead (float): Fixed cost of each transaction in seconds
+            realtime (bool): Sleep for the simulated duration of each transaction
+            record_limit (int): Most recent transactions kept in the record
+        """
+        self.bus_speed = bus_speed
+        self.transaction_overhead = transaction_overhead
+        self.realtime = realtime
+
+        self.registers = {}  # (address, register) -> value
+        self.records = deque(maxlen=record_limit)
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.transactions = 0
+        self.bytes_transferred = 0
+        self.bus_time = 0.0
+
+    def _transaction(self, kind, address, register, data, wire_bytes):
+        """Record one transaction and charge its simulated time"""
+        # Start bit, 9 clocks per byte (8 data bits and the ACK), stop bit
+        duration = (2 + 9 * wire_bytes) / self.bus_speed + self.transaction_overhead
+
+        with self._lock:
+            self.transactions += 1
+            self.bytes_transferred += wire_bytes
+            self.bus_time += duration
+            self.records.append(BusTransaction(time.time(), kind, address, register, tuple(data), duration))
+
+        if self.realtime:
+            time.sleep(duration)
+
+    def write_byte_data(self, address, register, value):
+        """Write one register (address byte, register byte, value)"""
+        self.registers[(address, register)] = value & 0xFF
+        self._transaction('write_byte', address, register, [value], 3)
+
+    def write_i2c_block_data(self, address, register, data):
+        """Write consecutive registers starting at register"""
+        if len(data) > SMBUS_BLOCK_MAX:
+            raise OverflowError(f"SMBus block transfers are limited to {SMBUS_BLOCK_MAX} bytes")
+
+        for offset, value in enumerate(data):
+            self.registers[(address, register + offset)] = value & 0xFF
+        self._transaction('write_block', address, register, data, 2 + len(data))
+
+    def read_byte_data(self, address, register):
+        """Read one register (write the register byte, repeated start, read the value)"""
+        value = self.registers.get((address, register), 0)
+        self._transaction('read_byte', address, register, [value], 4)
+        return value
+
+    def reset_stats(self):
+        """Clear the counters and the transaction record, keeping the register contents"""
+        with self._lock:
+            self.transactions = 0
+            self.bytes_transferred = 0
+            self.bus_time = 0.0
+            self.records.clear()
+
+    def get_stats(self):
+        """
+        Get simulated bus statistics
+
+        Returns:
+            dict: Bus speed, transaction and byte counters, and simulated bus time
+        """
+        return {
+            "bus_speed": self.bus_speed,
+            "transactions": self.transactions,
+            "bytes": self.bytes_transferred,
+            "bus_time": self.bus_time
+        }
+
+class SimulatedLED:
+    """
+    Drop-in replacement for gpiozero.LED used for the motor direction pins
+    """
+
+    def __init__(self, pin):
+        """
+        Initialize the simulated output pin
+
+        Args:
+            pin (int): GPIO pin number
+        """
+        self.pin = pin
+        self.is_lit = False
+        self.changes = 0
+
+    def on(self):
+        """Drive the pin high"""
+        if not self.is_lit:
+            self.changes += 1
+        self.is_lit = True
+
+    def off(self):
+        """Drive the pin low"""
+        if self.is_lit:
+            self.changes += 1
+        self.is_lit = False
+
+    @property
+    def value(self):
+        """Pin level as 0 or 1"""
+        return int(self.is_lit)
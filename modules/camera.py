@@ -5,35 +5,53 @@ import logging
 import time
 import threading
 import numpy as np
-from datetime import datetime
 import os
 import base64
 import json
 import io
-from PIL import Image, ImageDraw, ImageFont
-
-try:
-    # Import libcamera for Raspberry Pi camera
-    from picamera2 import Picamera2
-    from libcamera import Transform
-    # Import LOBOROBOT for servo control
-    from modules.LOBOROBOT import LOBOROBOT
-    HARDWARE_AVAILABLE = True
-except ImportError:
-    HARDWARE_AVAILABLE = False
-    logging.warning("libcamera or LOBOROBOT libraries not available, running in simulation mode")
+from collections import namedtuple
+from PIL import Image, ImageFont
+from modules.frame_ring import FrameRing
+from modules.frame_bus import FrameBus, DEFAULT_BUS_NAME, LORES_SUFFIX
+from modules.recorder import VideoRecorder, RECORDINGS_DIR
+from modules.pipeline import FramePipeline
+from modules.gimbal import GimbalMotionEngine
+from modules.camera_backends import create_camera_backend
+from modules.hardware import get_device_manager
+from modules.workers import run_in_worker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# An encoded camera frame together with the metadata needed to display it
+# and the encode start/end times used for latency instrumentation
+EncodedFrame = namedtuple('EncodedFrame', ['sequence', 'timestamp', 'width', 'height', 'jpeg', 'encode_start', 'encode_end'])
+
+# Built-in frame pipeline stages, in the order they run, and their budgets in milliseconds
+DETECTION_STAGE = 'detection'
+TRACKING_STAGE = 'tracking'
+OVERLAY_STAGE = 'overlay'
+DETECTION_BUDGET_MS = 15
+TRACKING_BUDGET_MS = 1
+OVERLAY_BUDGET_MS = 2
+
+OVERLAY_COLOR = (255, 160, 0)  # Sheikah orange
+
 class ServoControl:
     """
     Controls the servo angles for camera pan and tilt
     """
-    def __init__(self):
+    def __init__(self, field_of_view=(62.2, 48.8)):
+        """
+        Initialize servo control
+        
+        Args:
+            field_of_view (tuple): Camera field of view as (horizontal, vertical) degrees
+        """
         self.pan = 90  # Initial pan angle (center position)
         self.tilt = -5  # Initial tilt angle (slightly up)
+        self.field_of_view = field_of_view
         
     def calculate_servo_angles(self, object_center_x, object_center_y, frame_width, frame_height):
         """
@@ -52,9 +70,9 @@ class ServoControl:
         error_pan = object_center_x - frame_width // 2
         error_tilt = object_center_y - frame_height // 2
         
-        # Adjust servo angles based on deviation
-        pan_adjustment = error_pan / 75
-        tilt_adjustment = error_tilt / 75
+        # Convert the deviation to the angle between the object and the image centre
+        pan_adjustment = error_pan * self.field_of_view[0] / frame_width
+        tilt_adjustment = error_tilt * self.field_of_view[1] / frame_height
 
         new_pan = self.pan - pan_adjustment
         new_tilt = self.tilt - tilt_adjustment
@@ -74,17 +92,50 @@ class CameraController:
     Controls the camera gimbal and video streaming using libcamera
     """
     
-    def __init__(self):
-        """Initialize the camera controller"""
+    def __init__(self, resolution=(640, 480), framerate=30, backend=None, hardware=None):
+        """
+        Initialize the camera controller
+        
+        Args:
+            resolution (tuple): Frame size as (width, height), e.g. (1920, 1080) for load testing
+            framerate (int): Target frames per second
+            backend (CameraBackend): Camera backend to capture from (defaults to the best available)
+            hardware (DeviceManager): Device manager owning the servo driver (defaults to the process-wide one)
+        """
         logger.info("Initializing Camera Controller with libcamera")
-        global HARDWARE_AVAILABLE
         # Camera settings
-        self.resolution = (640, 480)
-        self.framerate = 30
-        self.camera = None
+        self.resolution = tuple(resolution)
+        self.framerate = framerate
         self.is_streaming = False
         self.stream_thread = None
-        self.frame_buffer = None
+        
+        # Rings of recent frames, each tagged with a sequence number and capture time
+        self.frame_ring = FrameRing(capacity=4)
+        self.lores_ring = FrameRing(capacity=4)
+        
+        # Processing stages run on every captured frame before it is published
+        self.pipeline = FramePipeline(framerate)
+        self.detector = None  # Detector run by the detection stage
+        self.on_detection = None  # Called by the tracking stage for every frame
+        self.last_detection = None  # (detection, (width, height) of the detected frame)
+        self._register_stages()
+        
+        # Optional shared-memory copies of the rings for other processes
+        self.frame_bus = None
+        self.lores_bus = None
+        self._bus_lock = threading.Lock()
+        
+        # Recording of encoded frames to disk (created when recording starts)
+        self.recorder = None
+        
+        # Cache of encoded frames keyed by (sequence, quality, size) so each
+        # variant of a frame is encoded only once
+        self.jpeg_quality = 75  # Default JPEG quality
+        self._encoded_frames = {}
+        self._encoded_cache_size = 8
+        self._pending_encodes = {}  # (sequence, quality, size) -> Event set when the encode is done
+        self._encode_lock = threading.Lock()
+        self._backend_jpeg = (None, None)  # (sequence, jpeg) handed out by the backend
         
         # Initialize servo control
         self.servo_control = ServoControl()
@@ -93,95 +144,114 @@ class CameraController:
         self.pan_angle = self.servo_control.pan  # Initial pan angle from ServoControl
         self.tilt_angle = self.servo_control.tilt  # Initial tilt angle from ServoControl
         
-        # Initialize hardware if available
-        if HARDWARE_AVAILABLE:
+        # Initialize servo hardware if available; the LOBOROBOT instance is
+        # shared with the motors through the device manager
+        self.hardware = hardware or get_device_manager()
+        self.robot = self.hardware.robot
+        if self.hardware.available:
             try:
-                # Initialize LOBOROBOT for servo control
-                self.robot = LOBOROBOT()
-                
-                # Initialize libcamera
-                self.camera = Picamera2()
-                config = self.camera.create_still_configuration(
-                    main={"size": self.resolution, "format": "RGB888"},
-                    transform=Transform(hflip=True, vflip=True)  # Flip if needed
-                )
-                self.camera.configure(config)
-                self.camera.start()
-                
                 # Center the gimbal using initial values from ServoControl
-                self.set_gimbal_angle('pan', self.pan_angle)
-                self.set_gimbal_angle('tilt', self.tilt_angle)
+                self._write_servo('pan', self.pan_angle)
+                self._write_servo('tilt', self.tilt_angle)
                 
-                logger.info("Camera hardware initialized successfully")
+                logger.info("Servo hardware initialized successfully")
             except Exception as e:
-                logger.error(f"Failed to initialize camera hardware: {e}")
-                HARDWARE_AVAILABLE = False
+                logger.error(f"Failed to initialize servo hardware: {e}")
+        
+        # Move the servos smoothly toward target angles at a fixed update rate
+        self.gimbal = GimbalMotionEngine(self._write_servo, {'pan': self.pan_angle, 'tilt': self.tilt_angle})
+        self.gimbal.start()
         
-        # Initialize simulation camera if hardware not available
-        if not HARDWARE_AVAILABLE:
-            self._init_simulation_camera()
+        # Initialize the camera backend (Picamera2 if available, simulation otherwise)
+        self.backend = backend or create_camera_backend(
+            self.resolution,
+            self.framerate,
+            hud_text=lambda: f"Pan: {self.pan_angle}°, Tilt: {self.tilt_angle}°"
+        )
+        logger.info(f"Using {self.backend.name} camera backend")
+    
+    def _register_stages(self):
+        """Register the built-in pipeline stages, disabled until a detector or the overlay is wanted"""
+        self.pipeline.add_stage(DETECTION_STAGE, self._detection_stage, DETECTION_BUDGET_MS,
+                                optional=True, modifies_frame=False)
+        self.pipeline.add_stage(TRACKING_STAGE, self._tracking_stage, TRACKING_BUDGET_MS,
+                                modifies_frame=False, offload=False)
+        self.pipeline.add_stage(OVERLAY_STAGE, self._overlay_stage, OVERLAY_BUDGET_MS,
+                                optional=True, offload=False)
+        for name in (DETECTION_STAGE, TRACKING_STAGE, OVERLAY_STAGE):
+            self.pipeline.set_enabled(name, False)
     
-    def _init_simulation_camera(self):
-        """Initialize a simulated camera for testing"""
-        logger.info("Initializing simulation camera")
+    def set_detector(self, detector, on_detection=None):
+        """
+        Attach a detector to the detection and tracking stages
+        
+        Args:
+            detector: Object with detect(data) -> Detection or None, or None to detach
+            on_detection (callable): Called by the tracking stage with the pipeline context of every frame
+        """
+        self.detector = detector
+        self.on_detection = on_detection
+        self.last_detection = None
+        self.pipeline.set_enabled(DETECTION_STAGE, detector is not None)
+        self.pipeline.set_enabled(TRACKING_STAGE, detector is not None and on_detection is not None)
+    
+    def _detection_stage(self, data, context):
+        """Pipeline stage: run the detector, on the lores frame when there is one"""
+        detector = self.detector
+        if detector is None:
+            return None
         
-        # Create a blank frame for simulation
-        self.frame_buffer = np.zeros((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
+        # Detection cost scales with pixels
+        frame = context.get("lores")
+        if frame is None:
+            frame = data
+        height, width = frame.shape[:2]
         
-        # Start a thread to update the simulated camera frame
-        self.sim_thread = threading.Thread(target=self._update_simulation, daemon=True)
-        self.sim_thread.start()
+        detection = detector.detect(frame)
+        context["detection"] = detection
+        context["detection_size"] = (width, height)
+        self.last_detection = (detection, (width, height))
+        return None
     
-    def _update_simulation(self):
-        """Update the simulated camera frame"""
-        while True:
-            # Create a simulated frame with a grid pattern
-            frame = np.zeros((self.resolution[1], self.resolution[0], 3), dtype=np.uint8)
-            
-            # Add grid lines
-            grid_size = 20
-            color = (0, 100, 200)  # Sheikah blue color
-            
-            # Horizontal grid lines
-            for y in range(0, self.resolution[1], grid_size):
-                for x in range(self.resolution[0]):
-                    if x < self.resolution[0]:
-                        frame[y, x] = color
-            
-            # Vertical grid lines
-            for x in range(0, self.resolution[0], grid_size):
-                for y in range(self.resolution[1]):
-                    if y < self.resolution[1]:
-                        frame[y, x] = color
-            
-            # Convert to PIL Image for text drawing
-            pil_img = Image.fromarray(frame)
-            draw = ImageDraw.Draw(pil_img)
-            
-            # Add timestamp
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            draw.text((10, 30), timestamp, fill=(255, 255, 255))
-            
-            # Add pan/tilt angles
-            angle_text = f"Pan: {self.pan_angle}°, Tilt: {self.tilt_angle}°"
-            draw.text((10, self.resolution[1] - 30), angle_text, fill=(255, 255, 255))
-            
-            # Add Sheikah eye in the center
-            center_x, center_y = self.resolution[0] // 2, self.resolution[1] // 2
-            radius = 40
-            draw.ellipse((center_x - radius, center_y - radius, center_x + radius, center_y + radius), outline=color)
-            draw.ellipse((center_x - radius//3, center_y - radius//3, center_x + radius//3, center_y + radius//3), outline=color)
-            draw.line((center_x, center_y - radius//3, center_x, center_y - radius), fill=color)
-            
-            # Convert back to numpy array
-            self.frame_buffer = np.array(pil_img)
-            
-            # Sleep to simulate framerate
-            time.sleep(1 / self.framerate)
+    def _tracking_stage(self, data, context):
+        """Pipeline stage: hand this frame's detection (missing if detection was skipped) to the tracker"""
+        on_detection = self.on_detection
+        if on_detection is not None:
+            on_detection(context)
+        return None
+    
+    def _overlay_stage(self, data, context):
+        """Pipeline stage: draw a centre crosshair and a box around the last detected target"""
+        if not data.flags.writeable:
+            data = data.copy()
+        height, width = data.shape[:2]
+        
+        center_x, center_y = width // 2, height // 2
+        data[center_y, max(center_x - 10, 0):center_x + 11] = OVERLAY_COLOR
+        data[max(center_y - 10, 0):center_y + 11, center_x] = OVERLAY_COLOR
+        
+        if self.last_detection is not None and self.last_detection[0] is not None:
+            detection, (detected_width, detected_height) = self.last_detection
+            # Scale the box from the detected (lores) frame to this frame
+            x0, y0, x1, y1 = detection.bbox
+            x0 = min(int(x0 * width / detected_width), width - 1)
+            x1 = max(min(int(x1 * width / detected_width), width) - 1, x0)
+            y0 = min(int(y0 * height / detected_height), height - 1)
+            y1 = max(min(int(y1 * height / detected_height), height) - 1, y0)
+            data[y0, x0:x1 + 1] = OVERLAY_COLOR
+            data[y1, x0:x1 + 1] = OVERLAY_COLOR
+            data[y0:y1 + 1, x0] = OVERLAY_COLOR
+            data[y0:y1 + 1, x1] = OVERLAY_COLOR
+        
+        return data
     
     def set_gimbal_angle(self, control, angle):
         """
-        Set the gimbal angle for pan or tilt using LOBOROBOT servo control
+        Set the target gimbal angle for pan or tilt
+        
+        The gimbal motion engine moves the servo to the target smoothly, so
+        this returns immediately and can be called at any rate; commands
+        faster than the engine update rate are coalesced.
         
         Args:
             control (str): 'pan' or 'tilt'
@@ -192,31 +262,43 @@ class CameraController:
         Returns:
             bool: Success status
         """
-        logger.info(f"Setting {control} angle to {angle} degrees")
+        logger.debug(f"Setting {control} angle to {angle} degrees")
         
-        # Validate control type
-        if control not in ['pan', 'tilt']:
-            logger.error(f"Invalid control: {control}")
+        # The motion engine validates the command against the ServoControl
+        # limits and keeps only the newest command per axis
+        if not self.gimbal.set_target(control, angle):
+            logger.warning(f"Invalid gimbal command: {control} {angle}")
             return False
         
-        # Validate angle range based on ServoControl limits
-        if control == 'pan' and not 0 <= angle <= 180:
-            logger.error(f"Pan angle out of range: {angle}")
-            return False
-        elif control == 'tilt' and not -5 <= angle <= 30:
-            logger.error(f"Tilt angle out of range: {angle}")
-            return False
+        # Update the target angle
+        if control == 'pan':
+            self.servo_control.pan = angle
+        else:
+            self.servo_control.tilt = angle
+        
+        return True
+    
+    def _write_servo(self, control, angle):
+        """
+        Move a gimbal servo to an angle using LOBOROBOT servo control
+        
+        Called by the gimbal motion engine at its update rate.
+        
+        Args:
+            control (str): 'pan' or 'tilt'
+            angle (float): Angle in degrees
         
+        Returns:
+            bool: Success status
+        """
         # Update current angle
         if control == 'pan':
             self.pan_angle = angle
-            self.servo_control.pan = angle
         else:
             self.tilt_angle = angle
-            self.servo_control.tilt = angle
         
         # Set servo position if hardware is available
-        if HARDWARE_AVAILABLE:
+        if self.hardware.available:
             try:
                 # Map angle to servo channel and position
                 # Assuming channel 0 for pan and channel 1 for tilt
@@ -232,7 +314,7 @@ class CameraController:
                     servo_angle = ((angle - (-5)) / 35) * 35 + 85
                 
                 # Set servo angle using LOBOROBOT
-                self.robot.set_servo_angle(channel, servo_angle)
+                self.hardware.execute(self.robot.set_servo_angle, channel, servo_angle)
                 
                 logger.debug(f"Set {control} servo to {servo_angle} degrees")
                 return True
@@ -241,9 +323,30 @@ class CameraController:
                 return False
         else:
             # In simulation mode, just update the angle
-            logger.info(f"Simulation: Set {control} angle to {angle} degrees")
+            logger.debug(f"Simulation: Set {control} angle to {angle} degrees")
             return True
     
+    def get_gimbal_state(self):
+        """
+        Get the gimbal motion state
+        
+        Returns:
+            dict: Per-axis position, target and velocity, and command and servo write counters
+        """
+        return self.gimbal.get_state()
+    
+    def get_gimbal_position(self):
+        """
+        Get where the gimbal is now, which lags the target while it moves
+        
+        Returns:
+            dict: Current pan and tilt angles in degrees
+        """
+        return {
+            "pan": self.gimbal.get_position('pan'),
+            "tilt": self.gimbal.get_position('tilt')
+        }
+    
     def track_object(self, object_center_x, object_center_y):
         """
         Track an object by adjusting the camera gimbal
@@ -255,6 +358,11 @@ class CameraController:
         Returns:
             bool: Success status
         """
+        # Aim from where the gimbal is now, not from where it was last told to go
+        position = self.get_gimbal_position()
+        self.servo_control.pan = position['pan']
+        self.servo_control.tilt = position['tilt']
+        
         # Calculate new servo angles
         new_pan, new_tilt = self.servo_control.calculate_servo_angles(
             object_center_x, 
@@ -276,6 +384,7 @@ class CameraController:
             return False
         
         logger.info("Starting video streaming")
+        self.backend.start()
         self.is_streaming = True
         
         # Start streaming thread
@@ -298,6 +407,9 @@ class CameraController:
             self.stream_thread.join(timeout=1.0)
             self.stream_thread = None
         
+        # Stop the camera so it does not capture without viewers
+        self.backend.stop()
+        
         return True
     
     def _stream_video(self):
@@ -306,55 +418,322 @@ class CameraController:
         
         while self.is_streaming:
             try:
-                if HARDWARE_AVAILABLE and self.camera:
-                    # Capture frame from libcamera
-                    frame = self.camera.capture_array()
-                else:
-                    # Use simulated frame
-                    frame = self.frame_buffer.copy()
+                # Capture the next frame (blocks until the backend has one ready)
+                capture = self.backend.capture()
+                capture_time = time.time()
+                data, jpeg = capture.data, capture.jpeg
                 
-                # Process frame here if needed (e.g., add overlays, apply filters)
+                # Run the processing stages (detection, tracking, overlays, ...);
+                # the frame gets the next sequence number of the ring
+                if self.pipeline.stages:
+                    context = {"lores": capture.lores, "sequence": self.frame_ring.sequence + 1}
+                    data, modified = self.pipeline.process(data, capture_time, context)
+                    if modified:
+                        # The camera-encoded JPEG no longer matches the pixels
+                        jpeg = None
                 
-                # Update the frame buffer
-                self.frame_buffer = frame
+                # Publish the frame to the rings, waking up waiting consumers
+                sequence = self.frame_ring.publish(data, capture_time)
+                if capture.lores is not None:
+                    self.lores_ring.publish(capture.lores, capture_time)
+                if jpeg is not None:
+                    self._backend_jpeg = (sequence, jpeg)
                 
-                # Sleep to maintain framerate
-                time.sleep(1 / self.framerate)
+                # Share the frame with other processes under the same sequence number
+                with self._bus_lock:
+                    if self.frame_bus is not None:
+                        self.frame_bus.publish(data, capture_time, sequence)
+                        if self.lores_bus is not None and capture.lores is not None:
+                            self.lores_bus.publish(capture.lores, capture_time, sequence)
             except Exception as e:
                 logger.error(f"Error in video streaming: {e}")
+                time.sleep(0.1)
+    
+    def enable_frame_bus(self, name=DEFAULT_BUS_NAME, capacity=4):
+        """
+        Publish frames to shared memory for consumers in other processes
+        
+        The main stream is published as `name` and the low-resolution stream
+        as `name` + '_lores'. Frames keep the sequence numbers of the
+        in-process rings.
+        
+        Args:
+            name (str): Shared memory name of the main stream bus
+            capacity (int): Number of frame slots per bus
+            
+        Returns:
+            bool: True if the bus was created
+        """
+        if self.frame_bus is not None:
+            logger.warning("Frame bus is already enabled")
+            return False
+        
+        width, height = self.resolution
+        try:
+            self.frame_bus = FrameBus(name, (height, width, 3), np.uint8, capacity)
+            if self.backend.lores_resolution:
+                lores_width, lores_height = self.backend.lores_resolution
+                self.lores_bus = FrameBus(name + LORES_SUFFIX, (lores_height, lores_width, 3), np.uint8, capacity)
+        except Exception as e:
+            logger.error(f"Failed to create frame bus: {e}")
+            self.disable_frame_bus()
+            return False
+        
+        return True
+    
+    def disable_frame_bus(self):
+        """
+        Stop publishing frames to shared memory and release it
+        
+        Returns:
+            bool: True if the bus was enabled
+        """
+        with self._bus_lock:
+            if self.frame_bus is None:
+                return False
+            
+            self.frame_bus.close()
+            if self.lores_bus is not None:
+                self.lores_bus.close()
+            self.frame_bus = None
+            self.lores_bus = None
+        
+        return True
+    
+    def get_frame_bus_info(self):
+        """
+        Get the shared memory names and layout readers need
+        
+        Returns:
+            dict: Bus names, frame shapes and current sequence, or enabled=False
+        """
+        if self.frame_bus is None:
+            return {"enabled": False}
+        
+        info = {
+            "enabled": True,
+            "name": self.frame_bus.name,
+            "shape": list(self.frame_bus.shape),
+            "dtype": self.frame_bus.dtype.name,
+            "capacity": self.frame_bus.capacity,
+            "sequence": self.frame_bus.sequence
+        }
+        if self.lores_bus is not None:
+            info["lores_name"] = self.lores_bus.name
+            info["lores_shape"] = list(self.lores_bus.shape)
+        return info
+    
+    @property
+    def is_recording(self):
+        """Whether a recording session is active"""
+        return self.recorder is not None and self.recorder.is_recording
+    
+    def start_recording(self, directory=RECORDINGS_DIR, segment_seconds=60, name=None):
+        """
+        Start recording encoded frames to time-segmented files
+        
+        Frames are only captured while streaming is active; the caller keeps
+        the camera running for the length of the recording.
+        
+        Args:
+            directory (str): Directory holding recording sessions
+            segment_seconds (float): Length of each segment file in seconds
+            name (str): Session name (defaults to the start time)
+            
+        Returns:
+            bool: True if recording started
+            
+        Raises:
+            FileExistsError: If a session with the given name already exists
+        """
+        if self.is_recording:
+            logger.warning("Recording is already active")
+            return False
+        
+        self.recorder = VideoRecorder(self, directory, segment_seconds)
+        return self.recorder.start(name)
+    
+    def stop_recording(self):
+        """
+        Stop the active recording session
+        
+        Returns:
+            bool: True if a recording was stopped
+        """
+        if not self.is_recording:
+            logger.warning("Recording is not active")
+            return False
+        
+        return self.recorder.stop()
+    
+    def get_recording_stats(self):
+        """
+        Get statistics of the current or last recording session
+        
+        Returns:
+            dict: Recording statistics
+        """
+        if self.recorder is None:
+            return {"is_recording": False}
+        return self.recorder.get_stats()
+    
+    @property
+    def frame_buffer(self):
+        """The newest frame as a numpy array (read-only)"""
+        frame = self.frame_ring.latest()
+        if frame is None:
+            return None
+        return frame.data
+    
+    @property
+    def frame_sequence(self):
+        """Sequence number of the newest frame (0 before the first frame)"""
+        return self.frame_ring.sequence
     
     def get_current_frame(self):
         """Get the current frame as a numpy array"""
         return self.frame_buffer
     
-    def get_frame_base64(self):
-        """Get the current frame as a base64 encoded JPEG string"""
-        if self.frame_buffer is None:
-            return None
+    def wait_for_frame(self, after_sequence=None, timeout=None):
+        """
+        Wait for a frame newer than a given sequence number
         
-        try:
-            # Convert numpy array to PIL Image
-            img = Image.fromarray(self.frame_buffer)
+        Slow consumers always get the newest frame and skip the ones in between.
+        
+        Args:
+            after_sequence (int): Last sequence the caller has handled (None for any frame)
+            timeout (float): Maximum time to wait in seconds
+        
+        Returns:
+            Frame: Newest frame, or None if no newer frame arrived in time
+        """
+        return self.frame_ring.wait_for_frame(after_sequence, timeout)
+    
+    def get_encoded_frame(self, frame=None, quality=None, size=None):
+        """
+        Get a frame as JPEG, encoding each variant at most once
+        
+        Every caller asking for the same (sequence, quality, size) shares one
+        encode, so the cost stays flat no matter how many viewers are connected.
+        
+        Args:
+            frame (Frame): Frame to encode (defaults to the newest frame)
+            quality (int): JPEG quality 1-95 (defaults to jpeg_quality)
+            size (tuple): Output size as (width, height) (defaults to the frame size)
+        
+        Returns:
+            EncodedFrame: Encoded frame with its metadata, or None if no frame is available
+        """
+        if frame is None:
+            frame = self.frame_ring.latest()
+            if frame is None:
+                return None
+        
+        quality = quality or self.jpeg_quality
+        height, width = frame.data.shape[:2]
+        if size is None or tuple(size) == (width, height):
+            size = (width, height)
+        size = tuple(size)
+        key = (frame.sequence, quality, size)
+        
+        with self._encode_lock:
+            encoded = self._encoded_frames.get(key)
+            if encoded is not None:
+                return encoded
             
-            # Save image to in-memory file
-            img_byte_arr = io.BytesIO()
-            img.save(img_byte_arr, format='JPEG')
-            img_byte_arr = img_byte_arr.getvalue()
+            # Reuse the JPEG produced by the camera backend when there is one
+            backend_sequence, backend_jpeg = self._backend_jpeg
+            if backend_sequence == frame.sequence and quality == self.jpeg_quality and size == (width, height):
+                # The backend encoded the frame while capturing it
+                encoded = EncodedFrame(frame.sequence, frame.timestamp, width, height, backend_jpeg,
+                                       frame.timestamp, frame.timestamp)
+                self._cache_encoded_frame(key, encoded)
+                return encoded
             
-            # Encode as base64
-            return base64.b64encode(img_byte_arr).decode('utf-8')
+            # If another caller is already encoding this variant, wait for its result
+            pending = self._pending_encodes.get(key)
+            is_encoder = pending is None
+            if is_encoder:
+                pending = threading.Event()
+                self._pending_encodes[key] = pending
+        
+        if not is_encoder:
+            pending.wait(timeout=1.0)
+            return self._encoded_frames.get(key)
+        
+        encoded = None
+        try:
+            # Encode in an OS worker thread so the eventlet hub keeps serving requests
+            encode_start = time.time()
+            jpeg = run_in_worker(self._encode_jpeg, frame.data, quality, size)
+            encoded = EncodedFrame(frame.sequence, frame.timestamp, size[0], size[1], jpeg,
+                                   encode_start, time.time())
         except Exception as e:
-            logger.error(f"Error converting frame to base64: {e}")
+            logger.error(f"Error encoding frame to JPEG: {e}")
+        finally:
+            with self._encode_lock:
+                if encoded is not None:
+                    self._cache_encoded_frame(key, encoded)
+                del self._pending_encodes[key]
+            pending.set()
+        
+        return encoded
+    
+    @staticmethod
+    def _encode_jpeg(data, quality, size):
+        """
+        Encode a frame to JPEG bytes
+        
+        Args:
+            data (numpy.ndarray): RGB frame
+            quality (int): JPEG quality
+            size (tuple): Output size as (width, height)
+        
+        Returns:
+            bytes: JPEG data
+        """
+        # Convert numpy array to PIL Image
+        img = Image.fromarray(data)
+        if size != img.size:
+            img = img.resize(size, Image.BILINEAR)
+        
+        # Save image to in-memory file
+        img_byte_arr = io.BytesIO()
+        img.save(img_byte_arr, format='JPEG', quality=quality)
+        return img_byte_arr.getvalue()
+    
+    def _cache_encoded_frame(self, key, encoded):
+        """Add an encoded frame to the cache, keeping only the most recent variants (caller holds the lock)"""
+        self._encoded_frames[key] = encoded
+        while len(self._encoded_frames) > self._encoded_cache_size:
+            del self._encoded_frames[next(iter(self._encoded_frames))]
+    
+    def get_frame_base64(self):
+        """Get the current frame as a base64 encoded JPEG string"""
+        encoded = self.get_encoded_frame()
+        if encoded is None:
             return None
+        
+        # Encode as base64
+        return base64.b64encode(encoded.jpeg).decode('utf-8')
     
     def cleanup(self):
         """Clean up resources"""
         logger.info("Cleaning up camera controller resources")
         
+        # Finish the recording before the camera stops
+        if self.is_recording:
+            self.stop_recording()
+        
         # Stop streaming if active
         if self.is_streaming:
             self.stop_streaming()
         
-        # Close camera if open
-        if HARDWARE_AVAILABLE and self.camera:
-            self.camera.close() 
\ No newline at end of file
+        # Release the shared-memory frame bus
+        self.disable_frame_bus()
+        
+        # Stop the gimbal motion engine
+        self.gimbal.stop()
+        
+        # Release the camera
+        self.backend.close() 
\ No newline at end of file
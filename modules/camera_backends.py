@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Camera Backends Module
+
+import logging
+import time
+import threading
+from collections import deque, namedtuple
+from datetime import datetime
+import numpy as np
+from PIL import Image, ImageDraw
+from modules.workers import run_in_worker
+
+try:
+    # Import libcamera for Raspberry Pi camera
+    from picamera2 import Picamera2
+    from picamera2.encoders import MJPEGEncoder
+    from picamera2.outputs import Output
+    from libcamera import Transform
+    PICAMERA2_AVAILABLE = True
+except ImportError:
+    PICAMERA2_AVAILABLE = False
+    Output = object
+    logging.warning("libcamera libraries not available, using simulated camera backend")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One capture from a backend: main stream pixels, optional low-resolution
+# stream pixels and optional already-encoded JPEG of the frame
+Capture = namedtuple('Capture', ['data', 'lores', 'jpeg'])
+
+# Largest difference between a request's sensor timestamp and an encoded
+# buffer's timestamp for both to be the same frame (microseconds, well under
+# one frame interval)
+JPEG_TIMESTAMP_TOLERANCE = 1000
+
+# The encoder delivers a request's JPEG from its own thread, usually shortly
+# after the request is released; capture waits for it up to this fraction of
+# the frame interval before encoding the frame in software
+JPEG_WAIT_FRACTION = 0.25
+
+class CameraBackend:
+    """
+    Interface implemented by every camera backend
+
+    A backend owns the capture device. `capture()` blocks until the next
+    frame is available, so the caller's loop runs at the camera rate.
+    """
+
+    name = 'base'
+
+    def __init__(self, resolution=(640, 480), framerate=30, lores_resolution=(320, 240)):
+        """
+        Initialize the camera backend
+
+        Args:
+            resolution (tuple): Main stream size as (width, height)
+            framerate (int): Target frames per second
+            lores_resolution (tuple): Low-resolution stream size, or None to disable it
+        """
+        self.resolution = tuple(resolution)
+        self.framerate = framerate
+        self.lores_resolution = tuple(lores_resolution) if lores_resolution else None
+        self.is_running = False
+
+    @property
+    def supports_mjpeg(self):
+        """Whether captures carry an already-encoded JPEG"""
+        return False
+
+    def start(self):
+        """Start capturing frames"""
+        self.is_running = True
+
+    def stop(self):
+        """Stop capturing frames"""
+        self.is_running = False
+
+    def capture(self):
+        """
+        Capture the next frame
+
+        Returns:
+            Capture: Captured frame
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the capture device"""
+        if self.is_running:
+            self.stop()
+
+    def get_stats(self):
+        """
+        Get backend statistics
+
+        Returns:
+            dict: Backend name, stream sizes and whether captures carry a JPEG
+        """
+        return {
+            "name": self.name,
+            "resolution": list(self.resolution),
+            "lores_resolution": list(self.lores_resolution) if self.lores_resolution else None,
+            "framerate": self.framerate,
+            "supports_mjpeg": self.supports_mjpeg
+        }
+
+class _LatestJpegOutput(Output):
+    """Picamera2 encoder output that keeps the newest JPEG buffers with their timestamps"""
+
+    def __init__(self, size=4):
+        super().__init__()
+        self.condition = threading.Condition()
+        self.jpegs = deque(maxlen=size)  # (timestamp in microseconds, JPEG)
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def outputframe(self, frame, keyframe=True, timestamp=None, *args, **kwargs):
+        with self.condition:
+            self.jpegs.append((timestamp, bytes(frame)))
+            self.condition.notify_all()
+
+    def _pop(self, timestamp):
+        """
+        Remove the JPEG of a timestamp; called with the condition held
+
+        Returns:
+            tuple: (JPEG or None, whether it can still arrive)
+        """
+        for i, (jpeg_timestamp, jpeg) in enumerate(self.jpegs):
+            if jpeg_timestamp is None:
+                continue
+            if abs(jpeg_timestamp - timestamp) <= JPEG_TIMESTAMP_TOLERANCE:
+                del self.jpegs[i]
+                return jpeg, False
+        # Buffers arrive in capture order, so once a later frame is in the frame was not encoded
+        newest = self.jpegs[-1][0] if self.jpegs else None
+        return None, newest is None or newest < timestamp
+
+    def take(self, timestamp, timeout=0):
+        """
+        Take the JPEG encoded from the frame with the given encoder timestamp
+
+        A taken buffer is removed, so it is never handed out twice.
+
+        Args:
+            timestamp (int): Encoder timestamp of the frame in microseconds, or None
+            timeout (float): Seconds to wait for the encoder to deliver the frame
+
+        Returns:
+            bytes: The frame's JPEG, or None if it was not encoded in time
+        """
+        jpeg = None
+        if timestamp is not None:
+            deadline = time.monotonic() + timeout
+            with self.condition:
+                while True:
+                    jpeg, pending = self._pop(timestamp)
+                    remaining = deadline - time.monotonic()
+                    if jpeg is not None or not pending or remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+        if jpeg is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return jpeg
+
+class Picamera2Backend(CameraBackend):
+    """
+    Raspberry Pi camera backend using a Picamera2 video configuration
+
+    The video configuration keeps the sensor streaming continuously, unlike
+    the still configuration, and provides a main and a lores stream from the
+    same request. When an MJPEG encoder is available it runs on the main
+    stream and each capture carries the encoded buffer of the same frame,
+    matched by sensor timestamp.
+    """
+
+    name = 'picamera2'
+
+    def __init__(self, resolution=(640, 480), framerate=30, lores_resolution=(320, 240), mjpeg=True):
+        """
+        Initialize the Picamera2 backend
+
+        Args:
+            resolution (tuple): Main stream size as (width, height)
+            framerate (int): Target frames per second
+            lores_resolution (tuple): Low-resolution stream size, or None to disable it
+            mjpeg (bool): Run an MJPEG encoder on the main stream
+        """
+        super().__init__(resolution, framerate, lores_resolution)
+
+        if not PICAMERA2_AVAILABLE:
+            raise RuntimeError("picamera2 is not available")
+
+        self.camera = Picamera2()
+
+        streams = {"main": {"size": self.resolution, "format": "RGB888"}}
+        if self.lores_resolution:
+            # RGB lores requires a Raspberry Pi 5 (earlier models only support YUV lores)
+            streams["lores"] = {"size": self.lores_resolution, "format": "RGB888"}
+
+        config = self.camera.create_video_configuration(
+            **streams,
+            controls={"FrameRate": self.framerate},
+            transform=Transform(hflip=True, vflip=True),  # Flip if needed
+            buffer_count=4
+        )
+        self.camera.configure(config)
+
+        # Optional MJPEG encoder on the main stream
+        self.encoder = None
+        self.jpeg_output = None
+        if mjpeg:
+            try:
+                self.encoder = MJPEGEncoder()
+                self.jpeg_output = _LatestJpegOutput()
+            except Exception as e:
+                logger.warning(f"MJPEG encoder not available, frames will be encoded in software: {e}")
+                self.encoder = None
+
+        logger.info("Picamera2 video backend configured")
+
+    @property
+    def supports_mjpeg(self):
+        return self.encoder is not None
+
+    def start(self):
+        """Start the camera and the MJPEG encoder"""
+        if self.is_running:
+            return
+
+        if self.encoder is not None:
+            self.camera.start_encoder(self.encoder, self.jpeg_output, name="main")
+        self.camera.start()
+        self.is_running = True
+
+    def stop(self):
+        """Stop the MJPEG encoder and the camera"""
+        if not self.is_running:
+            return
+
+        if self.encoder is not None:
+            self.camera.stop_encoder()
+        self.camera.stop()
+        self.is_running = False
+
+    def capture(self):
+        """
+        Capture the main and lores arrays of the next request
+
+        The encoded JPEG is only attached when the encoder produced it from
+        this same request; otherwise the frame is encoded in software.
+        """
+        request = self.camera.capture_request()
+        try:
+            data = request.make_array("main")
+            lores = request.make_array("lores") if self.lores_resolution else None
+            metadata = request.get_metadata()
+        finally:
+            request.release()
+
+        jpeg = None
+        if self.jpeg_output is not None:
+            jpeg = self.jpeg_output.take(self._encoder_timestamp(metadata), JPEG_WAIT_FRACTION / self.framerate)
+        return Capture(data, lores, jpeg)
+
+    def _encoder_timestamp(self, metadata):
+        """
+        Convert a request's sensor timestamp to the encoder's timestamp
+
+        The encoder stamps buffers in microseconds since its first frame.
+
+        Args:
+            metadata (dict): Request metadata
+
+        Returns:
+            int: Encoder timestamp in microseconds, or None if it is unknown
+        """
+        sensor_timestamp = metadata.get("SensorTimestamp")
+        first_timestamp = getattr(self.encoder, 'firsttimestamp', None)
+        if sensor_timestamp is None or first_timestamp is None:
+            return None
+        return sensor_timestamp // 1000 - first_timestamp
+
+    def get_stats(self):
+        """
+        Get backend statistics
+
+        Returns:
+            dict: Backend statistics with the captures that reused the encoder's JPEG
+                  (jpeg_hits) and those encoded in software instead (jpeg_misses)
+        """
+        stats = super().get_stats()
+        if self.jpeg_output is not None:
+            stats["jpeg_hits"] = self.jpeg_output.hits
+            stats["jpeg_misses"] = self.jpeg_output.misses
+        return stats
+
+    def close(self):
+        """Stop and close the camera"""
+        super().close()
+        self.camera.close()
+
+class SimulatedCameraBackend(CameraBackend):
+    """
+    Pure-software camera backend for simulation, CI and benchmarks
+
+    Renders a Sheikah grid with a HUD at the configured resolution and
+    frame rate. The static background is built once; only the HUD text
+    bands are redrawn per frame.
+    """
+
+    name = 'simulated'
+
+    def __init__(self, resolution=(640, 480), framerate=30, lores_resolution=(320, 240), hud_text=None):
+        """
+        Initialize the simulated backend
+
+        Args:
+            resolution (tuple): Main stream size as (width, height)
+            framerate (int): Target frames per second
+            lores_resolution (tuple): Low-resolution stream size, or None to disable it
+            hud_text (callable): Returns the text shown at the bottom of the frame
+        """
+        super().__init__(resolution, framerate, lores_resolution)
+        logger.info(f"Initializing simulated camera at {self.resolution[0]}x{self.resolution[1]}")
+
+        self.hud_text = hud_text
+        self._background = self._build_background()
+        self._next_frame_time = None
+
+        # Main frame rows and columns sampled for the lores frame
+        if self.lores_resolution:
+            (width, height), (lores_width, lores_height) = self.resolution, self.lores_resolution
+            self._lores_rows = np.arange(lores_height) * height // lores_height
+            self._lores_cols = np.arange(lores_width) * width // lores_width
+
+    def _build_background(self):
+        """
+        Build the static simulated frame: grid pattern and Sheikah eye
+
+        Returns:
+            numpy.ndarray: RGB frame of the configured resolution
+        """
+        width, height = self.resolution
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+        # Add grid lines
+        grid_size = 20
+        color = (0, 100, 200)  # Sheikah blue color
+        frame[::grid_size, :] = color  # Horizontal grid lines
+        frame[:, ::grid_size] = color  # Vertical grid lines
+
+        # Add Sheikah eye in the center
+        pil_img = Image.fromarray(frame)
+        draw = ImageDraw.Draw(pil_img)
+        center_x, center_y = width // 2, height // 2
+        radius = 40
+        draw.ellipse((center_x - radius, center_y - radius, center_x + radius, center_y + radius), outline=color)
+        draw.ellipse((center_x - radius//3, center_y - radius//3, center_x + radius//3, center_y + radius//3), outline=color)
+        draw.line((center_x, center_y - radius//3, center_x, center_y - radius), fill=color)
+
+        return np.array(pil_img)
+
+    def render_frame(self):
+        """
+        Render one simulated frame from the cached background
+
+        Returns:
+            numpy.ndarray: RGB frame of the configured resolution
+        """
+        frame = self._background.copy()
+        height = self.resolution[1]
+
+        # Add timestamp and HUD text
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        hud_text = self.hud_text() if self.hud_text else ""
+
+        for top, text in ((30, timestamp), (height - 30, hud_text)):
+            band = frame[top:top + 16]
+            if band.shape[0] == 0 or not text:
+                continue
+            band_img = Image.fromarray(band)
+            ImageDraw.Draw(band_img).text((10, 0), text, fill=(255, 255, 255))
+            band[:] = np.asarray(band_img)
+
+        return frame
+
+    def start(self):
+        """Start producing frames"""
+        self._next_frame_time = None
+        super().start()
+
+    def capture(self):
+        """Wait for the next frame deadline and render the frame"""
+        interval = 1 / self.framerate
+        now = time.monotonic()
+
+        # Pace frames on a fixed schedule; resynchronize if we fell behind
+        if self._next_frame_time is None or now - self._next_frame_time > interval:
+            self._next_frame_time = now
+        elif self._next_frame_time > now:
+            time.sleep(self._next_frame_time - now)
+        self._next_frame_time += interval
+
+        # Render in an OS worker thread; large frames take several milliseconds
+        data = run_in_worker(self.render_frame)
+
+        lores = None
+        if self.lores_resolution:
+            # Nearest-neighbour resize to exactly the lores size; take() copies,
+            # so stages drawing on the main frame do not show up in lores
+            lores = data.take(self._lores_rows, axis=0).take(self._lores_cols, axis=1)
+
+        return Capture(data, lores, None)
+
+def create_camera_backend(resolution=(640, 480), framerate=30, lores_resolution=(320, 240), hud_text=None):
+    """
+    Create the best available camera backend
+
+    Args:
+        resolution (tuple): Main stream size as (width, height)
+        framerate (int): Target frames per second
+        lores_resolution (tuple): Low-resolution stream size, or None to disable it
+        hud_text (callable): HUD text provider for the simulated backend
+
+    Returns:
+        CameraBackend: Picamera2 backend if the camera works, simulated backend otherwise
+    """
+    if PICAMERA2_AVAILABLE:
+        try:
+            return Picamera2Backend(resolution, framerate, lores_resolution)
+        except Exception as e:
+            logger.error(f"Failed to initialize camera hardware: {e}")
+
+    return SimulatedCameraBackend(resolution, framerate, lores_resolution, hud_text=hud_text)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Target Detection Module
+
+import logging
+from collections import namedtuple
+import numpy as np
+
+try:
+    # OpenCV provides faster colour conversion and connected components
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    logging.warning("OpenCV not available, using NumPy target detection")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A detected blob: centre and bounding box (x0, y0, x1, y1) in frame pixels, area in pixels
+Detection = namedtuple('Detection', ['x', 'y', 'area', 'bbox'])
+
+# Detection modes
+MODE_COLOR = 'color'
+MODE_MOTION = 'motion'
+MODE_COLOR_MOTION = 'color+motion'  # Moving pixels of the target colour
+DETECTION_MODES = [MODE_COLOR, MODE_MOTION, MODE_COLOR_MOTION]
+
+# Block size of the NumPy connected-components fallback, and the fraction of
+# a block's pixels that must be set for the block to count (filters noise)
+COMPONENT_BLOCK = 4
+COMPONENT_MIN_FILL = 0.25
+
+def rgb_to_hsv(data):
+    """
+    Convert an RGB frame to HSV with OpenCV value ranges
+
+    Args:
+        data (numpy.ndarray): RGB frame (uint8)
+
+    Returns:
+        numpy.ndarray: HSV frame (uint8) with H in 0-179 and S, V in 0-255
+    """
+    if CV2_AVAILABLE:
+        return cv2.cvtColor(np.ascontiguousarray(data), cv2.COLOR_RGB2HSV)
+
+    rgb = data.astype(np.float32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    v = rgb.max(axis=2)
+    delta = v - rgb.min(axis=2)
+    safe_delta = np.where(delta == 0, 1, delta)
+
+    s = np.where(v > 0, delta * 255 / np.where(v == 0, 1, v), 0)
+
+    h = np.where(v == r, (g - b) / safe_delta,
+                 np.where(v == g, 2 + (b - r) / safe_delta, 4 + (r - g) / safe_delta)) * 30
+    h = np.where(delta == 0, 0, h % 180)
+
+    return np.stack([h, s, v], axis=2).round().astype(np.uint8)
+
+def to_gray(data):
+    """
+    Convert an RGB frame to grayscale
+
+    Args:
+        data (numpy.ndarray): RGB frame (uint8)
+
+    Returns:
+        numpy.ndarray: Grayscale frame (uint8)
+    """
+    if CV2_AVAILABLE:
+        return cv2.cvtColor(np.ascontiguousarray(data), cv2.COLOR_RGB2GRAY)
+
+    # Integer BT.601 weights (77, 150, 29) / 256
+    return ((data[..., 0].astype(np.uint16) * 77 + data[..., 1].astype(np.uint16) * 150 +
+             data[..., 2].astype(np.uint16) * 29) >> 8).astype(np.uint8)
+
+def hsv_mask(hsv, lower, upper):
+    """
+    Threshold an HSV frame
+
+    A lower hue above the upper hue selects the range wrapping around 180
+    (e.g. 170-10 for red).
+
+    Args:
+        hsv (numpy.ndarray): HSV frame from rgb_to_hsv
+        lower (tuple): Lower (h, s, v) bounds
+        upper (tuple): Upper (h, s, v) bounds
+
+    Returns:
+        numpy.ndarray: Boolean mask of the matching pixels
+    """
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    mask = (s >= lower[1]) & (s <= upper[1]) & (v >= lower[2]) & (v <= upper[2])
+
+    if lower[0] <= upper[0]:
+        mask &= (h >= lower[0]) & (h <= upper[0])
+    else:
+        mask &= (h >= lower[0]) | (h <= upper[0])
+
+    return mask
+
+def largest_component(mask, min_area=1):
+    """
+    Find the largest connected blob in a mask
+
+    Uses OpenCV's connected components when available. The NumPy fallback
+    labels blocks of COMPONENT_BLOCK x COMPONENT_BLOCK pixels (so blobs
+    closer than a block are merged and sparse blocks are ignored as noise)
+    and computes the exact centroid of the pixels in the winning blocks.
+
+    Args:
+        mask (numpy.ndarray): Boolean mask
+        min_area (int): Minimum blob area in pixels
+
+    Returns:
+        Detection: Largest blob, or None if no blob is large enough
+    """
+    if CV2_AVAILABLE:
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(np.ascontiguousarray(mask).view(np.uint8), connectivity=8)
+        if count <= 1:
+            return None
+
+        # Label 0 is the background
+        label = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        area = int(stats[label, cv2.CC_STAT_AREA])
+        if area < min_area:
+            return None
+
+        x0, y0 = int(stats[label, cv2.CC_STAT_LEFT]), int(stats[label, cv2.CC_STAT_TOP])
+        bbox = (x0, y0, x0 + int(stats[label, cv2.CC_STAT_WIDTH]), y0 + int(stats[label, cv2.CC_STAT_HEIGHT]))
+        return Detection(float(centroids[label][0]), float(centroids[label][1]), area, bbox)
+
+    return _largest_component_blocks(mask, min_area)
+
+def _largest_component_blocks(mask, min_area):
+    """NumPy fallback of largest_component working on a block grid"""
+    block = COMPONENT_BLOCK
+    height, width = mask.shape
+    rows, cols = -(-height // block), -(-width // block)
+
+    # Pad to whole blocks, then per-block pixel counts and coordinate sums
+    padded = np.zeros((rows * block, cols * block), dtype=np.float32)
+    padded[:height, :width] = mask
+
+    def block_sum(values):
+        return values.reshape(rows, block, cols, block).sum(axis=(1, 3))
+
+    counts = block_sum(padded)
+    sum_x = block_sum(padded * np.arange(cols * block, dtype=np.float32))
+    sum_y = block_sum(padded * np.arange(rows * block, dtype=np.float32)[:, None])
+
+    # Label the occupied blocks by propagating the largest label to 8-connected
+    # neighbours until nothing changes (iterations grow with blob size in blocks)
+    occupied = counts >= block * block * COMPONENT_MIN_FILL
+    counts *= occupied
+    labels = np.where(occupied, np.arange(1, rows * cols + 1).reshape(rows, cols), 0)
+    while True:
+        grown = np.pad(labels, 1)
+        neighbourhood = labels.copy()
+        for d_row in range(3):
+            for d_col in range(3):
+                np.maximum(neighbourhood, grown[d_row:d_row + rows, d_col:d_col + cols], out=neighbourhood)
+        neighbourhood *= occupied
+        if np.array_equal(neighbourhood, labels):
+            break
+        labels = neighbourhood
+
+    if not occupied.any():
+        return None
+
+    # Per-label area and coordinate sums
+    flat_labels = labels.ravel()
+    areas = np.bincount(flat_labels, weights=counts.ravel())
+    areas[0] = 0
+    label = int(np.argmax(areas))
+    area = int(areas[label])
+    if area < min_area:
+        return None
+
+    member = labels == label
+    x = float(sum_x[member].sum()) / area
+    y = float(sum_y[member].sum()) / area
+    member_rows, member_cols = np.nonzero(member)
+    bbox = (int(member_cols.min()) * block, int(member_rows.min()) * block,
+            min(width, (int(member_cols.max()) + 1) * block), min(height, (int(member_rows.max()) + 1) * block))
+    return Detection(x, y, area, bbox)
+
+class BlobDetector:
+    """
+    Colour and motion blob detector for tracking targets
+
+    Builds a mask from HSV colour thresholds and/or frame differencing,
+    then returns the centroid of the largest connected blob. Once a target
+    is found, the next frame is searched in a region of interest around it
+    first, and only falls back to the full frame if the target left it.
+    """
+
+    def __init__(self, mode=MODE_COLOR, hsv_lower=(170, 100, 70), hsv_upper=(10, 255, 255),
+                 motion_threshold=25, min_area=20, use_roi=True, roi_scale=2.0, roi_min_size=48):
+        """
+        Initialize the blob detector
+
+        Args:
+            mode (str): 'color', 'motion' or 'color+motion'
+            hsv_lower (tuple): Lower (h, s, v) colour bounds (OpenCV ranges, default red)
+            hsv_upper (tuple): Upper (h, s, v) colour bounds
+            motion_threshold (int): Minimum grayscale change of a moving pixel
+            min_area (int): Minimum blob area in pixels
+            use_roi (bool): Search around the last detection first
+            roi_scale (float): ROI size as a multiple of the last blob's bounding box
+            roi_min_size (int): Minimum ROI width and height in pixels
+        """
+        if mode not in DETECTION_MODES:
+            raise ValueError(f"Invalid detection mode: {mode}")
+
+        self.mode = mode
+        self.hsv_lower = tuple(hsv_lower)
+        self.hsv_upper = tuple(hsv_upper)
+        self.motion_threshold = motion_threshold
+        self.min_area = min_area
+        self.use_roi = use_roi
+        self.roi_scale = roi_scale
+        self.roi_min_size = roi_min_size
+
+        self.last_detection = None
+        self._previous_gray = None
+        self._frame_size = None
+
+        # Statistics
+        self.roi_hits = 0
+        self.full_searches = 0
+
+    @classmethod
+    def from_rgb(cls, color, hue_tolerance=10, min_saturation=100, min_value=70, **kwargs):
+        """
+        Create a colour detector for an RGB target colour
+
+        Args:
+            color (tuple): Target colour as (r, g, b)
+            hue_tolerance (int): Accepted hue difference (OpenCV hue units, 0-90)
+            min_saturation (int): Minimum saturation of target pixels
+            min_value (int): Minimum brightness of target pixels
+            **kwargs: Other BlobDetector arguments
+
+        Returns:
+            BlobDetector: Detector for the colour
+        """
+        hue = int(rgb_to_hsv(np.array([[color]], dtype=np.uint8))[0, 0, 0])
+        lower = ((hue - hue_tolerance) % 180, min_saturation, min_value)
+        upper = ((hue + hue_tolerance) % 180, 255, 255)
+        return cls(hsv_lower=lower, hsv_upper=upper, **kwargs)
+
+    def reset(self):
+        """Forget the last detection and the previous frame"""
+        self.last_detection = None
+        self._previous_gray = None
+
+    def _motion_mask(self, data):
+        """Pixels that changed since the previous frame (all False on the first frame)"""
+        gray = to_gray(data)
+        previous, self._previous_gray = self._previous_gray, gray
+
+        if previous is None or previous.shape != gray.shape:
+            return np.zeros(gray.shape, dtype=bool)
+
+        if CV2_AVAILABLE:
+            return cv2.absdiff(gray, previous) > self.motion_threshold
+        return np.abs(gray.astype(np.int16) - previous) > self.motion_threshold
+
+    def _search(self, data, motion, offset):
+        """Detect the largest blob in a frame region; offset is the region's (x, y) in the frame"""
+        if self.mode == MODE_MOTION:
+            mask = motion
+        else:
+            mask = hsv_mask(rgb_to_hsv(data), self.hsv_lower, self.hsv_upper)
+            if self.mode == MODE_COLOR_MOTION:
+                mask &= motion
+
+        detection = largest_component(mask, self.min_area)
+        if detection is None:
+            return None
+
+        x0, y0, x1, y1 = detection.bbox
+        dx, dy = offset
+        return Detection(detection.x + dx, detection.y + dy, detection.area, (x0 + dx, y0 + dy, x1 + dx, y1 + dy))
+
+    def _roi(self, height, width):
+        """Region of interest around the last detection as (x0, y0, x1, y1)"""
+        x0, y0, x1, y1 = self.last_detection.bbox
+        half_width = max(self.roi_min_size, (x1 - x0) * self.roi_scale) / 2
+        half_height = max(self.roi_min_size, (y1 - y0) * self.roi_scale) / 2
+        x, y = self.last_detection.x, self.last_detection.y
+        return (max(0, int(x - half_width)), max(0, int(y - half_height)),
+                min(width, int(x + half_width) + 1), min(height, int(y + half_height) + 1))
+
+    def detect(self, data):
+        """
+        Detect the target in a frame
+
+        Args:
+            data (numpy.ndarray): RGB frame (e.g. from the camera's frame or lores ring)
+
+        Returns:
+            Detection: Target centre in frame pixels (the coordinates
+            ServoControl.calculate_servo_angles expects for frames of this size), or None
+        """
+        height, width = data.shape[:2]
+
+        # The last detection is only meaningful for frames of the same size
+        if self.last_detection is not None and self._frame_size != (width, height):
+            self.last_detection = None
+        self._frame_size = (width, height)
+
+        # Motion needs the whole frame to keep the previous frame complete
+        motion = self._motion_mask(data) if self.mode != MODE_COLOR else None
+
+        detection = None
+        if self.use_roi and self.last_detection is not None:
+            x0, y0, x1, y1 = self._roi(height, width)
+            roi_motion = motion[y0:y1, x0:x1] if motion is not None else None
+            detection = self._search(data[y0:y1, x0:x1], roi_motion, (x0, y0))
+            if detection is not None:
+                self.roi_hits += 1
+
+        if detection is None:
+            self.full_searches += 1
+            detection = self._search(data, motion, (0, 0))
+
+        self.last_detection = detection
+        return detection
+
+    def get_stats(self):
+        """
+        Get detector settings and statistics
+
+        Returns:
+            dict: Mode, backend and ROI hit counters
+        """
+        return {
+            "mode": self.mode,
+            "backend": "opencv" if CV2_AVAILABLE else "numpy",
+            "hsv_lower": list(self.hsv_lower),
+            "hsv_upper": list(self.hsv_upper),
+            "roi_hits": self.roi_hits,
+            "full_searches": self.full_searches
+        }
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Shared-Memory Frame Bus Module
+
+import logging
+import time
+import struct
+import numpy as np
+from multiprocessing import shared_memory
+from modules.frame_ring import Frame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Default shared memory names of the main and low-resolution camera streams
+DEFAULT_BUS_NAME = 'sheikah_frames'
+LORES_SUFFIX = '_lores'
+
+# Bus header: magic, layout version, state, capacity, frame shape, dtype and
+# sequence number of the newest frame
+BUS_MAGIC = b'SKFB'
+BUS_VERSION = 1
+BUS_HEADER = struct.Struct('<4sHHIIII8sQ')
+LATEST_OFFSET = BUS_HEADER.size - 8
+
+# Bus states
+STATE_OPEN = 1
+STATE_CLOSED = 2
+
+# Slot header: sequence written before the pixels, sequence written after
+# the pixels and capture timestamp. A slot is consistent when both
+# sequences match (a seqlock, so readers never block the producer).
+SLOT_HEADER = struct.Struct('<QQd')
+
+# Slot headers and pixel data start on cache-line boundaries
+ALIGNMENT = 64
+
+def _align(offset):
+    """Round an offset up to the next cache line"""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _layout(capacity, shape, dtype):
+    """
+    Compute the shared memory layout of a bus
+
+    Returns:
+        tuple: (slot size in bytes, offset of slot 0, total size in bytes)
+    """
+    frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    slot_size = _align(SLOT_HEADER.size) + _align(frame_bytes)
+    first_slot = _align(BUS_HEADER.size)
+    return slot_size, first_slot, first_slot + capacity * slot_size
+
+def _attach(name):
+    """
+    Attach to an existing shared memory block without tracking it
+
+    Python's resource tracker unlinks every block a process opened when that
+    process exits, which would pull the bus away from the camera and every
+    other reader. Only the producer owns the block.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Python < 3.13 has no track argument. Skip the registration instead of
+    # unregistering afterwards: child processes share their parent's tracker,
+    # so unregistering would also drop the producer's registration.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+class FrameBus:
+    """
+    Producer side of a shared-memory ring of camera frames
+
+    Frames are copied into fixed slots of a `multiprocessing.shared_memory`
+    block, so processes outside the Flask server (SLAM, tracking, recording)
+    can read them without pickling or copying. The layout is fixed for the
+    life of the bus; publishing a frame of another shape recreates it and
+    readers have to attach again.
+    """
+
+    def __init__(self, name=DEFAULT_BUS_NAME, shape=(480, 640, 3), dtype=np.uint8, capacity=4):
+        """
+        Create the frame bus
+
+        Args:
+            name (str): Shared memory name readers attach to
+            shape (tuple): Frame array shape, e.g. (height, width, channels)
+            dtype: Frame array data type
+            capacity (int): Number of frame slots
+        """
+        self.name = name
+        self.capacity = capacity
+        self.sequence = 0
+        self.shm = None
+        self._slots = None
+
+        self._create(tuple(shape), np.dtype(dtype))
+
+    def _create(self, shape, dtype):
+        """Allocate the shared memory block and write the bus header"""
+        if len(shape) > 3:
+            raise ValueError(f"Frames must have at most 3 dimensions, got {shape}")
+
+        slot_size, first_slot, total_size = _layout(self.capacity, shape, dtype)
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=total_size)
+        except FileExistsError:
+            # Left over from a process that did not shut down cleanly
+            logger.warning(f"Replacing stale frame bus {self.name}")
+            stale = _attach(self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=total_size)
+
+        self.shape = shape
+        self.dtype = dtype
+        self._slot_size = slot_size
+        self._first_slot = first_slot
+        self._data_offset = _align(SLOT_HEADER.size)
+
+        dims = list(shape) + [1] * (3 - len(shape))
+        BUS_HEADER.pack_into(self.shm.buf, 0, BUS_MAGIC, BUS_VERSION, STATE_OPEN,
+                             self.capacity, dims[0], dims[1], dims[2],
+                             dtype.str.encode('ascii'), self.sequence)
+
+        # Writable views of the slot pixels, kept for the life of the block
+        self._slots = [
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf,
+                       offset=first_slot + index * slot_size + self._data_offset)
+            for index in range(self.capacity)
+        ]
+
+        logger.info(f"Frame bus {self.name} created: {self.capacity} x {shape} {dtype} ({total_size} bytes)")
+
+    def publish(self, data, timestamp=None, sequence=None):
+        """
+        Copy a frame into the next slot
+
+        Args:
+            data (numpy.ndarray): Frame pixel data
+            timestamp (float): Capture time (defaults to now)
+            sequence (int): Sequence number to publish under (defaults to the next one)
+
+        Returns:
+            int: Sequence number of the frame
+        """
+        if self.shm is None:
+            raise RuntimeError(f"Frame bus {self.name} is closed")
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        if data.shape != self.shape or data.dtype != self.dtype:
+            logger.warning(f"Frame format changed to {data.shape} {data.dtype}, recreating frame bus {self.name}")
+            self._destroy()
+            self._create(tuple(data.shape), data.dtype)
+
+        if sequence is None:
+            sequence = self.sequence + 1
+        index = sequence % self.capacity
+        header_offset = self._first_slot + index * self._slot_size
+
+        # Mark the slot as being written, copy the pixels, then commit it
+        _, committed, old_timestamp = SLOT_HEADER.unpack_from(self.shm.buf, header_offset)
+        SLOT_HEADER.pack_into(self.shm.buf, header_offset, sequence, committed, old_timestamp)
+        np.copyto(self._slots[index], data)
+        SLOT_HEADER.pack_into(self.shm.buf, header_offset, sequence, sequence, timestamp)
+
+        self.sequence = sequence
+        struct.pack_into('<Q', self.shm.buf, LATEST_OFFSET, sequence)
+
+        return sequence
+
+    def _destroy(self):
+        """Mark the bus closed for readers and release the shared memory"""
+        if self.shm is None:
+            return
+
+        state_offset = struct.calcsize('<4sH')
+        struct.pack_into('<H', self.shm.buf, state_offset, STATE_CLOSED)
+
+        self._slots = None
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning(f"Frame bus {self.name} still has views in this process")
+        self.shm.unlink()
+        self.shm = None
+
+    def close(self):
+        """Close and unlink the frame bus"""
+        logger.info(f"Closing frame bus {self.name}")
+        self._destroy()
+
+class FrameBusReader:
+    """
+    Consumer side of a shared-memory frame bus
+
+    Readers attach by name from any process. Frames are returned as
+    read-only numpy views of the shared slots (zero-copy). Like the
+    in-process FrameRing, a view stays valid until `capacity` more frames
+    have been published; use `is_valid()` after processing, or read with
+    `copy=True`, if a torn frame matters.
+    """
+
+    def __init__(self, name=DEFAULT_BUS_NAME):
+        """
+        Attach to a frame bus
+
+        Args:
+            name (str): Shared memory name of the bus
+
+        Raises:
+            FileNotFoundError: If no bus with this name exists
+            ValueError: If the block is not a compatible frame bus
+        """
+        self.name = name
+        self.shm = _attach(name)
+
+        magic, version, _, capacity, dim0, dim1, dim2, dtype, _ = BUS_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != BUS_MAGIC or version != BUS_VERSION:
+            self.shm.close()
+            raise ValueError(f"{name} is not a version {BUS_VERSION} frame bus")
+
+        self.capacity = capacity
+        self.shape = (dim0, dim1) if dim2 == 1 else (dim0, dim1, dim2)
+        self.dtype = np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+
+        self._slot_size, self._first_slot, _ = _layout(capacity, self.shape, self.dtype)
+        self._data_offset = _align(SLOT_HEADER.size)
+
+        self._slots = []
+        for index in range(capacity):
+            view = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf,
+                              offset=self._first_slot + index * self._slot_size + self._data_offset)
+            view.flags.writeable = False
+            self._slots.append(view)
+
+        logger.info(f"Attached to frame bus {name}: {capacity} x {self.shape} {self.dtype}")
+
+    @property
+    def sequence(self):
+        """Sequence number of the newest frame (0 before the first frame)"""
+        return struct.unpack_from('<Q', self.shm.buf, LATEST_OFFSET)[0]
+
+    @property
+    def is_closed(self):
+        """Whether the producer closed the bus (reattach to get a new one)"""
+        state_offset = struct.calcsize('<4sH')
+        return struct.unpack_from('<H', self.shm.buf, state_offset)[0] == STATE_CLOSED
+
+    def _slot_header(self, sequence):
+        """Read the (begin, end, timestamp) header of a sequence's slot"""
+        index = sequence % self.capacity
+        return SLOT_HEADER.unpack_from(self.shm.buf, self._first_slot + index * self._slot_size)
+
+    def is_valid(self, sequence):
+        """
+        Check that a frame has not been overwritten (or started to be)
+
+        Args:
+            sequence (int): Sequence number of a frame returned by this reader
+
+        Returns:
+            bool: True if the frame's slot still holds that frame
+        """
+        begin, end, _ = self._slot_header(sequence)
+        return begin == sequence and end == sequence
+
+    def get(self, sequence, copy=False):
+        """
+        Get a specific frame if it is still on the bus
+
+        Args:
+            sequence (int): Sequence number of the frame
+            copy (bool): Return a private copy, verified not to be torn
+
+        Returns:
+            Frame: The frame, or None if it was overwritten or never published
+        """
+        if sequence <= 0:
+            return None
+
+        begin, end, timestamp = self._slot_header(sequence)
+        if begin != sequence or end != sequence:
+            return None
+
+        data = self._slots[sequence % self.capacity]
+        if copy:
+            data = data.copy()
+            # The producer may have lapped us while copying
+            if not self.is_valid(sequence):
+                return None
+
+        return Frame(sequence, timestamp, data)
+
+    def latest(self, copy=False):
+        """
+        Get the newest frame
+
+        Args:
+            copy (bool): Return a private copy, verified not to be torn
+
+        Returns:
+            Frame: Newest frame, or None if nothing has been published
+        """
+        return self.get(self.sequence, copy)
+
+    def wait_for_frame(self, after_sequence=None, timeout=None, copy=False, poll_interval=0.002):
+        """
+        Wait for a frame newer than a given sequence number
+
+        Shared memory has no cross-process notification, so this polls the
+        bus header (a single 8-byte read) every `poll_interval` seconds.
+
+        Args:
+            after_sequence (int): Last sequence the caller has handled (None for any frame)
+            timeout (float): Maximum time to wait in seconds (None waits forever)
+            copy (bool): Return a private copy, verified not to be torn
+            poll_interval (float): Time between checks in seconds
+
+        Returns:
+            Frame: Newest frame, or None if no newer frame arrived in time or the bus closed
+        """
+        after_sequence = after_sequence or 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if self.is_closed:
+                return None
+
+            sequence = self.sequence
+            if sequence > after_sequence:
+                frame = self.get(sequence, copy)
+                if frame is not None:
+                    return frame
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self):
+        """Detach from the bus (the producer owns and unlinks it)"""
+        self._slots = []
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning(f"Frames from bus {self.name} are still referenced, leaving it mapped")
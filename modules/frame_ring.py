@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Frame Ring Buffer Module
+
+import logging
+import time
+import threading
+from collections import namedtuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A captured frame: monotonic sequence number, capture time and pixel data
+Frame = namedtuple('Frame', ['sequence', 'timestamp', 'data'])
+
+class FrameRing:
+    """
+    Small preallocated ring of camera frames with blocking consumers
+
+    The producer copies every frame into the next slot and tags it with a
+    monotonic sequence number. Consumers wait for the first frame after the
+    last sequence they handled and always get the newest frame, so a slow
+    reader skips frames instead of falling behind.
+
+    Frame data returned by the ring is a read-only view of a slot. It stays
+    valid until `capacity` more frames have been published; consumers that
+    keep a frame longer than that must copy it.
+    """
+
+    def __init__(self, capacity=4):
+        """
+        Initialize the frame ring
+
+        Args:
+            capacity (int): Number of frame slots
+        """
+        self.capacity = capacity
+
+        # Slots are allocated on the first publish, once the frame shape is known
+        self._slots = None
+        self._sequences = [0] * capacity
+        self._timestamps = [0.0] * capacity
+
+        # Sequence number of the newest frame (0 means no frame yet)
+        self.sequence = 0
+        self._condition = threading.Condition()
+
+    def publish(self, data, timestamp=None):
+        """
+        Copy a frame into the ring and wake up waiting consumers
+
+        Args:
+            data (numpy.ndarray): Frame pixel data
+            timestamp (float): Capture time (defaults to now)
+
+        Returns:
+            int: Sequence number assigned to the frame
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._condition:
+            # (Re)allocate the slots if the frame format changed
+            if self._slots is None or self._slots.shape[1:] != data.shape or self._slots.dtype != data.dtype:
+                logger.info(f"Allocating frame ring: {self.capacity} x {data.shape} {data.dtype}")
+                self._slots = np.empty((self.capacity,) + data.shape, dtype=data.dtype)
+
+            sequence = self.sequence + 1
+            index = sequence % self.capacity
+            np.copyto(self._slots[index], data)
+            self._sequences[index] = sequence
+            self._timestamps[index] = timestamp
+
+            self.sequence = sequence
+            self._condition.notify_all()
+
+        return sequence
+
+    def latest(self):
+        """
+        Get the newest frame
+
+        Returns:
+            Frame: Newest frame, or None if nothing has been published
+        """
+        with self._condition:
+            return self._frame_at(self.sequence)
+
+    def get(self, sequence):
+        """
+        Get a specific frame if it is still in the ring
+
+        Args:
+            sequence (int): Sequence number of the frame
+
+        Returns:
+            Frame: The frame, or None if it was overwritten or never published
+        """
+        with self._condition:
+            return self._frame_at(sequence)
+
+    def wait_for_frame(self, after_sequence=None, timeout=None):
+        """
+        Wait for a frame newer than a given sequence number
+
+        Args:
+            after_sequence (int): Last sequence the caller has handled (None for any frame)
+            timeout (float): Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            Frame: Newest frame, or None if no newer frame arrived in time
+        """
+        after_sequence = after_sequence or 0
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.sequence > after_sequence, timeout):
+                return None
+            return self._frame_at(self.sequence)
+
+    def _frame_at(self, sequence):
+        """Build a Frame for a sequence number (caller holds the lock)"""
+        if sequence <= 0 or self._slots is None:
+            return None
+
+        index = sequence % self.capacity
+        if self._sequences[index] != sequence:
+            return None
+
+        data = self._slots[index].view()
+        data.flags.writeable = False
+        return Frame(sequence, self._timestamps[index], data)
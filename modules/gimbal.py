@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Gimbal Motion Engine Module
+
+import logging
+import math
+import time
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Servo update rate in Hz
+DEFAULT_UPDATE_RATE = 50
+
+# Allowed servo update rates in Hz
+MIN_UPDATE_RATE = 1
+MAX_UPDATE_RATE = 200
+
+# Smallest angle change sent to a servo; hobby servos do not resolve finer steps
+DEFAULT_WRITE_DEADBAND = 0.5
+
+# Per-axis defaults: angle limits, PID gains, rate (deg/s) and acceleration (deg/s^2) limits
+DEFAULT_AXES = {
+    "pan": {"limits": (0, 180), "kp": 8.0, "ki": 0.0, "kd": 0.2, "max_rate": 180.0, "max_accel": 720.0},
+    "tilt": {"limits": (-5, 30), "kp": 8.0, "ki": 0.0, "kd": 0.2, "max_rate": 120.0, "max_accel": 480.0}
+}
+
+# An axis has settled when it is this close to its target and this slow
+SETTLE_ANGLE = 0.05
+SETTLE_RATE = 0.5
+
+class GimbalAxis:
+    """
+    Motion state and PID controller of one gimbal axis
+    """
+
+    def __init__(self, name, position, limits, kp, ki, kd, max_rate, max_accel):
+        """
+        Initialize the axis
+
+        Args:
+            name (str): Axis name ('pan' or 'tilt')
+            position (float): Initial angle in degrees
+            limits (tuple): (minimum, maximum) angle in degrees
+            kp (float): Proportional gain (deg/s per degree of error)
+            ki (float): Integral gain
+            kd (float): Derivative gain
+            max_rate (float): Maximum angular rate in deg/s
+            max_accel (float): Maximum angular acceleration in deg/s^2
+        """
+        self.name = name
+        self.limits = limits
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.max_rate = max_rate
+        self.max_accel = max_accel
+
+        self.position = float(position)
+        self.target = float(position)
+        self.velocity = 0.0
+        self.last_written = self.position  # The servo is assumed to be at the initial angle
+        self._integral = 0.0
+        self._previous_error = 0.0
+
+    @property
+    def is_settled(self):
+        """Whether the axis is at its target and not moving"""
+        return abs(self.target - self.position) < SETTLE_ANGLE and abs(self.velocity) < SETTLE_RATE
+
+    def clamp(self, angle):
+        """Limit an angle to the axis range"""
+        return max(self.limits[0], min(angle, self.limits[1]))
+
+    def step(self, dt):
+        """
+        Advance the axis by one control period
+
+        The PID output is a velocity command, limited to the maximum rate, to
+        the rate from which the axis can still stop at the target, and by the
+        maximum acceleration. The position integrates the limited velocity,
+        which gives a smooth trapezoidal trajectory toward the target.
+
+        Args:
+            dt (float): Control period in seconds
+        """
+        error = self.target - self.position
+
+        if self.is_settled:
+            # Snap onto the target so the last write lands exactly on it
+            self.position = self.target
+            self.velocity = 0.0
+            self._integral = 0.0
+            self._previous_error = 0.0
+            return
+
+        # PID velocity command with a bounded integral (anti-windup)
+        if self.ki:
+            self._integral = max(-self.max_rate / self.ki, min(self._integral + error * dt, self.max_rate / self.ki))
+        derivative = (error - self._previous_error) / dt
+        self._previous_error = error
+        command = self.kp * error + self.ki * self._integral + self.kd * derivative
+
+        # Rate limit, and braking so the axis can stop at the target without overshoot
+        stopping_rate = math.sqrt(2 * self.max_accel * abs(error))
+        limit = min(self.max_rate, stopping_rate)
+        command = max(-limit, min(command, limit))
+
+        # Acceleration limit
+        max_change = self.max_accel * dt
+        self.velocity += max(-max_change, min(command - self.velocity, max_change))
+
+        self.position = self.clamp(self.position + self.velocity * dt)
+
+    def get_state(self):
+        """
+        Get the axis state
+
+        Returns:
+            dict: Position, target and velocity
+        """
+        return {
+            "position": self.position,
+            "target": self.target,
+            "velocity": self.velocity,
+            "settled": self.is_settled
+        }
+
+class GimbalMotionEngine:
+    """
+    Drives the gimbal servos at a fixed update rate
+
+    Targets can be set at any time from any thread (API, Socket.IO, voice
+    commands, object tracker). Each axis has a latest-wins command slot that
+    the motion thread drains once per tick, so a burst of commands faster
+    than the update rate costs one target update, never a queue. The engine
+    moves each axis toward its target under PID control with rate and
+    acceleration limits. Servo writes smaller than the deadband are skipped,
+    and the thread sleeps while every axis is settled, so a still gimbal
+    costs no I2C traffic.
+    """
+
+    def __init__(self, write_servo, initial_angles, axes=None, update_rate=DEFAULT_UPDATE_RATE,
+                 write_deadband=DEFAULT_WRITE_DEADBAND):
+        """
+        Initialize the gimbal motion engine
+
+        Args:
+            write_servo (callable): write_servo(control, angle) moves a servo, returns success
+            initial_angles (dict): Current angle of each axis, e.g. {'pan': 90, 'tilt': -5}
+            axes (dict): Per-axis settings overriding DEFAULT_AXES
+            update_rate (float): Servo update rate in Hz
+            write_deadband (float): Smallest angle change written to a servo
+        """
+        logger.info(f"Initializing gimbal motion engine at {update_rate} Hz")
+
+        self.write_servo = write_servo
+        self.update_rate = update_rate
+        self.write_deadband = write_deadband
+
+        self.axes = {}
+        for name, defaults in DEFAULT_AXES.items():
+            settings = dict(defaults, **(axes or {}).get(name, {}))
+            self.axes[name] = GimbalAxis(name, initial_angles.get(name, 0), **settings)
+
+        self.is_running = False
+        self.motion_thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}  # Latest unapplied target per axis
+
+        # Statistics
+        self.writes = 0
+        self.writes_skipped = 0
+        self.targets_set = 0
+        self.commands_received = 0
+        self.commands_coalesced = 0  # Replaced by a newer command before the motion thread applied them
+        self.commands_dropped = 0  # Rejected as invalid, or discarded when the engine stopped
+
+    def start(self):
+        """
+        Start the motion thread
+
+        Returns:
+            bool: True if the engine was started
+        """
+        if self.is_running:
+            logger.warning("Gimbal motion engine is already running")
+            return False
+
+        self.is_running = True
+        self.motion_thread = threading.Thread(target=self._motion_loop, daemon=True)
+        self.motion_thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop the motion thread
+
+        Returns:
+            bool: True if the engine was running
+        """
+        if not self.is_running:
+            return False
+
+        self.is_running = False
+        self._wake.set()
+        if self.motion_thread:
+            self.motion_thread.join(timeout=1.0)
+            self.motion_thread = None
+
+        with self._lock:
+            self.commands_dropped += len(self._pending)
+            self._pending.clear()
+        return True
+
+    def set_update_rate(self, update_rate):
+        """
+        Change the servo update rate
+
+        Args:
+            update_rate (float): Update rate in Hz (MIN_UPDATE_RATE to MAX_UPDATE_RATE)
+
+        Returns:
+            bool: True if the rate was valid and applied
+        """
+        if not isinstance(update_rate, (int, float)) or not MIN_UPDATE_RATE <= update_rate <= MAX_UPDATE_RATE:
+            return False
+
+        self.update_rate = update_rate
+        logger.info(f"Gimbal update rate set to {update_rate} Hz")
+        return True
+
+    def set_target(self, control, angle):
+        """
+        Set the target angle of an axis
+
+        The command goes into the axis' latest-wins slot; a command still
+        waiting there is replaced and counted as coalesced.
+
+        Args:
+            control (str): 'pan' or 'tilt'
+            angle (float): Target angle in degrees, within the axis limits
+
+        Returns:
+            bool: True if the command was accepted, False if it was dropped as invalid
+        """
+        axis = self.axes.get(control)
+        with self._lock:
+            self.commands_received += 1
+            if axis is None or isinstance(angle, bool) or not isinstance(angle, (int, float)) or \
+                    not axis.limits[0] <= angle <= axis.limits[1]:
+                self.commands_dropped += 1
+                return False
+
+            if control in self._pending:
+                self.commands_coalesced += 1
+            self._pending[control] = float(angle)
+
+        self._wake.set()
+        return True
+
+    def get_position(self, control):
+        """Current (commanded) angle of an axis"""
+        return self.axes[control].position
+
+    def _motion_loop(self):
+        """Motion thread: step every axis at the update rate and write changed angles"""
+        next_time = time.monotonic()
+
+        while self.is_running:
+            period = 1 / self.update_rate
+            with self._lock:
+                # Apply the newest command of each axis
+                for control, angle in self._pending.items():
+                    self.axes[control].target = angle
+                    self.targets_set += 1
+                self._pending.clear()
+
+                settled = all(axis.is_settled and axis.last_written == axis.position for axis in self.axes.values())
+
+            if settled:
+                # Nothing to do until a new target arrives
+                self._wake.wait(timeout=1.0)
+                self._wake.clear()
+                next_time = time.monotonic()
+                continue
+
+            with self._lock:
+                writes = []
+                for axis in self.axes.values():
+                    axis.step(period)
+
+                    # Write when the change is big enough for the servo, and always the final position
+                    if abs(axis.position - axis.last_written) >= self.write_deadband or \
+                            (axis.is_settled and axis.position != axis.last_written):
+                        writes.append((axis.name, axis.position))
+                        axis.last_written = axis.position
+                    elif axis.position != axis.last_written:
+                        self.writes_skipped += 1
+
+            for control, angle in writes:
+                try:
+                    self.write_servo(control, angle)
+                    self.writes += 1
+                except Exception as e:
+                    logger.error(f"Failed to write {control} servo: {e}")
+
+            # Fixed-rate schedule; resynchronize after a stall instead of bursting
+            next_time += period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.monotonic()
+
+    def get_state(self):
+        """
+        Get the engine state
+
+        Returns:
+            dict: Per-axis state, update rate, command and write counters
+        """
+        with self._lock:
+            return {
+                "update_rate": self.update_rate,
+                "axes": {name: axis.get_state() for name, axis in self.axes.items()},
+                "pending": sorted(self._pending),  # Axes with a command not yet applied
+                "writes": self.writes,
+                "writes_skipped": self.writes_skipped,
+                "targets_set": self.targets_set,
+                "commands_received": self.commands_received,
+                "commands_coalesced": self.commands_coalesced,
+                "commands_dropped": self.commands_dropped
+            }
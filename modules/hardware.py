@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Hardware Device Manager Module
+
+import logging
+import time
+import threading
+from collections import deque
+from contextlib import nullcontext
+
+from modules.LOBOROBOT import LOBOROBOT
+from modules.bus_backends import SimulatedSMBus, SimulatedLED
+
+try:
+    # Import the I2C and GPIO libraries LOBOROBOT drives the robot with
+    import smbus
+    import gpiozero
+    HARDWARE_AVAILABLE = True
+except ImportError:
+    HARDWARE_AVAILABLE = False
+    logging.warning("LOBOROBOT bus libraries not available, running motors and servos in simulation mode")
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Time window the bus utilization is reported over (seconds)
+UTILIZATION_WINDOW = 10.0
+
+class BusOperation:
+    """
+    A hardware call waiting for the bus
+    """
+
+    __slots__ = ('operation', 'args', 'done', 'result', 'error')
+
+    def __init__(self, operation, args):
+        self.operation = operation
+        self.args = args
+        self.done = False
+        self.result = None
+        self.error = None
+
+class DeviceManager:
+    """
+    Owns the single LOBOROBOT/PCA9685 instance of the process
+
+    The motor and camera controllers drive the same PCA9685 chip; they share
+    this one instance, so the chip is reset and prescaled once and a single
+    lock serializes bus access. Operations submitted while the bus is busy
+    wait together: the next thread to get the bus runs all of them inside
+    one PCA9685 batch, so motor and servo register writes go out merged
+    into shared block transactions.
+
+    Passing a bus (and LED class) runs LOBOROBOT against it instead of the
+    robot's I2C bus, e.g. a SimulatedSMBus for load tests off the robot.
+    """
+
+    def __init__(self, bus=None, led=None):
+        """
+        Initialize the device manager and the hardware if available
+
+        Args:
+            bus: Object with the smbus interface to drive (defaults to I2C bus 1 on the robot)
+            led: Class with the gpiozero LED interface for the motor direction pins
+        """
+        self.robot = None
+        self.bus = bus
+
+        if bus is not None or HARDWARE_AVAILABLE:
+            try:
+                self.robot = LOBOROBOT(bus=bus, led=led)
+                logger.info(f"LOBOROBOT {'hardware' if bus is None else 'on ' + type(bus).__name__} initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize LOBOROBOT hardware: {e}")
+
+        self.bus_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending = []
+        self._busy = deque()  # (end time, seconds the bus was held) within the utilization window
+
+        # Statistics
+        self.operations = 0
+        self.batches = 0
+        self.operations_merged = 0  # Operations run in a batch started by another caller
+        self.errors = 0
+        self.busy_time = 0.0
+        self.resyncs = 0
+
+    @classmethod
+    def simulated(cls, **bus_options):
+        """
+        Create a device manager driving a simulated bus
+
+        Args:
+            **bus_options: SimulatedSMBus options (bus_speed, transaction_overhead, realtime, record_limit)
+
+        Returns:
+            DeviceManager: Device manager with a SimulatedSMBus and SimulatedLED pins
+        """
+        return cls(SimulatedSMBus(**bus_options), SimulatedLED)
+
+    @property
+    def available(self):
+        """Whether the motor/servo hardware is present"""
+        return self.robot is not None
+
+    def execute(self, operation, *args):
+        """
+        Run a hardware operation with exclusive access to the bus
+
+        Args:
+            operation (callable): Function using self.robot, e.g. robot.t_up
+            *args: Arguments passed to the operation
+
+        Returns:
+            The operation's return value
+
+        Raises:
+            Exception: Whatever the operation or its register writes raised
+        """
+        entry = BusOperation(operation, args)
+        with self._pending_lock:
+            self._pending.append(entry)
+
+        with self.bus_lock:
+            # Another caller may have run this operation in its batch meanwhile
+            if not entry.done:
+                self._run_pending()
+
+        if entry.error is not None:
+            raise entry.error
+        return entry.result
+
+    def _run_pending(self):
+        """Run every pending operation in one batch; called with the bus lock held"""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+
+        start = time.perf_counter()
+        try:
+            with self.robot.pwm.batch() if self.robot is not None else nullcontext():
+                for entry in batch:
+                    try:
+                        entry.result = entry.operation(*entry.args)
+                    except Exception as e:
+                        entry.error = e
+                        self.errors += 1
+        except Exception as e:
+            # The merged register writes failed
+            logger.error(f"Hardware bus error: {e}")
+            self.errors += 1
+            for entry in batch:
+                if entry.error is None:
+                    entry.error = e
+        finally:
+            for entry in batch:
+                entry.done = True
+
+        end = time.perf_counter()
+        self.operations += len(batch)
+        self.batches += 1
+        self.operations_merged += len(batch) - 1
+        self.busy_time += end - start
+        self._busy.append((end, end - start))
+
+    def resync(self):
+        """
+        Re-initialise the PCA9685 and rewrite its channel registers
+
+        The register cache skips writes of values the chip already holds;
+        after a chip reset or brownout those values are gone, so the cache
+        is dropped and the last known channel values are written again.
+
+        Returns:
+            bool: True if the chip was re-initialised, False without hardware
+        """
+        if self.robot is None:
+            return False
+
+        with self.bus_lock:
+            self.robot.pwm.resync()
+            self.resyncs += 1
+        logger.info("PCA9685 re-initialised and channel registers rewritten")
+        return True
+
+    def get_stats(self):
+        """
+        Get bus statistics
+
+        Returns:
+            dict: Operation, batch and resync counters, bus busy time and utilization, the I2C write
+                  counters, and simulated bus statistics when running on a simulated bus
+        """
+        with self.bus_lock:
+            now = time.perf_counter()
+            while self._busy and self._busy[0][0] < now - UTILIZATION_WINDOW:
+                self._busy.popleft()
+
+            return {
+                "available": self.available,
+                "operations": self.operations,
+                "batches": self.batches,
+                "operations_merged": self.operations_merged,
+                "errors": self.errors,
+                "resyncs": self.resyncs,
+                "busy_time": self.busy_time,
+                "utilization": sum(busy for _, busy in self._busy) / UTILIZATION_WINDOW,
+                "i2c": self.robot.pwm.getStats() if self.robot is not None else None,
+                "bus": self.bus.get_stats() if hasattr(self.bus, 'get_stats') else None
+            }
+
+_device_manager = None
+_device_manager_lock = threading.Lock()
+
+def get_device_manager():
+    """
+    Get the process-wide device manager, creating it on first use
+
+    Returns:
+        DeviceManager: The shared device manager
+    """
+    global _device_manager
+    with _device_manager_lock:
+        if _device_manager is None:
+            _device_manager = DeviceManager()
+        return _device_manager
+
+def set_device_manager(manager):
+    """
+    Replace the process-wide device manager
+
+    Call before the controllers are created, e.g. to run the whole
+    application against DeviceManager.simulated() for load testing.
+
+    Args:
+        manager (DeviceManager): Device manager to use
+    """
+    global _device_manager
+    with _device_manager_lock:
+        _device_manager = manager
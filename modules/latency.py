@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Latency Instrumentation Module
+
+import logging
+import threading
+import bisect
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 33, 50, 75, 100, 150, 200, 300, 500, 1000, 2000]
+
+# Video pipeline stages, in frame order
+VIDEO_STAGES = [
+    'capture_to_encode',  # Frame captured -> encode started (queueing behind other work)
+    'encode',             # JPEG encode start -> end
+    'encode_to_emit',     # Encode done -> frame handed to Socket.IO
+    'emit_to_ack',        # Emitted -> render acknowledgement received (includes the ack's network leg)
+    'client_render',      # Received by the browser -> drawn, measured on the client clock
+    'glass_to_glass'      # Captured -> render acknowledgement received
+]
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram
+
+    Recording is O(log buckets) and memory is constant, so it can run on
+    every frame.
+    """
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        """
+        Initialize the histogram
+
+        Args:
+            buckets_ms (list): Sorted bucket upper bounds in milliseconds
+        """
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def record(self, value_ms):
+        """
+        Record one latency sample
+
+        Args:
+            value_ms (float): Latency in milliseconds
+        """
+        value_ms = max(0.0, value_ms)
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile from the buckets
+
+        Args:
+            fraction (float): Percentile as a fraction (0.95 for p95)
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, or None without samples
+        """
+        if self.count == 0:
+            return None
+
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                if index < len(self.buckets_ms):
+                    return min(self.buckets_ms[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def get_stats(self):
+        """
+        Get histogram statistics
+
+        Returns:
+            dict: Count, mean, min, max, percentiles and bucket counts
+        """
+        labels = [f"<={bound}" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+class LatencyTracker:
+    """
+    Per-stage latency histograms for the video pipeline
+    """
+
+    def __init__(self, stages=VIDEO_STAGES):
+        """
+        Initialize the latency tracker
+
+        Args:
+            stages (list): Names of the tracked stages
+        """
+        self.stages = list(stages)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear every histogram"""
+        with self._lock:
+            self.histograms = {stage: LatencyHistogram() for stage in self.stages}
+
+    def record(self, stage, seconds):
+        """
+        Record a stage duration
+
+        Args:
+            stage (str): Stage name
+            seconds (float): Duration in seconds
+        """
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is not None:
+                histogram.record(seconds * 1000)
+
+    def get_stats(self):
+        """
+        Get statistics for every stage
+
+        Returns:
+            dict: Stage name -> histogram statistics
+        """
+        with self._lock:
+            return {stage: self.histograms[stage].get_stats() for stage in self.stages}
@@ -3,135 +3,496 @@
 
 import logging
 import time
+import queue
 import threading
+import itertools
 import math
-try:
-    from modules.LOBOROBOT import LOBOROBOT
-    HARDWARE_AVAILABLE = True
-except ImportError:
-    HARDWARE_AVAILABLE = False
-    logging.warning("LOBOROBOT library not available, running in simulation mode")
+import numpy as np
+from modules.hardware import get_device_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Valid movement directions
+DIRECTIONS = ['forward', 'backward', 'left', 'right', 'stop']
+
+# Direction of continuous velocity commands
+DRIVE_DIRECTION = 'drive'
+
+# Wheel mixing of the mecanum chassis: one row per motor (0-3), one column per
+# body velocity (vx forward, vy strafe left, omega turn counter-clockwise),
+# matching the wheel directions of LOBOROBOT's t_up, moveLeft and turnLeft
+WHEEL_MIX = np.array([
+    [1, -1, -1],
+    [1, 1, 1],
+    [1, 1, -1],
+    [1, -1, 1]
+], dtype=float)
+
+# (vx, vy, omega) of the discrete directions, matching LOBOROBOT's t_up, t_down, turnLeft and turnRight
+DIRECTION_VELOCITIES = {
+    'forward': (1, 0, 0),
+    'backward': (-1, 0, 0),
+    'left': (0, 0, 1),
+    'right': (0, 0, -1)
+}
+
+# Pending movement commands kept for the actuator thread
+COMMAND_QUEUE_SIZE = 16
+
+# Motors stop when a command without a duration is not renewed for this long (seconds)
+WATCHDOG_TIMEOUT = 5
+
+# Wheel ramp: control rate (Hz), maximum rate of change of a wheel duty
+# (percent per second) and maximum change of that rate (percent per second^2)
+PROFILE_RATE = 50
+DEFAULT_MAX_ACCEL = 250.0
+DEFAULT_MAX_JERK = 2500.0
+
+# Wheels within this many duty percent of their targets have arrived
+PROFILE_TOLERANCE = 0.5
+
+def mix_wheels(vx, vy, omega):
+    """
+    Convert body velocities to signed wheel duties
+    
+    Accepts scalars or equal-length arrays (one column per command). When
+    a wheel would exceed full speed, all wheels are scaled down together so
+    the direction of travel is kept.
+    
+    Args:
+        vx (float): Forward velocity (-1 to 1, fraction of full speed)
+        vy (float): Leftward strafe velocity (-1 to 1)
+        omega (float): Counter-clockwise turn rate (-1 to 1)
+    
+    Returns:
+        numpy.ndarray: Duty per motor in percent (-100 to 100, negative is backward)
+    """
+    wheels = WHEEL_MIX @ np.array([vx, vy, omega], dtype=float)
+    peak = np.maximum(np.abs(wheels).max(axis=0), 1.0)
+    return np.round(wheels / peak * 100)
+
+class WheelProfile:
+    """
+    Acceleration- and jerk-limited ramp of the four wheel duties
+    
+    All wheels move along the straight line from their current duties to
+    their targets and arrive together, so the direction of travel holds
+    during the ramp. The leading wheel's duty changes at most max_accel
+    percent per second, and that rate changes at most max_jerk percent per
+    second squared, which avoids the current spikes of a duty step.
+    """
+    
+    def __init__(self, rate=PROFILE_RATE, max_accel=DEFAULT_MAX_ACCEL, max_jerk=DEFAULT_MAX_JERK):
+        """
+        Initialize the wheel profile
+        
+        Args:
+            rate (float): Control rate in Hz
+            max_accel (float): Maximum rate of change of the wheel duties in percent per second (0 disables ramping)
+            max_jerk (float): Maximum change of that rate in percent per second squared
+        """
+        self.rate = rate
+        self.max_accel = max_accel
+        self.max_jerk = max_jerk
+        
+        self.duties = np.zeros(4)
+        self.targets = np.zeros(4)
+        self.ramp_rate = 0.0  # Current rate of change of the leading wheel
+    
+    @property
+    def is_ramping(self):
+        """Whether the wheels are still moving toward their targets"""
+        return not np.array_equal(self.duties, self.targets)
+    
+    def set_target(self, wheels):
+        """
+        Set new wheel duty targets
+        
+        Args:
+            wheels (numpy.ndarray): Signed duty per motor
+        """
+        self.targets = np.asarray(wheels, dtype=float).copy()
+        if not self.max_accel:
+            self.duties = self.targets.copy()
+            self.ramp_rate = 0.0
+    
+    def stop(self):
+        """Zero the duties and targets at once"""
+        self.duties = np.zeros(4)
+        self.targets = np.zeros(4)
+        self.ramp_rate = 0.0
+    
+    def step(self, dt):
+        """
+        Advance the ramp by one control period
+        
+        Args:
+            dt (float): Control period in seconds
+        """
+        error = self.targets - self.duties
+        distance = np.abs(error).max()
+        # Ramping may have been disabled mid-ramp
+        if distance < PROFILE_TOLERANCE or not self.max_accel:
+            self.duties = self.targets.copy()
+            self.ramp_rate = 0.0
+            return
+        
+        # Ease into the maximum rate, and brake so the rate reaches zero at the target
+        command = min(self.max_accel, math.sqrt(2 * self.max_jerk * distance))
+        max_change = self.max_jerk * dt
+        self.ramp_rate += max(-max_change, min(command - self.ramp_rate, max_change))
+        
+        self.duties += error / distance * min(self.ramp_rate * dt, distance)
+    
+    def get_state(self):
+        """
+        Get the profile state
+        
+        Returns:
+            dict: Limits, current and target duties per wheel and the current ramp rate
+        """
+        return {
+            "rate": self.rate,
+            "max_accel": self.max_accel,
+            "max_jerk": self.max_jerk,
+            "ramping": self.is_ramping,
+            "duties": np.round(self.duties, 1).tolist(),
+            "targets": self.targets.tolist(),
+            "ramp_rate": round(self.ramp_rate, 1)
+        }
+
+class MovementCommand:
+    """
+    One movement command queued for the actuator thread
+    """
+    
+    def __init__(self, command_id, direction, speed_percent, duration=None, velocity=None, wheels=None):
+        """
+        Initialize the movement command
+        
+        Args:
+            command_id (int): Unique command id
+            direction (str): Movement direction
+            speed_percent (int): Speed percentage (0-100)
+            duration (float): Seconds to move before stopping (None to move until the next command)
+            velocity (tuple): (vx, vy, omega) of a drive command
+            wheels (numpy.ndarray): Signed duty per motor of a drive command
+        """
+        self.command_id = command_id
+        self.direction = direction
+        self.speed_percent = speed_percent
+        self.duration = duration
+        self.velocity = velocity
+        self.wheels = wheels
+        self.queued_at = time.monotonic()
+
 class MovementController:
     """
     Controls the movement of the four-wheel drive car using LOBOROBOT library
+    
+    A dedicated actuator thread owns the motor hardware. move() only queues
+    a command and returns its id, so request handlers never wait for the
+    motors; timed moves are stopped by the actuator at their deadline. The
+    actuator ramps wheel duties toward each command under acceleration and
+    jerk limits; stops bypass the ramp.
     """
     
-    def __init__(self):
-        """Initialize the movement controller"""
+    def __init__(self, hardware=None):
+        """
+        Initialize the movement controller
+        
+        Args:
+            hardware (DeviceManager): Device manager owning the motor driver (defaults to the process-wide one)
+        """
         logger.info("Initializing Movement Controller with LOBOROBOT")
-        global HARDWARE_AVAILABLE
         
         # Movement state
         self.current_direction = 'stop'
         self.current_speed = 0
+        self.current_velocity = None  # (vx, vy, omega) while a drive command is active
         
-        # Initialize LOBOROBOT if available
-        if HARDWARE_AVAILABLE:
-            try:
-                self.robot = LOBOROBOT()
-                logger.info("LOBOROBOT hardware initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize LOBOROBOT hardware: {e}")
-                HARDWARE_AVAILABLE = False
+        # Wheel duties ramp toward each command's targets
+        self.profile = WheelProfile()
+        self._written_wheels = np.zeros(4)
+        
+        # The LOBOROBOT instance is shared with the camera gimbal through the device manager
+        self.hardware = hardware or get_device_manager()
+        self.robot = self.hardware.robot
+        
+        # Command queue consumed by the actuator thread
+        self.command_queue = queue.Queue(maxsize=COMMAND_QUEUE_SIZE)
+        self._command_ids = itertools.count(1)
+        self._queue_lock = threading.Lock()
+        self.current_command_id = None
+        self.deadline = None  # Monotonic time the current timed move ends
         
-        # Start watchdog timer to automatically stop motors if no commands received
+        # Statistics
+        self.commands_queued = 0
+        self.commands_executed = 0
+        self.commands_dropped = 0
+        
+        # Start the actuator thread; it also stops the motors if no commands are received
         self.last_command_time = time.time()
-        self.watchdog_thread = threading.Thread(target=self._watchdog, daemon=True)
-        self.watchdog_thread.start()
+        self.is_running = True
+        self.actuator_thread = threading.Thread(target=self._actuator_loop, daemon=True)
+        self.actuator_thread.start()
     
-    def move(self, direction, speed_percent):
+    def move(self, direction, speed_percent, duration=None):
         """
-        Move the car in the specified direction at the specified speed
+        Queue a move in the specified direction at the specified speed
+        
+        Returns immediately; the actuator thread applies the command. A stop
+        discards every pending command so it takes effect at once.
         
         Args:
             direction (str): 'forward', 'backward', 'left', 'right', or 'stop'
             speed_percent (int): Speed percentage (0-100)
+            duration (float): Seconds to move before stopping (optional)
         
         Returns:
-            bool: Success status
+            int: Command id, or None if the command is invalid
         """
-        logger.info(f"Moving {direction} at {speed_percent}% speed")
+        if direction not in DIRECTIONS:
+            logger.error(f"Invalid direction: {direction}")
+            return None
         
-        # Update last command time for watchdog
-        self.last_command_time = time.time()
+        command = MovementCommand(next(self._command_ids), direction, speed_percent, duration)
+        logger.debug(f"Queueing command {command.command_id}: {direction} at {speed_percent}% speed")
         
-        # Update current state
-        self.current_direction = direction
-        self.current_speed = speed_percent
+        return self._enqueue(command)
+    
+    def drive(self, vx, vy, omega, duration=None):
+        """
+        Queue a continuous velocity command for the mecanum chassis
         
-        # Set motor directions and speeds based on movement direction
-        if direction == 'forward':
-            self._set_motors_forward(speed_percent)
-        elif direction == 'backward':
-            self._set_motors_backward(speed_percent)
-        elif direction == 'left':
-            self._set_motors_left(speed_percent)
-        elif direction == 'right':
-            self._set_motors_right(speed_percent)
-        elif direction == 'stop':
-            self._set_motors_stop()
-        else:
-            logger.error(f"Invalid direction: {direction}")
-            return False
+        The four wheel duties and directions are mixed here and written by
+        the actuator thread in one batched actuation per ramp step. A zero
+        velocity ramps down to a stop; move('stop', 0) stops at once.
         
-        return True
+        Args:
+            vx (float): Forward velocity (-1 to 1, fraction of full speed)
+            vy (float): Leftward strafe velocity (-1 to 1)
+            omega (float): Counter-clockwise turn rate (-1 to 1)
+            duration (float): Seconds to move before stopping (optional)
+        
+        Returns:
+            int: Command id
+        """
+        wheels = mix_wheels(vx, vy, omega)
+        command = MovementCommand(next(self._command_ids), DRIVE_DIRECTION, int(np.abs(wheels).max()), duration,
+                                  velocity=(vx, vy, omega), wheels=wheels)
+        logger.debug(f"Queueing command {command.command_id}: drive vx={vx} vy={vy} omega={omega}")
+        
+        return self._enqueue(command)
     
-    def _set_motors_forward(self, speed_percent):
-        """Set all motors to move forward"""
-        if HARDWARE_AVAILABLE:
-            # Using LOBOROBOT t_up method for forward movement
-            # The t_time parameter is set to 0.1 to allow continuous movement
-            # The watchdog will stop the motors if no new commands are received
-            self.robot.t_up(speed_percent, 0.1)
-        else:
-            logger.info("Simulation: All motors moving forward")
+    def _enqueue(self, command):
+        """Queue a command for the actuator thread and return its id"""
+        with self._queue_lock:
+            if command.direction == 'stop':
+                self._discard_pending()
+            
+            # The queue is bounded; the oldest pending command gives way to the newest
+            while True:
+                try:
+                    self.command_queue.put_nowait(command)
+                    break
+                except queue.Full:
+                    try:
+                        self.command_queue.get_nowait()
+                        self.commands_dropped += 1
+                    except queue.Empty:
+                        pass
+            
+            self.commands_queued += 1
+        
+        return command.command_id
     
-    def _set_motors_backward(self, speed_percent):
-        """Set all motors to move backward"""
-        if HARDWARE_AVAILABLE:
-            # Using LOBOROBOT t_down method for backward movement
-            self.robot.t_down(speed_percent, 0.1)
-        else:
-            logger.info("Simulation: All motors moving backward")
+    def _discard_pending(self):
+        """Drop every queued command"""
+        while True:
+            try:
+                self.command_queue.get_nowait()
+                self.commands_dropped += 1
+            except queue.Empty:
+                return
     
-    def _set_motors_left(self, speed_percent):
-        """Set motors to turn left"""
-        if HARDWARE_AVAILABLE:
-            # Using LOBOROBOT turnLeft method for left turn
-            self.robot.turnLeft(speed_percent, 0.1)
+    def _actuator_loop(self):
+        """Actuator thread: apply queued commands, ramp the wheels, end timed moves, run the watchdog"""
+        period = 1 / self.profile.rate
+        next_tick = time.monotonic()
+        
+        while self.is_running:
+            # Wake for the next command, profile tick, the current move's deadline or the watchdog check
+            now = time.monotonic()
+            timeout = 1.0
+            if self.profile.is_ramping:
+                timeout = min(timeout, next_tick - now)
+            if self.deadline is not None:
+                timeout = min(timeout, self.deadline - now)
+            
+            try:
+                command = self.command_queue.get(timeout=max(0, timeout))
+            except queue.Empty:
+                command = None
+            
+            try:
+                if command is not None:
+                    self._execute(command)
+                elif self.deadline is not None and time.monotonic() >= self.deadline:
+                    logger.info(f"Command {self.current_command_id} finished")
+                    self.deadline = None
+                    self._apply('stop', 0, immediate=False)
+                elif self.deadline is None and self.current_direction != 'stop' and \
+                        time.time() - self.last_command_time > WATCHDOG_TIMEOUT:
+                    logger.warning(f"Watchdog triggered: No movement commands for {WATCHDOG_TIMEOUT} seconds")
+                    self._apply('stop', 0)
+                
+                # Advance the ramp at the profile rate
+                now = time.monotonic()
+                if not self.profile.is_ramping:
+                    next_tick = now
+                elif now >= next_tick:
+                    self.profile.step(period)
+                    self._write_wheels()
+                    next_tick = max(next_tick + period, now)
+            except Exception as e:
+                logger.error(f"Error in movement actuator: {e}")
+    
+    def _execute(self, command):
+        """Apply a queued command and arm its deadline"""
+        if command.direction == DRIVE_DIRECTION:
+            # Drive commands stream from the joystick; keep them out of the info log
+            logger.debug(f"Driving with wheel duties {command.wheels.tolist()}")
         else:
-            logger.info("Simulation: Motors turning left")
+            logger.info(f"Moving {command.direction} at {command.speed_percent}% speed"
+                        f"{f' for {command.duration}s' if command.duration else ''}")
+        
+        # Update last command time for watchdog
+        self.last_command_time = time.time()
+        self.current_command_id = command.command_id
+        self.deadline = time.monotonic() + command.duration if command.duration else None
+        self.commands_executed += 1
+        
+        self._apply(command.direction, command.speed_percent, command.velocity, command.wheels)
     
-    def _set_motors_right(self, speed_percent):
-        """Set motors to turn right"""
-        if HARDWARE_AVAILABLE:
-            # Using LOBOROBOT turnRight method for right turn
-            self.robot.turnRight(speed_percent, 0.1)
+    def _apply(self, direction, speed_percent, velocity=None, wheels=None, immediate=True):
+        """
+        Set new wheel targets; only called from the actuator thread
+        
+        Args:
+            direction (str): Movement direction
+            speed_percent (int): Speed percentage (0-100)
+            velocity (tuple): (vx, vy, omega) of a drive command
+            wheels (numpy.ndarray): Signed duty per motor of a drive command
+            immediate (bool): For a stop, cut the motors at once instead of ramping down
+        """
+        if direction == 'stop' and immediate:
+            # Stops bypass the profile
+            self.current_direction = 'stop'
+            self.current_speed = 0
+            self.current_velocity = None
+            self.profile.stop()
+            self._written_wheels = np.zeros(4)
+            self._set_motors_stop()
+            return
+        
+        if direction == 'stop':
+            wheels = np.zeros(4)
+        elif wheels is None:
+            # Discrete moves run every wheel at the same duty, signed by WHEEL_MIX
+            wheels = WHEEL_MIX @ np.array(DIRECTION_VELOCITIES[direction], dtype=float) * speed_percent
+        
+        # A drive at zero velocity ramps down to a stop
+        self.current_direction = direction if wheels.any() else 'stop'
+        self.current_speed = speed_percent
+        self.current_velocity = velocity
+        self.profile.set_target(wheels)
+        
+        if not self.profile.is_ramping:
+            # Ramping disabled: the wheels jump to the target
+            self._write_wheels()
+    
+    def _write_wheels(self):
+        """Write the profile's current wheel duties if they changed"""
+        wheels = np.round(self.profile.duties)
+        if np.array_equal(wheels, self._written_wheels):
+            return
+        self._written_wheels = wheels
+        
+        if self.hardware.available:
+            # One device manager operation, so all four motors are written in one batch
+            self.hardware.execute(self._run_wheels, wheels)
         else:
-            logger.info("Simulation: Motors turning right")
+            logger.debug(f"Simulation: Wheel duties {wheels.tolist()}")
+    
+    def _run_wheels(self, wheels):
+        """Run the motors at signed duties; called by the device manager"""
+        for motor, duty in enumerate(wheels):
+            if duty:
+                self.robot.MotorRun(motor, 'forward' if duty > 0 else 'backward', int(abs(duty)))
+            else:
+                self.robot.MotorStop(motor)
     
     def _set_motors_stop(self):
         """Stop all motors"""
-        if HARDWARE_AVAILABLE:
-            # Using LOBOROBOT t_stop method to stop all motors
-            self.robot.t_stop(0.1)
+        if self.hardware.available:
+            # Using LOBOROBOT t_stop method to stop all motors; the t_time
+            # parameter is 0 so the actuator thread never blocks
+            self.hardware.execute(self.robot.t_stop, 0)
         else:
             logger.info("Simulation: All motors stopped")
     
-    def _watchdog(self):
-        """Watchdog timer to stop motors if no commands received for 5 seconds"""
-        while True:
-            if time.time() - self.last_command_time > 5:
-                logger.warning("Watchdog triggered: No movement commands for 5 seconds")
-                self._set_motors_stop()
-            time.sleep(1)
+    def set_profile(self, max_accel=None, max_jerk=None):
+        """
+        Change the wheel ramp limits
+        
+        Args:
+            max_accel (float): Maximum rate of change of the wheel duties in percent per second (0 disables ramping)
+            max_jerk (float): Maximum change of that rate in percent per second squared
+        
+        Returns:
+            bool: True if the limits were valid and applied
+        """
+        for value in (max_accel, max_jerk):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+                return False
+        if max_jerk == 0:
+            return False
+        
+        if max_accel is not None:
+            self.profile.max_accel = max_accel
+        if max_jerk is not None:
+            self.profile.max_jerk = max_jerk
+        logger.info(f"Wheel profile set to {self.profile.max_accel} %/s, {self.profile.max_jerk} %/s^2")
+        return True
+    
+    def get_status(self):
+        """
+        Get the movement status
+        
+        Returns:
+            dict: Current direction, speed, velocity, wheel profile and command, time left of a timed move,
+                  queue depth and counters
+        """
+        deadline = self.deadline
+        return {
+            "direction": self.current_direction,
+            "speed": self.current_speed,
+            "velocity": self.current_velocity,
+            "profile": self.profile.get_state(),
+            "command_id": self.current_command_id,
+            "remaining": max(0, deadline - time.monotonic()) if deadline is not None else None,
+            "queued": self.command_queue.qsize(),
+            "commands_queued": self.commands_queued,
+            "commands_executed": self.commands_executed,
+            "commands_dropped": self.commands_dropped
+        }
     
     def cleanup(self):
         """Clean up resources"""
         logger.info("Cleaning up movement controller resources")
-        self._set_motors_stop() 
\ No newline at end of file
+        self.is_running = False
+        self.actuator_thread.join(timeout=2.0)
+        self._apply('stop', 0) 
\ No newline at end of file
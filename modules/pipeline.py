@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Frame Processing Pipeline Module
+
+import logging
+import time
+import threading
+from modules.latency import LatencyHistogram
+from modules.workers import run_in_worker
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fraction of the frame interval the pipeline may use; the rest is left for
+# publishing the frame and for the capture call itself
+DEFAULT_BUDGET_FRACTION = 0.8
+
+# Weight of the newest sample in a stage's running cost estimate
+COST_SMOOTHING = 0.2
+
+class PipelineStage:
+    """
+    One frame-processing stage with its time budget and statistics
+    """
+
+    def __init__(self, name, func, budget_ms, optional=False, modifies_frame=True, offload=True):
+        """
+        Initialize the pipeline stage
+
+        Args:
+            name (str): Unique stage name
+            func (callable): func(data, context) -> new frame array, or None to keep the input
+            budget_ms (float): Time the stage is expected to take per frame
+            optional (bool): Whether the stage may be skipped when the frame deadline is at risk
+            modifies_frame (bool): Whether the stage changes the pixels (invalidates camera-encoded JPEGs)
+            offload (bool): Run the stage in an OS worker thread (for CPU-bound stages)
+        """
+        self.name = name
+        self.func = func
+        self.budget_ms = budget_ms
+        self.optional = optional
+        self.modifies_frame = modifies_frame
+        self.offload = offload
+        self.enabled = True
+
+        # Statistics
+        self.histogram = LatencyHistogram()
+        self.cost_ms = None  # Running estimate of the stage's cost
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.over_budget = 0
+
+    @property
+    def expected_ms(self):
+        """Expected cost of the next run: the measured cost once known, else the declared budget"""
+        return self.budget_ms if self.cost_ms is None else self.cost_ms
+
+    def skip(self):
+        """Record a skipped run"""
+        self.skipped += 1
+
+        # Let the estimate relax toward the declared budget, so a stage that
+        # was slow once gets retried when the frame has enough time left
+        if self.cost_ms is not None and self.cost_ms > self.budget_ms:
+            self.cost_ms += COST_SMOOTHING * (self.budget_ms - self.cost_ms)
+
+    def record(self, elapsed_ms):
+        """Record the duration of one run"""
+        self.runs += 1
+        self.histogram.record(elapsed_ms)
+        if elapsed_ms > self.budget_ms:
+            self.over_budget += 1
+
+        if self.cost_ms is None:
+            self.cost_ms = elapsed_ms
+        else:
+            self.cost_ms += COST_SMOOTHING * (elapsed_ms - self.cost_ms)
+
+    def get_stats(self):
+        """
+        Get stage statistics
+
+        Returns:
+            dict: Settings, counters and latency histogram of the stage
+        """
+        return {
+            "name": self.name,
+            "budget_ms": self.budget_ms,
+            "optional": self.optional,
+            "enabled": self.enabled,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "over_budget": self.over_budget,
+            "cost_ms": self.cost_ms,
+            "latency": self.histogram.get_stats()
+        }
+
+class FramePipeline:
+    """
+    Ordered frame-processing stages run on every captured frame
+
+    Each frame gets a deadline derived from the camera frame interval. Before
+    an optional stage runs, its expected cost is compared with the time left;
+    if it would miss the deadline the stage is skipped for this frame, so
+    analytics degrade before the camera frame rate does. Required stages
+    always run.
+    """
+
+    def __init__(self, framerate=30, budget_fraction=DEFAULT_BUDGET_FRACTION):
+        """
+        Initialize the frame pipeline
+
+        Args:
+            framerate (int): Camera frame rate the deadline is derived from
+            budget_fraction (float): Fraction of the frame interval available to the stages
+        """
+        self.frame_budget = budget_fraction / framerate
+        self.stages = []
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.frames = 0
+        self.frames_over_deadline = 0
+        self.histogram = LatencyHistogram()
+
+    def add_stage(self, name, func, budget_ms, optional=False, modifies_frame=True, offload=True, before=None):
+        """
+        Register a processing stage
+
+        Args:
+            name (str): Unique stage name
+            func (callable): func(data, context) -> new frame array, or None to keep the input
+            budget_ms (float): Time the stage is expected to take per frame
+            optional (bool): Whether the stage may be skipped when the frame deadline is at risk
+            modifies_frame (bool): Whether the stage changes the pixels
+            offload (bool): Run the stage in an OS worker thread
+            before (str): Insert before this stage instead of appending
+
+        Returns:
+            PipelineStage: The registered stage
+        """
+        stage = PipelineStage(name, func, budget_ms, optional, modifies_frame, offload)
+
+        with self._lock:
+            if any(existing.name == name for existing in self.stages):
+                raise ValueError(f"Pipeline stage already registered: {name}")
+
+            stages = list(self.stages)
+            if before is None:
+                stages.append(stage)
+            else:
+                index = [existing.name for existing in stages].index(before)
+                stages.insert(index, stage)
+
+            # Replace the list so a frame being processed keeps its snapshot
+            self.stages = stages
+
+        logger.info(f"Added pipeline stage {name} (budget {budget_ms} ms{', optional' if optional else ''})")
+        return stage
+
+    def remove_stage(self, name):
+        """
+        Remove a processing stage
+
+        Args:
+            name (str): Stage name
+
+        Returns:
+            bool: True if the stage was removed
+        """
+        with self._lock:
+            stages = [stage for stage in self.stages if stage.name != name]
+            removed = len(stages) != len(self.stages)
+            self.stages = stages
+
+        if removed:
+            logger.info(f"Removed pipeline stage {name}")
+        return removed
+
+    def set_enabled(self, name, enabled):
+        """
+        Enable or disable a processing stage
+
+        Args:
+            name (str): Stage name
+            enabled (bool): Whether the stage runs
+
+        Returns:
+            bool: True if the stage exists
+        """
+        for stage in self.stages:
+            if stage.name == name:
+                stage.enabled = enabled
+                return True
+        return False
+
+    def process(self, data, capture_time, context=None):
+        """
+        Run the stages on one frame
+
+        Args:
+            data (numpy.ndarray): Frame pixel data
+            capture_time (float): Time the frame was captured
+            context (dict): Extra per-frame information passed to every stage
+
+        Returns:
+            tuple: (processed frame data, whether any stage modified the pixels)
+        """
+        context = dict(context or {})
+        context["timestamp"] = capture_time
+        deadline = capture_time + self.frame_budget
+        modified = False
+
+        start = time.time()
+        for stage in self.stages:
+            if not stage.enabled:
+                continue
+
+            # Skip optional stages that would push the frame past its deadline
+            remaining_ms = (deadline - time.time()) * 1000
+            if stage.optional and stage.expected_ms > remaining_ms:
+                stage.skip()
+                continue
+
+            stage_start = time.perf_counter()
+            try:
+                if stage.offload:
+                    result = run_in_worker(stage.func, data, context)
+                else:
+                    result = stage.func(data, context)
+            except Exception as e:
+                stage.errors += 1
+                logger.error(f"Error in pipeline stage {stage.name}: {e}")
+                continue
+            finally:
+                stage.record((time.perf_counter() - stage_start) * 1000)
+
+            if result is not None:
+                data = result
+            modified = modified or stage.modifies_frame
+
+        end = time.time()
+        self.frames += 1
+        self.histogram.record((end - start) * 1000)
+        if end > deadline:
+            self.frames_over_deadline += 1
+
+        return data, modified
+
+    def get_stats(self):
+        """
+        Get pipeline statistics
+
+        Returns:
+            dict: Frame budget, frame counters, total latency and per-stage statistics
+        """
+        return {
+            "frame_budget_ms": self.frame_budget * 1000,
+            "frames": self.frames,
+            "frames_over_deadline": self.frames_over_deadline,
+            "latency": self.histogram.get_stats(),
+            "stages": [stage.get_stats() for stage in self.stages]
+        }
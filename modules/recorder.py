@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Video Recorder Module
+
+import logging
+import time
+import json
+import re
+import itertools
+import queue
+import struct
+import bisect
+import threading
+from pathlib import Path
+from datetime import datetime
+from modules.workers import run_in_worker
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Default location of recording sessions
+RECORDINGS_DIR = Path("recordings")
+
+# Index record of one frame: sequence, capture timestamp, byte offset and
+# length of the JPEG in the segment file
+INDEX_RECORD = struct.Struct('<QdQI')
+
+# Segment file names: the JPEGs are concatenated, so a segment is also a
+# playable MJPEG file
+SEGMENT_PATTERN = "segment_{:05d}"
+SEGMENT_SUFFIX = ".mjpeg"
+INDEX_SUFFIX = ".idx"
+SESSION_FILE = "session.json"
+
+# Session names are single directory names under the recordings directory
+SESSION_NAME_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+class VideoRecorder:
+    """
+    Records already-encoded camera frames to time-segmented files
+
+    A feeder thread waits for new frames and takes their JPEG from the
+    camera's encode cache (so frames being streamed are not encoded twice).
+    Frames are handed to a disk writer thread through a bounded queue; when
+    the disk cannot keep up the queue fills and new frames are dropped, so
+    capture and streaming never wait for the disk.
+    """
+
+    def __init__(self, camera_controller, directory=RECORDINGS_DIR, segment_seconds=60, queue_size=64):
+        """
+        Initialize the video recorder
+
+        Args:
+            camera_controller (CameraController): Source of camera frames
+            directory (str): Directory holding recording sessions
+            segment_seconds (float): Length of each segment file in seconds
+            queue_size (int): Frames buffered for the disk writer before frames are dropped
+        """
+        self.camera_controller = camera_controller
+        self.directory = Path(directory)
+        self.segment_seconds = segment_seconds
+
+        self.is_recording = False
+        self.session_dir = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._feeder_thread = None
+        self._writer_thread = None
+
+        # Current segment
+        self._segment_number = 0
+        self._segment_start = None
+        self._segment_file = None
+        self._index_file = None
+        self._segment_offset = 0
+
+        # Statistics
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.segments = 0
+        self.started = None
+
+    def start(self, name=None):
+        """
+        Start a recording session
+
+        Args:
+            name (str): Session directory name (defaults to the start time, with
+                        a numeric suffix if that session already exists)
+
+        Returns:
+            bool: True if recording started
+
+        Raises:
+            ValueError: If the name does not stay inside the recordings directory
+            FileExistsError: If a session with the given name already exists
+        """
+        if self.is_recording:
+            logger.warning("Recording is already active")
+            return False
+
+        if name:
+            self.session_dir = self._create_session_dir(name)
+        else:
+            # Two sessions started within the same second get distinct names
+            base = datetime.now().strftime("%Y%m%d_%H%M%S")
+            for attempt in itertools.count(1):
+                try:
+                    self.session_dir = self._create_session_dir(base if attempt == 1 else f"{base}_{attempt}")
+                    break
+                except FileExistsError:
+                    continue
+
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self.segments = 0
+        self._segment_number = 0
+        self.started = time.time()
+        self._write_session()
+
+        logger.info(f"Recording to {self.session_dir}")
+        self.is_recording = True
+
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
+        self._feeder_thread = threading.Thread(target=self._feed_loop, daemon=True)
+        self._feeder_thread.start()
+
+        return True
+
+    def _create_session_dir(self, name):
+        """
+        Create a new session directory
+
+        Args:
+            name (str): Session directory name
+
+        Returns:
+            Path: The created directory
+
+        Raises:
+            ValueError: If the name does not stay inside the recordings directory
+            FileExistsError: If the session already exists (its segments would be overwritten)
+        """
+        session_dir = (self.directory / name).resolve()
+        if session_dir.parent != self.directory.resolve():
+            raise ValueError(f"Invalid recording name: {name}")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        session_dir.mkdir()
+        return session_dir
+
+    def stop(self):
+        """
+        Stop the recording session, writing out frames already queued
+
+        Returns:
+            bool: True if recording was active
+        """
+        if not self.is_recording:
+            logger.warning("Recording is not active")
+            return False
+
+        logger.info("Stopping recording")
+        self.is_recording = False
+
+        if self._feeder_thread:
+            self._feeder_thread.join(timeout=2.0)
+            self._feeder_thread = None
+
+        # The writer drains the queue up to the end marker
+        self._queue.put(None)
+        if self._writer_thread:
+            self._writer_thread.join(timeout=5.0)
+            self._writer_thread = None
+
+        self._write_session()
+        logger.info(f"Recording stopped: {self.frames_written} frames written, {self.frames_dropped} dropped")
+        return True
+
+    def submit(self, encoded):
+        """
+        Queue an encoded frame for writing without blocking
+
+        Args:
+            encoded (EncodedFrame): Frame to record
+
+        Returns:
+            bool: True if queued, False if the frame was dropped
+        """
+        try:
+            self._queue.put_nowait(encoded)
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    def _feed_loop(self):
+        """Feeder thread: take the JPEG of every new frame and queue it"""
+        sequence = self.camera_controller.frame_sequence
+
+        while self.is_recording:
+            frame = self.camera_controller.wait_for_frame(sequence, timeout=0.5)
+            if frame is None:
+                continue
+
+            # Frames that arrived while the previous one was being encoded are dropped
+            if sequence and frame.sequence > sequence + 1:
+                self.frames_dropped += frame.sequence - sequence - 1
+            sequence = frame.sequence
+
+            try:
+                encoded = self.camera_controller.get_encoded_frame(frame)
+                if encoded is not None:
+                    self.submit(encoded)
+            except Exception as e:
+                logger.error(f"Error encoding frame for recording: {e}")
+
+    def _write_loop(self):
+        """Writer thread: append queued frames to the segment files"""
+        while True:
+            encoded = self._queue.get()
+            if encoded is None:
+                break
+
+            try:
+                # File I/O runs in an OS worker thread so a slow disk never stalls the eventlet hub
+                run_in_worker(self._write_frame, encoded)
+            except Exception as e:
+                logger.error(f"Error writing recorded frame: {e}")
+                self.frames_dropped += 1
+
+        self._close_segment()
+
+    def _write_frame(self, encoded):
+        """Append one frame and its index record, rolling the segment over when it is full"""
+        if self._segment_file is None or encoded.timestamp - self._segment_start >= self.segment_seconds:
+            self._close_segment()
+            self._open_segment(encoded.timestamp)
+
+        self._segment_file.write(encoded.jpeg)
+        self._index_file.write(INDEX_RECORD.pack(encoded.sequence, encoded.timestamp,
+                                                 self._segment_offset, len(encoded.jpeg)))
+        self._segment_offset += len(encoded.jpeg)
+
+        self.frames_written += 1
+        self.bytes_written += len(encoded.jpeg)
+
+    def _open_segment(self, timestamp):
+        """Open the next segment and index files"""
+        self._segment_number += 1
+        base = self.session_dir / SEGMENT_PATTERN.format(self._segment_number)
+        self._segment_file = open(base.with_suffix(SEGMENT_SUFFIX), 'wb')
+        self._index_file = open(base.with_suffix(INDEX_SUFFIX), 'wb')
+        self._segment_start = timestamp
+        self._segment_offset = 0
+        self.segments += 1
+
+    def _close_segment(self):
+        """Close the current segment and index files"""
+        if self._segment_file is None:
+            return
+
+        self._segment_file.close()
+        self._index_file.close()
+        self._segment_file = None
+        self._index_file = None
+
+    def _write_session(self):
+        """Write the session metadata file"""
+        width, height = self.camera_controller.resolution
+        session = {
+            "started": self.started,
+            "stopped": None if self.is_recording else time.time(),
+            "resolution": [width, height],
+            "framerate": self.camera_controller.framerate,
+            "segment_seconds": self.segment_seconds,
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "segments": self.segments
+        }
+
+        try:
+            with open(self.session_dir / SESSION_FILE, 'w') as f:
+                json.dump(session, f, indent=2)
+        except Exception as e:
+            logger.error(f"Failed to write recording session file: {e}")
+
+    def get_stats(self):
+        """
+        Get recording statistics
+
+        Returns:
+            dict: Recording state, session and frame counters
+        """
+        return {
+            "is_recording": self.is_recording,
+            "session": self.session_dir.name if self.session_dir else None,
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "queued": self._queue.qsize(),
+            "bytes_written": self.bytes_written,
+            "segments": self.segments,
+            "duration": time.time() - self.started if self.is_recording else None
+        }
+
+class Recording:
+    """
+    Read access to a recorded session, seekable by timestamp
+    """
+
+    def __init__(self, session_dir):
+        """
+        Open a recording session
+
+        Args:
+            session_dir (str): Session directory written by VideoRecorder
+        """
+        self.session_dir = Path(session_dir)
+        if not self.session_dir.is_dir():
+            raise FileNotFoundError(f"Recording not found: {self.session_dir}")
+
+        session_file = self.session_dir / SESSION_FILE
+        self.session = json.loads(session_file.read_text()) if session_file.exists() else {}
+
+        # Per segment: (segment path, timestamps, index records)
+        self.segments = []
+        for index_path in sorted(self.session_dir.glob("*" + INDEX_SUFFIX)):
+            data = index_path.read_bytes()
+            usable = len(data) - len(data) % INDEX_RECORD.size  # Ignore a torn last record
+            records = list(INDEX_RECORD.iter_unpack(data[:usable]))
+            if records:
+                self.segments.append((index_path.with_suffix(SEGMENT_SUFFIX),
+                                      [record[1] for record in records], records))
+
+        self._segment_starts = [segment[1][0] for segment in self.segments]
+
+    @property
+    def frame_count(self):
+        """Number of recorded frames"""
+        return sum(len(segment[2]) for segment in self.segments)
+
+    @property
+    def start_time(self):
+        """Timestamp of the first frame, or None if the recording is empty"""
+        return self.segments[0][1][0] if self.segments else None
+
+    @property
+    def end_time(self):
+        """Timestamp of the last frame, or None if the recording is empty"""
+        return self.segments[-1][1][-1] if self.segments else None
+
+    def seek(self, timestamp):
+        """
+        Find the last frame captured at or before a timestamp
+
+        Args:
+            timestamp (float): Capture time to seek to
+
+        Returns:
+            tuple: (segment number, frame number within the segment), or None if
+            the timestamp is before the recording
+        """
+        segment_number = bisect.bisect_right(self._segment_starts, timestamp) - 1
+        if segment_number < 0:
+            return None
+
+        timestamps = self.segments[segment_number][1]
+        return segment_number, bisect.bisect_right(timestamps, timestamp) - 1
+
+    def read_frame(self, segment_number, frame_number):
+        """
+        Read one recorded frame
+
+        Args:
+            segment_number (int): Segment number returned by seek()
+            frame_number (int): Frame number returned by seek()
+
+        Returns:
+            tuple: (sequence, timestamp, JPEG bytes)
+        """
+        path, _, records = self.segments[segment_number]
+        sequence, timestamp, offset, length = records[frame_number]
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return sequence, timestamp, f.read(length)
+
+    def frame_at(self, timestamp):
+        """
+        Read the frame shown at a timestamp
+
+        Args:
+            timestamp (float): Capture time
+
+        Returns:
+            tuple: (sequence, timestamp, JPEG bytes), or None if the timestamp is before the recording
+        """
+        position = self.seek(timestamp)
+        if position is None:
+            return None
+        return self.read_frame(*position)
+
+    def frames(self, start=None, end=None):
+        """
+        Iterate over recorded frames in capture order
+
+        Args:
+            start (float): First capture time to include (defaults to the beginning)
+            end (float): Last capture time to include (defaults to the end)
+
+        Yields:
+            tuple: (sequence, timestamp, JPEG bytes)
+        """
+        position = (0, 0)
+        if start is not None:
+            position = self.seek(start) or (0, 0)
+            if self.segments and self.segments[position[0]][1][position[1]] < start:
+                position = (position[0], position[1] + 1)
+
+        for segment_number in range(position[0], len(self.segments)):
+            path, _, records = self.segments[segment_number]
+            first = position[1] if segment_number == position[0] else 0
+            with open(path, 'rb') as f:
+                for sequence, timestamp, offset, length in records[first:]:
+                    if end is not None and timestamp > end:
+                        return
+                    f.seek(offset)
+                    yield sequence, timestamp, f.read(length)
+
+    def get_info(self):
+        """
+        Get a summary of the recording
+
+        Returns:
+            dict: Session metadata, frame count, time range and segments
+        """
+        return {
+            "name": self.session_dir.name,
+            "session": self.session,
+            "frames": self.frame_count,
+            "segments": len(self.segments),
+            "start_time": self.start_time,
+            "end_time": self.end_time
+        }
+
+def list_recordings(directory=RECORDINGS_DIR):
+    """
+    List recording sessions
+
+    Args:
+        directory (str): Directory holding recording sessions
+
+    Returns:
+        list: Session directory names, newest first
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted((path.name for path in directory.iterdir() if (path / SESSION_FILE).exists()), reverse=True)
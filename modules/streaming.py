@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Video Streaming Module
+
+import logging
+import time
+import threading
+import base64
+import struct
+from collections import deque
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Video transports a client can request
+TRANSPORT_BASE64 = 'base64'
+TRANSPORT_BINARY = 'binary'
+VIDEO_TRANSPORTS = [TRANSPORT_BASE64, TRANSPORT_BINARY]
+
+# Header prepended to binary video frames (network byte order):
+# sequence (uint32), capture timestamp (float64 seconds), width (uint16), height (uint16)
+FRAME_HEADER = struct.Struct('!IdHH')
+
+def pack_binary_frame(encoded_frame):
+    """
+    Pack an encoded frame into a binary video message
+
+    Args:
+        encoded_frame (EncodedFrame): Encoded frame from the camera controller
+
+    Returns:
+        bytes: Fixed-size header followed by the JPEG bytes
+    """
+    header = FRAME_HEADER.pack(
+        encoded_frame.sequence & 0xFFFFFFFF,
+        encoded_frame.timestamp,
+        encoded_frame.width,
+        encoded_frame.height
+    )
+    return header + encoded_frame.jpeg
+
+# Adaptive quality ladder, from best to cheapest. A client that falls behind
+# steps down one level at a time and steps back up once it keeps up again.
+QUALITY_LEVELS = [
+    {"quality": 85, "scale": 1.0, "fps": 30},
+    {"quality": 75, "scale": 1.0, "fps": 30},
+    {"quality": 65, "scale": 0.75, "fps": 20},
+    {"quality": 50, "scale": 0.5, "fps": 15},
+    {"quality": 40, "scale": 0.5, "fps": 10},
+    {"quality": 30, "scale": 0.25, "fps": 5}
+]
+DEFAULT_QUALITY_LEVEL = 1
+
+# Adaptation thresholds
+MAX_FRAMES_IN_FLIGHT = 2       # Unacknowledged frames before a client counts as behind
+STEP_DOWN_AFTER = 3            # Consecutive congested frames before stepping down
+STEP_UP_AFTER = 60             # Consecutive frames sent without backlog before stepping up
+ACK_TIMEOUT = 2.0              # Seconds after which an unacknowledged frame is forgotten
+
+# Multipart boundary used by the MJPEG HTTP stream
+MJPEG_BOUNDARY = 'frame'
+MJPEG_MIMETYPE = f'multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}'
+
+def generate_mjpeg(camera_controller, max_fps=None):
+    """
+    Generate a multipart MJPEG stream from the camera frame buffer
+
+    Each part reuses the camera controller's cached JPEG for the current
+    frame sequence, so MJPEG viewers share encodes with the Socket.IO viewers.
+
+    Args:
+        camera_controller (CameraController): Source of camera frames
+        max_fps (float): Frame rate cap for this connection (defaults to the camera framerate)
+
+    Yields:
+        bytes: One multipart part per new camera frame
+    """
+    max_fps = min(max_fps or camera_controller.framerate, camera_controller.framerate)
+    min_interval = 1 / max_fps
+    last_sequence = None
+    last_sent_time = 0
+
+    while camera_controller.is_streaming:
+        # Respect the per-connection frame rate cap
+        wait = min_interval - (time.time() - last_sent_time)
+        if wait > 0:
+            time.sleep(wait)
+
+        # Wait for the next frame after the last one sent
+        frame = camera_controller.wait_for_frame(last_sequence, timeout=1.0)
+        if frame is None:
+            continue
+
+        encoded = camera_controller.get_encoded_frame(frame)
+        if encoded is None:
+            continue
+
+        last_sequence = encoded.sequence
+        last_sent_time = time.time()
+
+        yield (
+            f'--{MJPEG_BOUNDARY}\r\n'
+            f'Content-Type: image/jpeg\r\n'
+            f'Content-Length: {len(encoded.jpeg)}\r\n'
+            f'X-Frame-Sequence: {encoded.sequence}\r\n'
+            f'X-Frame-Timestamp: {encoded.timestamp:.6f}\r\n\r\n'
+        ).encode('ascii') + encoded.jpeg + b'\r\n'
+
+class ClientStream:
+    """
+    Per-client video delivery state
+
+    Tracks the frames sent to one client that it has not acknowledged yet.
+    Adaptive clients acknowledge every rendered frame; a growing backlog
+    steps the client down the quality ladder (lower JPEG quality, smaller
+    frames, lower frame rate) and a clear backlog steps it back up.
+    """
+
+    def __init__(self, sid, transport=TRANSPORT_BASE64, adaptive=False):
+        """
+        Initialize the client stream
+
+        Args:
+            sid (str): Socket.IO session id
+            transport (str): 'base64' or 'binary'
+            adaptive (bool): Whether the client acknowledges frames
+        """
+        self.sid = sid
+        self.transport = transport
+        self.adaptive = adaptive
+        self.started = time.time()
+
+        # Quality state
+        self.level = DEFAULT_QUALITY_LEVEL
+
+        # Latency overlay: send per-frame stage timings to this client
+        self.overlay = False
+
+        # Delivery state
+        self.pending = deque()  # (sent time, EncodedFrame) of unacknowledged frames
+        self.last_sent_time = 0
+        self.congested_count = 0
+        self.clear_count = 0
+
+        # Statistics
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.level_changes = 0
+
+    @property
+    def settings(self):
+        """Quality settings of the current level"""
+        return QUALITY_LEVELS[self.level]
+
+    def should_send(self, now):
+        """
+        Decide whether the next frame should go to this client
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            bool: True if a frame should be sent now
+        """
+        # Respect the frame rate of the current level
+        if now - self.last_sent_time < 1 / self.settings["fps"] * 0.9:
+            return False
+
+        # Forget frames whose acknowledgement was lost (or that are never acknowledged)
+        while self.pending and now - self.pending[0][0] > ACK_TIMEOUT:
+            self.pending.popleft()
+
+        if not self.adaptive:
+            return True
+
+        # Skip frames while the client is behind, and step down if it stays behind
+        if len(self.pending) >= MAX_FRAMES_IN_FLIGHT:
+            self.frames_skipped += 1
+            self.clear_count = 0
+            self.congested_count += 1
+            if self.congested_count >= STEP_DOWN_AFTER:
+                self._set_level(self.level + 1)
+            return False
+
+        self.congested_count = 0
+        return True
+
+    def on_sent(self, encoded, now, sent_time=None):
+        """
+        Record that an encoded frame was sent to this client
+
+        Args:
+            encoded (EncodedFrame): Frame that was sent
+            now (float): Time the send was decided, which the frame rate is paced from
+            sent_time (float): Time the frame was emitted, for latency measurements (defaults to now)
+        """
+        self.last_sent_time = now
+        self.frames_sent += 1
+
+        # Step back up after a long enough run without backlog; frames still in
+        # flight below the limit are normal when the ack round trip is long
+        if self.adaptive and len(self.pending) < MAX_FRAMES_IN_FLIGHT:
+            self.clear_count += 1
+            if self.clear_count >= STEP_UP_AFTER:
+                self._set_level(self.level - 1)
+        self.pending.append((now if sent_time is None else sent_time, encoded))
+
+    def on_ack(self, sequence):
+        """
+        Record a frame acknowledgement from the client
+
+        Args:
+            sequence (int): Sequence number of the rendered frame
+
+        Returns:
+            tuple: (sent time, EncodedFrame) of the acknowledged frame, or None if unknown
+        """
+        # An acknowledgement also covers every older frame
+        acknowledged = None
+        while self.pending and self.pending[0][1].sequence <= sequence:
+            entry = self.pending.popleft()
+            if entry[1].sequence == sequence:
+                acknowledged = entry
+        return acknowledged
+
+    def _set_level(self, level):
+        """Move to another quality level"""
+        level = max(0, min(level, len(QUALITY_LEVELS) - 1))
+        self.congested_count = 0
+        self.clear_count = 0
+
+        if level == self.level:
+            return
+
+        logger.info(f"Video quality for {self.sid}: level {self.level} -> {level} ({QUALITY_LEVELS[level]})")
+        self.level = level
+        self.level_changes += 1
+
+    def get_stats(self):
+        """
+        Get client stream statistics
+
+        Returns:
+            dict: Client stream statistics
+        """
+        return {
+            "transport": self.transport,
+            "adaptive": self.adaptive,
+            "overlay": self.overlay,
+            "level": self.level,
+            "settings": dict(self.settings),
+            "frames_in_flight": len(self.pending),
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "level_changes": self.level_changes
+        }
+
+class VideoBroadcaster:
+    """
+    Broadcasts camera frames to every subscribed Socket.IO client
+
+    A single broadcast loop encodes each variant of a new camera frame once
+    and sends the same payload to every client on that variant, so encoder
+    load does not grow with the number of viewers. Clients on the base64
+    transport receive a JSON payload, clients on the binary transport
+    receive the raw JPEG bytes with a small header as a binary attachment.
+    """
+
+    def __init__(self, socketio, camera_controller, latency_tracker=None):
+        """
+        Initialize the video broadcaster
+
+        Args:
+            socketio (SocketIO): Socket.IO server used to emit frames
+            camera_controller (CameraController): Source of camera frames
+            latency_tracker (LatencyTracker): Receives per-stage latencies (optional)
+        """
+        logger.info("Initializing Video Broadcaster")
+
+        self.socketio = socketio
+        self.camera_controller = camera_controller
+        self.latency_tracker = latency_tracker
+
+        # Subscribed clients: sid -> ClientStream
+        self.clients = {}
+
+        # Broadcast state
+        self.is_broadcasting = False
+        self.broadcast_thread = None
+        self.last_sequence = None
+
+        # Statistics
+        self.frames_encoded = 0
+        self.frames_sent = 0
+        self.bytes_sent = {TRANSPORT_BASE64: 0, TRANSPORT_BINARY: 0}
+
+    def add_client(self, sid, transport=TRANSPORT_BASE64, adaptive=False):
+        """
+        Add a client to the broadcast or update its transport
+
+        Args:
+            sid (str): Socket.IO session id
+            transport (str): 'base64' or 'binary'
+            adaptive (bool): Whether the client acknowledges frames
+        """
+        client = self.clients.get(sid)
+        if client is None:
+            self.clients[sid] = ClientStream(sid, transport, adaptive)
+        else:
+            client.transport = transport
+            client.adaptive = adaptive
+
+    def remove_client(self, sid):
+        """Remove a client from the broadcast"""
+        self.clients.pop(sid, None)
+
+    def set_overlay(self, sid, enabled):
+        """
+        Enable or disable the latency overlay for a client
+
+        Args:
+            sid (str): Socket.IO session id
+            enabled (bool): Whether the client receives per-frame stage timings
+        """
+        client = self.clients.get(sid)
+        if client is not None:
+            client.overlay = enabled
+
+    def acknowledge(self, sid, sequence, render_ms=None):
+        """
+        Handle a frame acknowledgement from a client
+
+        Args:
+            sid (str): Socket.IO session id
+            sequence (int): Sequence number of the rendered frame
+            render_ms (float): Time from receiving to drawing the frame, measured by the client
+        """
+        client = self.clients.get(sid)
+        if client is None:
+            return
+
+        acknowledged = client.on_ack(sequence)
+        if acknowledged is None:
+            return
+
+        now = time.time()
+        sent_time, encoded = acknowledged
+
+        if self.latency_tracker is not None:
+            self.latency_tracker.record('emit_to_ack', now - sent_time)
+            self.latency_tracker.record('glass_to_glass', now - encoded.timestamp)
+            if isinstance(render_ms, (int, float)):
+                self.latency_tracker.record('client_render', render_ms / 1000)
+
+        if client.overlay:
+            self.socketio.emit('video_frame_timing', {
+                'sequence': encoded.sequence,
+                'capture_to_encode_ms': (encoded.encode_start - encoded.timestamp) * 1000,
+                'encode_ms': (encoded.encode_end - encoded.encode_start) * 1000,
+                'encode_to_emit_ms': (sent_time - encoded.encode_end) * 1000,
+                'emit_to_ack_ms': (now - sent_time) * 1000,
+                'glass_to_glass_ms': (now - encoded.timestamp) * 1000,
+                'settings': dict(client.settings)
+            }, to=sid)
+
+    def start(self):
+        """
+        Start the broadcast loop
+
+        Returns:
+            bool: Success status
+        """
+        if self.is_broadcasting:
+            return False
+
+        logger.info("Starting video broadcast")
+        self.is_broadcasting = True
+
+        # Start broadcast thread
+        self.broadcast_thread = threading.Thread(target=self._broadcast_loop, daemon=True)
+        self.broadcast_thread.start()
+
+        return True
+
+    def stop(self):
+        """
+        Stop the broadcast loop
+
+        Returns:
+            bool: Success status
+        """
+        if not self.is_broadcasting:
+            return False
+
+        logger.info("Stopping video broadcast")
+        self.is_broadcasting = False
+
+        # Wait for broadcast thread to end
+        if self.broadcast_thread:
+            self.broadcast_thread.join(timeout=1.0)
+            self.broadcast_thread = None
+
+        return True
+
+    def _broadcast_loop(self):
+        """Broadcast thread function"""
+        logger.info("Video broadcast thread started")
+
+        try:
+            while self.is_broadcasting and self.camera_controller.is_streaming:
+                # Wait for the camera to produce a new frame
+                frame = self.camera_controller.wait_for_frame(self.last_sequence, timeout=1.0)
+                if frame is None:
+                    continue
+
+                self._send_frame(frame)
+                self.last_sequence = frame.sequence
+
+        except Exception as e:
+            logger.error(f"Video broadcast error: {e}")
+
+        self.is_broadcasting = False
+        logger.info("Video broadcast thread ended")
+
+    def _send_frame(self, frame):
+        """Send a frame to every client that is ready for it"""
+        now = time.time()
+        height, width = frame.data.shape[:2]
+
+        # Payloads built for this frame, keyed by (transport, quality level)
+        payloads = {}
+
+        for client in list(self.clients.values()):
+            if not client.should_send(now):
+                continue
+
+            key = (client.transport, client.level)
+            payload = payloads.get(key)
+
+            if payload is None:
+                settings = client.settings
+                size = None
+                if settings["scale"] != 1.0:
+                    size = (int(width * settings["scale"]) & ~1, int(height * settings["scale"]) & ~1)
+                encoded = self.camera_controller.get_encoded_frame(frame, settings["quality"], size)
+                if encoded is None:
+                    continue
+                self.frames_encoded += 1
+
+                if self.latency_tracker is not None:
+                    self.latency_tracker.record('capture_to_encode', encoded.encode_start - encoded.timestamp)
+                    self.latency_tracker.record('encode', encoded.encode_end - encoded.encode_start)
+
+                if client.transport == TRANSPORT_BINARY:
+                    payload = pack_binary_frame(encoded)
+                else:
+                    payload = {
+                        'frame': base64.b64encode(encoded.jpeg).decode('utf-8'),
+                        'sequence': encoded.sequence,
+                        'width': encoded.width,
+                        'height': encoded.height
+                    }
+                payloads[key] = (encoded, payload)
+            else:
+                encoded, payload = payload
+
+            if client.transport == TRANSPORT_BINARY:
+                self.socketio.emit('video_frame_binary', payload, to=client.sid)
+                self.bytes_sent[TRANSPORT_BINARY] += len(payload)
+            else:
+                self.socketio.emit('video_frame', payload, to=client.sid)
+                self.bytes_sent[TRANSPORT_BASE64] += len(payload['frame'])
+
+            sent_time = time.time()
+            if self.latency_tracker is not None:
+                self.latency_tracker.record('encode_to_emit', sent_time - encoded.encode_end)
+
+            # Pace from the decision time: the encode and emit time must not delay the next frame
+            client.on_sent(encoded, now, sent_time)
+            self.frames_sent += 1
+
+    def get_stats(self):
+        """
+        Get broadcast statistics
+
+        Returns:
+            dict: Broadcast statistics
+        """
+        return {
+            "is_broadcasting": self.is_broadcasting,
+            "last_sequence": self.last_sequence,
+            "frames_encoded": self.frames_encoded,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": dict(self.bytes_sent),
+            "clients": {sid: client.get_stats() for sid, client in list(self.clients.items())}
+        }
+
+class VideoStreamRegistry:
+    """
+    Tracks every active video stream and drives the camera lifecycle
+
+    Streams are keyed by client id (the Socket.IO sid, or a generated id for
+    MJPEG connections). Subscribing is idempotent, the camera and the
+    broadcaster start with the first subscriber and stop as soon as the last
+    one leaves.
+    """
+
+    def __init__(self, camera_controller, broadcaster):
+        """
+        Initialize the video stream registry
+
+        Args:
+            camera_controller (CameraController): Camera to start and stop
+            broadcaster (VideoBroadcaster): Broadcaster serving Socket.IO streams
+        """
+        logger.info("Initializing Video Stream Registry")
+
+        self.camera_controller = camera_controller
+        self.broadcaster = broadcaster
+
+        # Active streams: client id -> stream info
+        self.streams = {}
+        self._lock = threading.Lock()
+        self._mjpeg_counter = 0
+        self._lease_timers = {}  # stream id -> Timer releasing a lease
+
+    def subscribe(self, sid, transport=TRANSPORT_BASE64, adaptive=False):
+        """
+        Subscribe a Socket.IO client to the video stream
+
+        Subscribing again is a no-op apart from updating the transport and
+        adaptive settings of the existing stream.
+
+        Args:
+            sid (str): Socket.IO session id
+            transport (str): 'base64' or 'binary'
+            adaptive (bool): Whether the client acknowledges frames for quality adaptation
+
+        Returns:
+            bool: True if a new stream was created
+        """
+        with self._lock:
+            stream = self.streams.get(sid)
+
+            if stream is not None:
+                if stream["transport"] != transport:
+                    logger.info(f"Video stream for {sid} switched to {transport}")
+                stream["transport"] = transport
+                self.broadcaster.add_client(sid, transport, adaptive)
+                return False
+
+            self.streams[sid] = {
+                "transport": transport,
+                "started": time.time()
+            }
+            self.broadcaster.add_client(sid, transport, adaptive)
+            logger.info(f"Video stream ({transport}) started for {sid}")
+
+            self._ensure_running()
+            return True
+
+    def unsubscribe(self, sid):
+        """
+        Cancel a client's video stream
+
+        Args:
+            sid (str): Client id passed to subscribe
+
+        Returns:
+            bool: True if a stream was cancelled
+        """
+        with self._lock:
+            stream = self.streams.pop(sid, None)
+            if stream is None:
+                return False
+
+            self.broadcaster.remove_client(sid)
+            logger.info(f"Video stream ended for {sid}")
+
+            # Stop capturing once the last subscriber leaves
+            if not self.streams:
+                self._stop()
+
+            return True
+
+    def acknowledge(self, sid, sequence, render_ms=None):
+        """
+        Handle a frame acknowledgement from a client
+
+        Args:
+            sid (str): Socket.IO session id
+            sequence (int): Sequence number of the rendered frame
+            render_ms (float): Time from receiving to drawing the frame, measured by the client
+        """
+        self.broadcaster.acknowledge(sid, sequence, render_ms)
+
+    def set_overlay(self, sid, enabled):
+        """
+        Enable or disable the latency overlay for a client
+
+        Args:
+            sid (str): Socket.IO session id
+            enabled (bool): Whether the client receives per-frame stage timings
+        """
+        self.broadcaster.set_overlay(sid, enabled)
+
+    def hold(self, stream_id, kind):
+        """
+        Keep the camera capturing for a consumer that does not use the broadcaster
+
+        Used by MJPEG connections and by frame consumers such as the
+        shared-memory frame bus. Release the hold with unsubscribe().
+
+        Args:
+            stream_id (str): Unique id of the consumer
+            kind (str): Consumer type, reported as its transport in the stats
+
+        Returns:
+            bool: True if a new hold was registered
+        """
+        with self._lock:
+            if stream_id in self.streams:
+                return False
+
+            self.streams[stream_id] = {
+                "transport": kind,
+                "started": time.time()
+            }
+            logger.info(f"Video stream ({kind}) started for {stream_id}")
+            self._ensure_running(broadcast=False)
+            return True
+
+    def lease(self, stream_id, kind, seconds):
+        """
+        Keep the camera capturing for a limited time
+
+        Used by polling consumers such as the snapshot endpoint. Every call
+        extends the lease, so the camera stays on while requests keep coming
+        and stops once they have stopped for `seconds`.
+
+        Args:
+            stream_id (str): Unique id of the consumer
+            kind (str): Consumer type, reported as its transport in the stats
+            seconds (float): Time after which the lease expires
+
+        Returns:
+            bool: True if a new lease was registered
+        """
+        created = self.hold(stream_id, kind)
+
+        with self._lock:
+            timer = self._lease_timers.pop(stream_id, None)
+            if timer is not None:
+                timer.cancel()
+
+            timer = threading.Timer(seconds, self._expire_lease)
+            timer.args = (stream_id, timer)
+            timer.daemon = True
+            self._lease_timers[stream_id] = timer
+            timer.start()
+
+        return created
+
+    def _expire_lease(self, stream_id, timer):
+        """Release a lease that was not renewed in time"""
+        with self._lock:
+            # A renewal that raced with this timer replaced it; keep the stream
+            if self._lease_timers.get(stream_id) is not timer:
+                return
+            del self._lease_timers[stream_id]
+        self.unsubscribe(stream_id)
+
+    def mjpeg_stream(self, max_fps=None):
+        """
+        Open an MJPEG stream registered for the lifetime of the HTTP response
+
+        Args:
+            max_fps (float): Frame rate cap for this connection
+
+        Yields:
+            bytes: Multipart MJPEG parts
+        """
+        with self._lock:
+            self._mjpeg_counter += 1
+            stream_id = f"mjpeg-{self._mjpeg_counter}"
+        self.hold(stream_id, 'mjpeg')
+
+        try:
+            yield from generate_mjpeg(self.camera_controller, max_fps)
+        finally:
+            self.unsubscribe(stream_id)
+
+    def _ensure_running(self, broadcast=True):
+        """Start the camera, and the broadcaster if needed"""
+        if not self.camera_controller.is_streaming:
+            self.camera_controller.start_streaming()
+
+        if broadcast:
+            self.broadcaster.start()
+
+    def _stop(self):
+        """Stop the broadcaster and the camera"""
+        logger.info("Last video subscriber left, stopping capture")
+        self.broadcaster.stop()
+
+        if self.camera_controller.is_streaming:
+            self.camera_controller.stop_streaming()
+
+    def get_stats(self):
+        """
+        Get the live stream counts
+
+        Returns:
+            dict: Active streams per transport, running encoder loops and camera backend statistics
+        """
+        with self._lock:
+            by_transport = {}
+            for stream in self.streams.values():
+                by_transport[stream["transport"]] = by_transport.get(stream["transport"], 0) + 1
+
+            return {
+                "active_streams": len(self.streams),
+                "streams_by_transport": by_transport,
+                "encoder_loops": 1 if self.broadcaster.is_broadcasting else 0,
+                "camera_streaming": self.camera_controller.is_streaming,
+                "camera_backend": self.camera_controller.backend.get_stats(),
+                "clients": self.broadcaster.get_stats()["clients"]
+            }
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Object Tracking Module
+
+import logging
+import time
+from modules.detection import BlobDetector
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ObjectTracker:
+    """
+    Closed-loop object tracking on the robot
+
+    Runs a detector on every low-resolution frame from the camera and moves
+    the gimbal toward the target at camera rate, without a browser in the
+    loop. Detection and steering run as the camera's detection and tracking
+    pipeline stages, so a frame whose budget is exhausted skips detection
+    instead of delaying capture. Every processed frame produces an update
+    (target position and gimbal angles) passed to a callback, e.g. to emit
+    it over Socket.IO.
+    """
+
+    def __init__(self, camera_controller, detector=None, on_update=None):
+        """
+        Initialize the object tracker
+
+        Args:
+            camera_controller (CameraController): Camera and gimbal to drive
+            detector: Object with detect(data) -> Detection or None (defaults to a red BlobDetector)
+            on_update (callable): Called with a dict for every processed frame
+        """
+        self.camera_controller = camera_controller
+        self.detector = detector or BlobDetector()
+        self.on_update = on_update
+
+        self.is_tracking = False
+        self.last_update = None
+
+        # Statistics
+        self.frames_processed = 0
+        self.frames_found = 0
+        self.frames_skipped = 0
+
+    def start(self, detector=None):
+        """
+        Start tracking
+
+        Args:
+            detector: Detector to use from now on (optional)
+
+        Returns:
+            bool: True if tracking started
+        """
+        if self.is_tracking:
+            logger.warning("Object tracking is already active")
+            return False
+
+        if detector is not None:
+            self.detector = detector
+        elif hasattr(self.detector, 'reset'):
+            # Forget the previous session's target and frame
+            self.detector.reset()
+
+        logger.info("Starting object tracking")
+        self.frames_processed = 0
+        self.frames_found = 0
+        self.frames_skipped = 0
+        self.last_update = None
+        self.is_tracking = True
+
+        self.camera_controller.set_detector(self.detector, on_detection=self._handle_detection)
+
+        return True
+
+    def stop(self):
+        """
+        Stop tracking
+
+        Returns:
+            bool: True if tracking was active
+        """
+        if not self.is_tracking:
+            logger.warning("Object tracking is not active")
+            return False
+
+        logger.info("Stopping object tracking")
+        self.is_tracking = False
+        self.camera_controller.set_detector(None)
+
+        return True
+
+    def _handle_detection(self, context):
+        """
+        Move the gimbal toward the detection of one frame and report it
+
+        Args:
+            context (dict): Pipeline context of the frame, with the detection and the detected frame size
+        """
+        # The detection stage was skipped to keep the frame within its budget
+        if "detection" not in context:
+            self.frames_skipped += 1
+            return
+
+        camera = self.camera_controller
+        detection = context["detection"]
+        width, height = context["detection_size"]
+        self.frames_processed += 1
+
+        update = {
+            "sequence": context.get("sequence"),
+            "timestamp": context["timestamp"],
+            "found": detection is not None
+        }
+
+        if detection is not None:
+            self.frames_found += 1
+
+            # Detection runs on lores frames; the servo maths expects main-stream pixels
+            scale_x = camera.resolution[0] / width
+            scale_y = camera.resolution[1] / height
+            camera.track_object(detection.x * scale_x, detection.y * scale_y)
+
+            update.update({
+                "x": detection.x / width,  # Normalized target centre (0-1)
+                "y": detection.y / height,
+                "size": detection.area
+            })
+
+        update.update({
+            "pan_angle": camera.servo_control.pan,  # Target angles
+            "tilt_angle": camera.servo_control.tilt,
+            "position": camera.get_gimbal_position(),
+            "latency_ms": (time.time() - context["timestamp"]) * 1000
+        })
+        self.last_update = update
+
+        if self.on_update is not None:
+            self.on_update(update)
+
+    def get_status(self):
+        """
+        Get the tracking status
+
+        Returns:
+            dict: Tracking state, counters and the last update
+        """
+        return {
+            "is_tracking": self.is_tracking,
+            "frames_processed": self.frames_processed,
+            "frames_found": self.frames_found,
+            "frames_skipped": self.frames_skipped,
+            "detector": self.detector.get_stats() if hasattr(self.detector, 'get_stats') else None,
+            "last_update": self.last_update
+        }
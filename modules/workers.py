@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Worker Threads Module
+
+import logging
+
+try:
+    # eventlet's thread pool runs work in real OS threads
+    import eventlet.patcher
+    from eventlet import tpool
+    EVENTLET_AVAILABLE = True
+except ImportError:
+    EVENTLET_AVAILABLE = False
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Set to False to run CPU-bound work inline (used by benchmarks for comparison)
+OFFLOAD_ENABLED = True
+
+def is_offloading():
+    """
+    Check whether CPU-bound work is moved to OS threads
+
+    Offloading only matters when eventlet has monkey-patched threading: the
+    "threads" started by the app are then green threads sharing one hub, and
+    any CPU-bound call in them stalls every other request.
+
+    Returns:
+        bool: True if run_in_worker uses the OS thread pool
+    """
+    return OFFLOAD_ENABLED and EVENTLET_AVAILABLE and eventlet.patcher.is_monkey_patched('thread')
+
+def run_in_worker(func, *args, **kwargs):
+    """
+    Run a CPU-bound function without blocking the eventlet hub
+
+    Under eventlet the calling green thread yields until an OS worker thread
+    has finished the call, so other green threads (HTTP and Socket.IO
+    handlers) keep running. Without eventlet the function runs inline, since
+    the caller is already a real thread.
+
+    Args:
+        func (callable): Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func (exceptions are re-raised in the caller)
+    """
+    if is_offloading():
+        return tpool.execute(func, *args, **kwargs)
+    return func(*args, **kwargs)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Camera Gimbal Aiming Tests
+#
+# Usage:
+#   python -m pytest test_camera.py
+
+import pytest
+
+from modules.camera import ServoControl
+
+FOV = (62.2, 48.8)
+
+def servo_at(pan, tilt):
+    servo = ServoControl(field_of_view=FOV)
+    servo.pan, servo.tilt = pan, tilt
+    return servo
+
+@pytest.mark.parametrize("width, height", [(640, 480), (1920, 1080), (320, 240)])
+def test_centred_object_keeps_angles(width, height):
+    servo = servo_at(90, 10)
+
+    assert servo.calculate_servo_angles(width // 2, height // 2, width, height) == (90, 10)
+
+@pytest.mark.parametrize("width, height", [(640, 480), (1920, 1080)])
+def test_pixel_error_maps_to_field_of_view(width, height):
+    # A quarter frame right of and above centre is a quarter of the field of view away
+    servo = servo_at(90, 10)
+
+    pan, tilt = servo.calculate_servo_angles(width * 3 // 4, height // 4, width, height)
+
+    assert pan == pytest.approx(90 - FOV[0] / 4)
+    assert tilt == pytest.approx(10 + FOV[1] / 4)
+    assert (servo.pan, servo.tilt) == (pan, tilt)
+
+def test_frame_edge_is_half_the_field_of_view():
+    servo = servo_at(90, 25)
+
+    pan, tilt = servo.calculate_servo_angles(0, 480, 640, 480)
+
+    assert pan == pytest.approx(90 + FOV[0] / 2)
+    assert tilt == pytest.approx(25 - FOV[1] / 2)
+
+def test_angles_are_limited_to_the_servo_range():
+    assert servo_at(175, 25).calculate_servo_angles(0, 0, 640, 480) == (180, 30)
+    assert servo_at(5, 0).calculate_servo_angles(640, 480, 640, 480) == (0, -5)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Camera Backend Tests
+#
+# Usage:
+#   python -m pytest test_camera_backends.py
+
+import time
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from modules.camera_backends import SimulatedCameraBackend, Picamera2Backend, _LatestJpegOutput
+
+@pytest.mark.parametrize("resolution", [(640, 480), (1280, 720), (1920, 1080), (800, 600), (320, 240)])
+def test_simulated_lores_has_configured_size(resolution):
+    backend = SimulatedCameraBackend(resolution, framerate=1000, lores_resolution=(320, 240))
+
+    capture = backend.capture()
+
+    assert capture.data.shape == (resolution[1], resolution[0], 3)
+    assert capture.lores.shape == (240, 320, 3)
+    assert capture.lores.dtype == np.uint8
+    assert capture.lores.flags['C_CONTIGUOUS']
+
+def test_simulated_lores_is_a_copy():
+    backend = SimulatedCameraBackend((640, 480), framerate=1000, lores_resolution=(320, 240))
+    capture = backend.capture()
+    lores = capture.lores.copy()
+
+    capture.data[:] = 255
+
+    assert np.array_equal(capture.lores, lores)
+
+def test_simulated_lores_can_be_disabled():
+    backend = SimulatedCameraBackend((640, 480), framerate=1000, lores_resolution=None)
+
+    assert backend.capture().lores is None
+
+def test_jpeg_output_waits_for_the_encoder():
+    output = _LatestJpegOutput()
+    output.outputframe(b'first', timestamp=0)
+
+    # The encoder thread delivers the next frame shortly after the request was released
+    timer = threading.Timer(0.02, output.outputframe, args=(b'second',), kwargs={'timestamp': 33333})
+    timer.start()
+    jpeg = output.take(33333, timeout=1.0)
+    timer.join()
+
+    assert jpeg == b'second'
+    assert (output.hits, output.misses) == (1, 0)
+
+def test_jpeg_output_matches_by_timestamp():
+    output = _LatestJpegOutput()
+    for timestamp, jpeg in ((0, b'a'), (33333, b'b'), (66667, b'c')):
+        output.outputframe(jpeg, timestamp=timestamp)
+
+    assert output.take(33400) == b'b'
+    # A buffer is handed out once
+    assert output.take(33400) is None
+    assert output.take(0) == b'a'
+    assert (output.hits, output.misses) == (2, 1)
+
+def test_jpeg_output_does_not_wait_for_a_skipped_frame():
+    output = _LatestJpegOutput()
+    output.outputframe(b'later', timestamp=66667)
+
+    start = time.monotonic()
+    assert output.take(33333, timeout=1.0) is None
+    assert time.monotonic() - start < 0.5
+
+def test_jpeg_output_gives_up_after_the_timeout():
+    output = _LatestJpegOutput()
+
+    start = time.monotonic()
+    assert output.take(33333, timeout=0.05) is None
+    assert 0.04 <= time.monotonic() - start < 0.5
+    assert output.misses == 1
+
+def test_sensor_timestamp_maps_to_encoder_timestamp():
+    backend = object.__new__(Picamera2Backend)
+    backend.encoder = SimpleNamespace(firsttimestamp=5000000)
+
+    assert backend._encoder_timestamp({"SensorTimestamp": 5033333400}) == 33333
+    assert backend._encoder_timestamp({}) is None
+
+    # The encoder has not produced a frame yet
+    backend.encoder = SimpleNamespace(firsttimestamp=None)
+    assert backend._encoder_timestamp({"SensorTimestamp": 5033333400}) is None
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Target Detection Tests
+#
+# Usage:
+#   python -m pytest test_detection.py
+
+import numpy as np
+import pytest
+
+from modules import detection
+from modules.detection import (BlobDetector, MODE_MOTION, CV2_AVAILABLE, hsv_mask, rgb_to_hsv,
+                               largest_component, _largest_component_blocks)
+
+WIDTH, HEIGHT = 160, 120
+BACKGROUND = (40, 90, 40)  # Dull green: low saturation, far from red in hue
+
+def frame_with(squares, background=BACKGROUND):
+    """RGB frame with filled squares given as (x, y, size, (r, g, b))"""
+    data = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    data[:] = background
+    for x, y, size, color in squares:
+        data[y:y + size, x:x + size] = color
+    return data
+
+@pytest.fixture(params=["opencv", "numpy"])
+def backend(request, monkeypatch):
+    """Run a test with the OpenCV paths and with the NumPy fallbacks"""
+    if request.param == "opencv" and not CV2_AVAILABLE:
+        pytest.skip("OpenCV not available")
+    monkeypatch.setattr(detection, 'CV2_AVAILABLE', request.param == "opencv")
+    return request.param
+
+def test_hue_range_wraps_around_180():
+    hues = np.array([0, 5, 10, 11, 90, 169, 170, 179], dtype=np.uint8)
+    hsv = np.stack([hues, np.full(8, 200, np.uint8), np.full(8, 200, np.uint8)], axis=1)[None]
+
+    mask = hsv_mask(hsv, (170, 100, 70), (10, 255, 255))
+
+    assert mask[0].tolist() == [True, True, True, False, False, False, True, True]
+
+def test_red_detector_sees_both_ends_of_the_hue_circle(backend):
+    # Hue 178 (just below 180) and hue 4 (just above 0) are both red
+    assert 170 <= rgb_to_hsv(np.array([[[255, 0, 20]]], dtype=np.uint8))[0, 0, 0] <= 179
+    assert rgb_to_hsv(np.array([[[255, 30, 0]]], dtype=np.uint8))[0, 0, 0] <= 10
+
+    for color in ((255, 0, 20), (255, 30, 0)):
+        detector = BlobDetector.from_rgb((255, 0, 0), use_roi=False)
+        assert detector.hsv_lower[0] > detector.hsv_upper[0]
+
+        found = detector.detect(frame_with([(60, 40, 16, color)]))
+
+        assert found is not None
+        assert found.x == pytest.approx(67.5, abs=1)
+        assert found.y == pytest.approx(47.5, abs=1)
+
+def test_colour_outside_the_range_is_ignored(backend):
+    detector = BlobDetector.from_rgb((255, 0, 0))
+
+    assert detector.detect(frame_with([(60, 40, 16, (0, 0, 255))])) is None
+
+def test_motion_mask_finds_changed_pixels(backend):
+    detector = BlobDetector(mode=MODE_MOTION, use_roi=False)
+
+    # The first frame has nothing to compare against
+    assert detector.detect(frame_with([])) is None
+    assert detector.detect(frame_with([])) is None
+
+    found = detector.detect(frame_with([(100, 20, 12, (220, 220, 220))]))
+
+    assert found is not None
+    assert found.x == pytest.approx(105.5, abs=1)
+    assert found.y == pytest.approx(25.5, abs=1)
+    assert found.area == pytest.approx(144, abs=16)
+
+def test_motion_below_threshold_is_ignored(backend):
+    detector = BlobDetector(mode=MODE_MOTION, motion_threshold=25)
+    detector.detect(frame_with([]))
+
+    brighter = tuple(channel + 10 for channel in BACKGROUND)
+
+    assert detector.detect(frame_with([], background=brighter)) is None
+
+def test_roi_is_used_while_the_target_stays_near(backend):
+    detector = BlobDetector.from_rgb((255, 0, 0))
+    red = (255, 0, 0)
+
+    detector.detect(frame_with([(20, 20, 12, red)]))
+    found = detector.detect(frame_with([(24, 22, 12, red)]))
+
+    assert found.x == pytest.approx(29.5, abs=1)
+    assert detector.roi_hits == 1
+    assert detector.full_searches == 1
+
+def test_roi_falls_back_to_full_frame_search(backend):
+    detector = BlobDetector.from_rgb((255, 0, 0))
+    red = (255, 0, 0)
+
+    detector.detect(frame_with([(10, 10, 12, red)]))
+    # The target jumps to the opposite corner, outside the region of interest
+    found = detector.detect(frame_with([(130, 95, 12, red)]))
+
+    assert found is not None
+    assert found.x == pytest.approx(135.5, abs=1)
+    assert found.y == pytest.approx(100.5, abs=1)
+    assert detector.roi_hits == 0
+    assert detector.full_searches == 2
+
+def test_roi_detection_is_in_frame_coordinates(backend):
+    detector = BlobDetector.from_rgb((255, 0, 0), use_roi=False)
+    roi_detector = BlobDetector.from_rgb((255, 0, 0))
+    frames = [frame_with([(80 + step, 60, 10, (255, 0, 0))]) for step in range(0, 12, 3)]
+
+    for data in frames:
+        expected = detector.detect(data)
+        found = roi_detector.detect(data)
+        # The NumPy fallback's blocks start at the ROI corner, so edges may shift by up to a block
+        assert found.x == pytest.approx(expected.x, abs=1)
+        assert found.y == pytest.approx(expected.y, abs=1)
+        for found_edge, expected_edge in zip(found.bbox, expected.bbox):
+            assert abs(found_edge - expected_edge) < detection.COMPONENT_BLOCK
+    assert roi_detector.roi_hits == len(frames) - 1
+
+@pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+@pytest.mark.parametrize("blobs", [
+    [(40, 32, 24, 16)],                     # Block-aligned rectangle
+    [(13, 7, 30, 21), (90, 70, 10, 10)],    # Unaligned rectangle and a smaller one
+    [(101, 3, 45, 50), (5, 60, 20, 40)]
+])
+def test_numpy_components_agree_with_opencv(blobs):
+    mask = np.zeros((HEIGHT, WIDTH), dtype=bool)
+    for x, y, width, height in blobs:
+        mask[y:y + height, x:x + width] = True
+
+    expected = largest_component(mask)
+    found = _largest_component_blocks(mask, 1)
+
+    assert found.x == pytest.approx(expected.x, abs=1)
+    assert found.y == pytest.approx(expected.y, abs=1)
+    assert found.area == pytest.approx(expected.area, rel=0.1)
+    for found_edge, expected_edge in zip(found.bbox, expected.bbox):
+        assert abs(found_edge - expected_edge) < detection.COMPONENT_BLOCK
+
+@pytest.mark.skipif(not CV2_AVAILABLE, reason="OpenCV not available")
+def test_numpy_hsv_agrees_with_opencv(monkeypatch):
+    rng = np.random.default_rng(1)
+    data = rng.integers(0, 256, (32, 32, 3), dtype=np.uint8)
+
+    expected = rgb_to_hsv(data).astype(int)
+    monkeypatch.setattr(detection, 'CV2_AVAILABLE', False)
+    found = rgb_to_hsv(data).astype(int)
+
+    # Hue is circular; rounding may differ by one unit
+    hue_difference = np.abs(found[..., 0] - expected[..., 0])
+    assert np.minimum(hue_difference, 180 - hue_difference).max() <= 1
+    assert np.abs(found[..., 1:] - expected[..., 1:]).max() <= 1
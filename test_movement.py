@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Wheel Mixing and Motion Profile Tests
+#
+# Usage:
+#   python -m pytest test_movement.py
+
+import time
+
+import numpy as np
+import pytest
+
+from modules.hardware import DeviceManager
+from modules.movement import MovementController, WheelProfile, mix_wheels, PROFILE_TOLERANCE
+
+def test_mix_forward_drives_every_wheel():
+    assert mix_wheels(1, 0, 0).tolist() == [100, 100, 100, 100]
+    assert mix_wheels(-0.5, 0, 0).tolist() == [-50, -50, -50, -50]
+
+def test_mix_strafe_and_turn_are_opposed_pairs():
+    strafe = mix_wheels(0, 1, 0)
+    turn = mix_wheels(0, 0, 1)
+
+    assert sorted(strafe.tolist()) == [-100, -100, 100, 100]
+    assert sorted(turn.tolist()) == [-100, -100, 100, 100]
+    assert not np.array_equal(strafe, turn)
+
+def test_mix_scales_all_wheels_together():
+    wheels = mix_wheels(1, 1, 0)
+
+    # Unscaled the front-right and rear-left wheels would need 200%
+    assert np.abs(wheels).max() == 100
+    assert wheels.tolist() == [0, 100, 100, 0]
+
+def test_mix_is_vectorized():
+    wheels = mix_wheels([1, 0, 0.5], [0, 1, 0], [0, 0, 0.5])
+
+    assert wheels.shape == (4, 3)
+    for column, velocity in enumerate([(1, 0, 0), (0, 1, 0), (0.5, 0, 0.5)]):
+        assert wheels[:, column].tolist() == mix_wheels(*velocity).tolist()
+
+def run_profile(profile, dt, steps=1000):
+    """Step a profile until it arrives, returning the duties after every step"""
+    history = [profile.duties.copy()]
+    for _ in range(steps):
+        if not profile.is_ramping:
+            break
+        profile.step(dt)
+        history.append(profile.duties.copy())
+    return np.array(history)
+
+def test_profile_respects_acceleration_and_jerk_limits():
+    profile = WheelProfile(rate=50, max_accel=200.0, max_jerk=2000.0)
+    dt = 1 / profile.rate
+    profile.set_target(np.array([100.0, 100.0, -50.0, 0.0]))
+
+    history = run_profile(profile, dt)
+    rates = np.abs(np.diff(history, axis=0)).max(axis=1) / dt
+
+    assert not profile.is_ramping
+    assert profile.duties.tolist() == [100.0, 100.0, -50.0, 0.0]
+    # The final step may snap the last PROFILE_TOLERANCE percent
+    assert rates.max() <= profile.max_accel + PROFILE_TOLERANCE / dt
+    assert np.abs(np.diff(rates[:-1])).max() / dt <= profile.max_jerk * 1.001
+    # Limited to 200 %/s the ramp takes at least half a second
+    assert len(history) - 1 >= 0.5 * profile.rate
+
+def test_profile_wheels_arrive_together():
+    profile = WheelProfile(rate=50, max_accel=200.0, max_jerk=2000.0)
+    profile.set_target(np.array([100.0, 50.0, -100.0, 0.0]))
+
+    history = run_profile(profile, 1 / profile.rate)
+
+    # Every intermediate step lies on the line from the start to the targets
+    for duties in history[1:-1]:
+        assert np.allclose(duties / duties[0], [1.0, 0.5, -1.0, 0.0])
+
+def test_profile_without_acceleration_limit_jumps():
+    profile = WheelProfile(max_accel=0)
+    profile.set_target(np.array([80.0, 80.0, 80.0, 80.0]))
+
+    assert not profile.is_ramping
+    assert profile.duties.tolist() == [80.0, 80.0, 80.0, 80.0]
+
+def test_disabling_acceleration_limit_finishes_ramp():
+    profile = WheelProfile(rate=50, max_accel=200.0, max_jerk=2000.0)
+    profile.set_target(np.array([100.0, 100.0, 100.0, 100.0]))
+    profile.step(1 / profile.rate)
+    assert profile.is_ramping
+
+    profile.max_accel = 0
+    profile.step(1 / profile.rate)
+
+    assert not profile.is_ramping
+    assert profile.duties.tolist() == [100.0, 100.0, 100.0, 100.0]
+
+def test_profile_stop_is_immediate():
+    profile = WheelProfile()
+    profile.set_target(np.array([100.0, 100.0, 100.0, 100.0]))
+    profile.step(1 / profile.rate)
+
+    profile.stop()
+
+    assert not profile.is_ramping
+    assert profile.duties.tolist() == [0.0, 0.0, 0.0, 0.0]
+
+@pytest.fixture
+def controller():
+    controller = MovementController(DeviceManager.simulated())
+    yield controller
+    controller.cleanup()
+
+def wait_for(condition, timeout=2.0):
+    """Poll a condition until it holds or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_controller_rejects_invalid_profile(controller):
+    assert not controller.set_profile(max_accel=-1)
+    assert not controller.set_profile(max_jerk=0)
+    assert not controller.set_profile(max_accel=True)
+    assert not controller.set_profile(max_accel="fast")
+    assert controller.set_profile(max_accel=100, max_jerk=1000)
+    assert controller.get_status()["profile"]["max_accel"] == 100
+
+def test_controller_ramp_finishes_when_limit_is_disabled(controller):
+    controller.set_profile(max_accel=10, max_jerk=1000)
+    controller.move('forward', 100)
+    assert wait_for(lambda: controller.get_status()["profile"]["ramping"])
+
+    controller.set_profile(max_accel=0)
+
+    assert wait_for(lambda: not controller.get_status()["profile"]["ramping"])
+    assert controller.get_status()["profile"]["duties"] == [100.0, 100.0, 100.0, 100.0]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - PCA9685 Register Cache and Block Write Tests
+#
+# Runs the PCA9685 driver against a simulated bus and checks which
+# transactions reach the bus.
+#
+# Usage:
+#   python -m pytest test_pca9685.py
+
+import pytest
+
+from modules.LOBOROBOT import PCA9685
+from modules.bus_backends import SimulatedSMBus, SMBUS_BLOCK_MAX
+
+ADDRESS = 0x40
+LED0_ON_L = 0x06
+
+@pytest.fixture
+def bus():
+    return SimulatedSMBus()
+
+@pytest.fixture
+def pwm(bus):
+    pwm = PCA9685(ADDRESS, bus=bus)
+    bus.reset_stats()
+    return pwm
+
+def channel_registers(bus, channel):
+    """Read back the (on, off) counts of a channel from the simulated chip"""
+    values = [bus.registers.get((ADDRESS, LED0_ON_L + 4 * channel + i), 0) for i in range(4)]
+    return values[0] | values[1] << 8, values[2] | values[3] << 8
+
+def test_repeated_write_is_skipped(pwm, bus):
+    pwm.setPWM(0, 0, 2048)
+    bus.reset_stats()
+
+    pwm.setPWM(0, 0, 2048)
+
+    assert bus.transactions == 0
+    assert pwm.getStats()["registers_skipped"] == 4
+
+def test_only_changed_registers_are_written(pwm, bus):
+    pwm.setPWM(0, 0, 2048)
+    bus.reset_stats()
+
+    # Only the OFF_L byte changes
+    pwm.setPWM(0, 0, 2049)
+
+    assert bus.transactions == 1
+    assert bus.records[0].kind == 'write_byte'
+    assert bus.records[0].register == LED0_ON_L + 2
+    assert channel_registers(bus, 0) == (0, 2049)
+
+def test_failed_write_is_retried(pwm, bus):
+    original = bus.write_i2c_block_data
+
+    def failing_write(*args):
+        raise OSError("Remote I/O error")
+
+    bus.write_i2c_block_data = failing_write
+    with pytest.raises(OSError):
+        pwm.setPWM(0, 0, 2048)
+
+    bus.write_i2c_block_data = original
+    pwm.setPWM(0, 0, 2048)
+
+    assert channel_registers(bus, 0) == (0, 2048)
+
+def test_set_pwm_freq_invalidates_shadow(pwm, bus):
+    pwm.setPWM(0, 0, 2048)
+    pwm.setPWMFreq(50)
+    bus.reset_stats()
+
+    pwm.setPWM(0, 0, 2048)
+
+    assert bus.transactions == 1
+
+def test_instances_on_separate_buses_keep_separate_caches():
+    first_bus, second_bus = SimulatedSMBus(), SimulatedSMBus()
+    first, second = PCA9685(ADDRESS, bus=first_bus), PCA9685(ADDRESS, bus=second_bus)
+
+    first.setPWM(0, 0, 2048)
+    second.setPWM(0, 0, 2048)
+
+    assert channel_registers(first_bus, 0) == (0, 2048)
+    assert channel_registers(second_bus, 0) == (0, 2048)
+
+def test_new_instance_starts_with_empty_cache(pwm, bus):
+    pwm.setPWM(0, 0, 2048)
+
+    # E.g. the driver re-created after the chip was reset
+    other = PCA9685(ADDRESS, bus=bus)
+    bus.reset_stats()
+    other.setPWM(0, 0, 2048)
+
+    assert bus.transactions == 1
+
+def test_resync_rewrites_registers_after_reset(pwm, bus):
+    pwm.setPWMFreq(50)
+    pwm.setPWMs({0: (0, 100), 1: (0, 200)})
+    expected = dict(bus.registers)
+
+    # A brownout resets every register of the chip
+    bus.registers.clear()
+    pwm.resync()
+
+    assert bus.registers == expected
+
+def test_channel_write_is_one_block(pwm, bus):
+    pwm.setPWM(0, 0, 2048)
+
+    assert bus.transactions == 1
+    assert bus.records[0].kind == 'write_block'
+    assert bus.records[0].register == LED0_ON_L
+    assert channel_registers(bus, 0) == (0, 2048)
+
+def test_neighbouring_channels_are_merged(pwm, bus):
+    pwm.setPWMs({0: (0, 100), 1: (0, 200), 2: (0, 300)})
+
+    assert bus.transactions == 1
+    assert len(bus.records[0].data) == 12
+    assert [channel_registers(bus, channel) for channel in range(3)] == [(0, 100), (0, 200), (0, 300)]
+
+def test_gap_of_unknown_registers_is_not_bridged(pwm, bus):
+    pwm.setPWMs({0: (0, 100), 2: (0, 300)})
+
+    assert bus.transactions == 2
+    assert channel_registers(bus, 1) == (0, 0)
+
+def test_gap_of_known_registers_is_bridged(pwm, bus):
+    pwm.setPWMs({0: (0, 100), 1: (0, 200), 2: (0, 300)})
+    bus.reset_stats()
+
+    # Channel 1 is unchanged but known, so one block covers channels 0 to 2
+    pwm.setPWMs({0: (0, 110), 2: (0, 310)})
+
+    assert bus.transactions == 1
+    assert [channel_registers(bus, channel) for channel in range(3)] == [(0, 110), (0, 200), (0, 310)]
+
+def test_long_runs_are_split_into_block_transfers(pwm, bus):
+    pwm.setPWMs({channel: (0, 100 + channel) for channel in range(16)})
+
+    assert bus.transactions == 2
+    assert all(len(record.data) <= SMBUS_BLOCK_MAX for record in bus.records)
+    assert [channel_registers(bus, channel) for channel in range(16)] == [(0, 100 + channel) for channel in range(16)]
+
+def test_batch_writes_once_on_exit(pwm, bus):
+    with pwm.batch():
+        pwm.setPWM(0, 0, 100)
+        pwm.setPWM(1, 0, 200)
+        pwm.setPWM(0, 0, 150)
+        assert bus.transactions == 0
+
+    assert bus.transactions == 1
+    assert channel_registers(bus, 0) == (0, 150)
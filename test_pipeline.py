@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Frame Pipeline Tests
+#
+# Usage:
+#   python -m pytest test_pipeline.py
+
+import time
+
+import numpy as np
+import pytest
+
+from modules.camera import CameraController, DETECTION_STAGE, TRACKING_STAGE, OVERLAY_STAGE, OVERLAY_COLOR
+from modules.camera_backends import SimulatedCameraBackend
+from modules.detection import Detection
+from modules.hardware import DeviceManager
+from modules.pipeline import FramePipeline
+from modules.tracking import ObjectTracker
+
+class SlowDetector:
+    """Detector that always finds a target, taking longer than the detection budget"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def detect(self, data):
+        time.sleep(self.seconds)
+        return Detection(40.0, 30.0, 100, (35, 25, 45, 35))
+
+@pytest.fixture
+def camera():
+    backend = SimulatedCameraBackend((160, 120), framerate=30, lores_resolution=(80, 60))
+    camera = CameraController((160, 120), framerate=30, backend=backend, hardware=DeviceManager.simulated())
+    yield camera
+    camera.cleanup()
+
+def process_frame(camera):
+    """Run the camera's pipeline on one simulated frame, as the streaming thread does"""
+    capture = camera.backend.capture()
+    return camera.pipeline.process(capture.data, time.time(), {"lores": capture.lores, "sequence": 1})
+
+def sleeper(seconds):
+    def stage(data, context):
+        time.sleep(seconds)
+    return stage
+
+def test_optional_stage_is_skipped_after_an_overrun():
+    pipeline = FramePipeline(framerate=50)  # 16 ms per frame
+    slow = pipeline.add_stage('slow', sleeper(0.02), budget_ms=5, offload=False)
+    analytics = pipeline.add_stage('analytics', sleeper(0), budget_ms=2, optional=True, offload=False)
+
+    pipeline.process(np.zeros((4, 4, 3), np.uint8), time.time())
+
+    assert slow.over_budget == 1
+    assert (analytics.runs, analytics.skipped) == (0, 1)
+    assert pipeline.frames_over_deadline == 1
+
+def test_slow_optional_stage_is_retried_once_it_may_fit():
+    pipeline = FramePipeline(framerate=50)
+    stage = pipeline.add_stage('analytics', sleeper(0.03), budget_ms=5, optional=True, offload=False)
+    data = np.zeros((4, 4, 3), np.uint8)
+
+    # The first run uses the declared budget and overruns it
+    pipeline.process(data, time.time())
+    pipeline.process(data, time.time())
+
+    assert (stage.runs, stage.skipped, stage.over_budget) == (1, 1, 1)
+
+    # Each skip relaxes the measured cost toward the budget until the stage runs again
+    for _ in range(10):
+        pipeline.process(data, time.time())
+        if stage.runs == 2:
+            break
+    assert stage.runs == 2
+
+def test_builtin_stages_start_disabled(camera):
+    names = [stage.name for stage in camera.pipeline.stages]
+    assert names == [DETECTION_STAGE, TRACKING_STAGE, OVERLAY_STAGE]
+
+    capture = camera.backend.capture()
+    data, modified = camera.pipeline.process(capture.data, time.time())
+
+    assert data is capture.data
+    assert not modified
+    assert all(stage.runs == 0 for stage in camera.pipeline.stages)
+
+def test_detection_over_budget_is_skipped_by_tracking(camera):
+    tracker = ObjectTracker(camera, detector=SlowDetector(0.04))
+
+    assert tracker.start()
+    process_frame(camera)
+    process_frame(camera)
+    tracker.stop()
+
+    detection = camera.pipeline.stages[0].get_stats()
+    assert (detection["runs"], detection["over_budget"], detection["skipped"]) == (1, 1, 1)
+    assert (tracker.frames_processed, tracker.frames_found, tracker.frames_skipped) == (1, 1, 1)
+    assert tracker.last_update["x"] == pytest.approx(0.5)
+    # Tracking stops with the tracker
+    assert not camera.pipeline.stages[0].enabled
+
+def test_overlay_draws_last_detection_in_frame_pixels(camera):
+    camera.set_detector(SlowDetector(0))
+    assert camera.pipeline.set_enabled(OVERLAY_STAGE, True)
+
+    data, modified = process_frame(camera)
+
+    assert modified
+    # The lores box (35, 25)-(45, 35) is twice as large in the main frame
+    assert tuple(data[50, 70]) == OVERLAY_COLOR
+    assert tuple(data[69, 89]) == OVERLAY_COLOR
+    assert tuple(data[55, 75]) != OVERLAY_COLOR
+    # Centre crosshair
+    assert tuple(data[60, 80]) == OVERLAY_COLOR
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Video Recorder Tests
+#
+# Records synthetic encoded frames to a temporary directory and reads them
+# back by timestamp.
+#
+# Usage:
+#   python -m pytest test_recorder.py
+
+import time
+
+import pytest
+
+from modules.camera import EncodedFrame
+from modules.recorder import VideoRecorder, Recording, list_recordings
+
+START = 1000.0
+INTERVAL = 0.1
+FRAMES = 10
+
+class StubCamera:
+    """Camera controller that never produces frames; tests submit them directly"""
+
+    resolution = (64, 48)
+    framerate = 10
+    frame_sequence = 0
+
+    def wait_for_frame(self, sequence, timeout=None):
+        time.sleep(0.01)
+        return None
+
+def jpeg_of(sequence):
+    """Distinct fake JPEG payload per frame"""
+    return b'\xff\xd8' + f"frame {sequence}".encode() * (sequence + 1) + b'\xff\xd9'
+
+@pytest.fixture
+def recording(tmp_path):
+    # Segments of 0.25 s split the ten frames over four segment files of 3, 3, 3 and 1
+    recorder = VideoRecorder(StubCamera(), tmp_path, segment_seconds=0.25)
+    assert recorder.start("session")
+    for sequence in range(FRAMES):
+        timestamp = START + sequence * INTERVAL
+        assert recorder.submit(EncodedFrame(sequence, timestamp, 64, 48, jpeg_of(sequence), timestamp, timestamp))
+    assert recorder.stop()
+    return Recording(tmp_path / "session")
+
+def test_recording_index(recording):
+    assert recording.frame_count == FRAMES
+    assert len(recording.segments) == 4
+    assert recording.start_time == START
+    assert recording.end_time == pytest.approx(START + (FRAMES - 1) * INTERVAL)
+    assert recording.get_info()["session"]["frames_written"] == FRAMES
+
+def test_seek_before_recording(recording):
+    assert recording.seek(START - 1) is None
+    assert recording.frame_at(START - 1) is None
+
+def test_seek_finds_last_frame_at_or_before(recording):
+    # Frames 3 and 4 open and continue the second segment
+    assert recording.seek(START + 3 * INTERVAL) == (1, 0)
+    assert recording.seek(START + 4.5 * INTERVAL) == (1, 1)
+    # Past the end the last frame stays shown
+    assert recording.seek(START + 100) == (3, 0)
+
+def test_frame_at_reads_frame_payload(recording):
+    for sequence in range(FRAMES):
+        frame = recording.frame_at(START + sequence * INTERVAL + INTERVAL / 2)
+        assert frame[0] == sequence
+        assert frame[2] == jpeg_of(sequence)
+
+def test_frames_in_time_range(recording):
+    frames = list(recording.frames(START + 2.5 * INTERVAL, START + 6 * INTERVAL))
+
+    assert [frame[0] for frame in frames] == [3, 4, 5, 6]
+    assert all(frame[2] == jpeg_of(frame[0]) for frame in frames)
+
+def test_torn_index_record_is_ignored(recording):
+    index_path = sorted(recording.session_dir.glob("*.idx"))[-1]
+    with open(index_path, 'ab') as f:
+        f.write(b'\x00' * 5)
+
+    assert Recording(recording.session_dir).frame_count == FRAMES
+
+def test_list_recordings(recording, tmp_path):
+    (tmp_path / "not_a_session").mkdir()
+
+    assert list_recordings(tmp_path) == ["session"]
+
+@pytest.mark.parametrize("name", ["../escape", "/tmp/escape", "nested/session", "."])
+def test_session_name_must_stay_in_directory(tmp_path, name):
+    recorder = VideoRecorder(StubCamera(), tmp_path / "recordings")
+
+    with pytest.raises(ValueError):
+        recorder.start(name)
+    assert not recorder.is_recording
+
+def test_existing_session_is_not_overwritten(recording, tmp_path):
+    recorder = VideoRecorder(StubCamera(), tmp_path)
+
+    with pytest.raises(FileExistsError):
+        recorder.start("session")
+    assert not recorder.is_recording
+    assert Recording(tmp_path / "session").frame_count == FRAMES
+
+def test_default_names_are_unique(tmp_path):
+    names = []
+    for _ in range(3):
+        recorder = VideoRecorder(StubCamera(), tmp_path)
+        assert recorder.start()
+        names.append(recorder.session_dir.name)
+        recorder.stop()
+
+    # Sessions started within the same second get a numeric suffix
+    assert len(set(names)) == 3
+    assert sorted(list_recordings(tmp_path)) == sorted(names)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# Sheikah AI Car Control - Adaptive Video Stream Tests
+#
+# Usage:
+#   python -m pytest test_streaming.py
+
+from collections import namedtuple
+
+from modules.streaming import (ClientStream, QUALITY_LEVELS, DEFAULT_QUALITY_LEVEL, MAX_FRAMES_IN_FLIGHT,
+                               STEP_DOWN_AFTER, STEP_UP_AFTER)
+
+# The client stream only reads the sequence of a sent frame
+Frame = namedtuple('Frame', ['sequence'])
+
+def send_frames(client, count, fps=30, encode_time=0.0, ack_delay=None):
+    """
+    Offer frames to a client at a camera frame rate
+
+    Args:
+        client (ClientStream): Client under test
+        count (int): Frames offered
+        fps (float): Camera frame rate
+        encode_time (float): Time between the send decision and the emit
+        ack_delay (int): Frames after which each sent frame is acknowledged (None never acknowledges)
+
+    Returns:
+        int: Frames sent
+    """
+    sent = []
+    for sequence in range(1, count + 1):
+        now = sequence / fps
+        if ack_delay is not None:
+            while sent and sent[0] <= sequence - ack_delay:
+                client.on_ack(sent.pop(0))
+        if client.should_send(now):
+            client.on_sent(Frame(sequence), now, now + encode_time)
+            sent.append(sequence)
+    return client.frames_sent
+
+def test_rate_gate_ignores_encode_time():
+    client = ClientStream('sid')
+    assert QUALITY_LEVELS[client.level]["fps"] == 30
+
+    # Encoding and emitting a frame takes most of the frame interval
+    sent = send_frames(client, 300, fps=30, encode_time=0.02)
+
+    assert sent >= 299
+
+def test_rate_gate_caps_frame_rate():
+    client = ClientStream('sid')
+
+    sent = send_frames(client, 600, fps=60)
+
+    assert 295 <= sent <= 305
+
+def test_unacknowledged_client_steps_down():
+    client = ClientStream('sid', adaptive=True)
+
+    send_frames(client, MAX_FRAMES_IN_FLIGHT + STEP_DOWN_AFTER)
+
+    assert client.level == DEFAULT_QUALITY_LEVEL + 1
+    assert client.frames_skipped == STEP_DOWN_AFTER
+
+def test_non_adaptive_client_never_steps():
+    client = ClientStream('sid')
+
+    send_frames(client, 100)
+
+    assert client.level == DEFAULT_QUALITY_LEVEL
+    assert client.frames_skipped == 0
+
+def test_client_steps_up_with_slow_acks():
+    client = ClientStream('sid', adaptive=True)
+    client.level = len(QUALITY_LEVELS) - 1
+
+    # Frames are acknowledged two camera frames after they were sent, so at
+    # the higher frame rates one frame is still in flight at every send
+    send_frames(client, 20 * STEP_UP_AFTER, ack_delay=2)
+
+    assert client.level == 0
+
+def test_ack_returns_sent_frame_and_clears_older():
+    client = ClientStream('sid', adaptive=True)
+    for sequence in (1, 2, 3):
+        client.on_sent(Frame(sequence), sequence, sequence + 0.5)
+
+    sent_time, frame = client.on_ack(2)
+
+    assert frame.sequence == 2
+    assert sent_time == 2.5
+    assert [entry[1].sequence for entry in client.pending] == [3]
+    assert client.on_ack(2) is None